@@ -0,0 +1,73 @@
+import re
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.services.asset_store import get_asset_store, ASSET_NAME_PATTERN, CONTENT_TYPES
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    if match.group(1) == "":
+        length = int(match.group(2))
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+@router.get("/assets/{name}")
+async def get_asset(name: str, request: Request):
+    path = get_asset_store().resolve(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="资源不存在")
+
+    digest, extension = ASSET_NAME_PATTERN.match(name).groups()
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    media_type = CONTENT_TYPES[extension]
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header:
+        size = path.stat().st_size
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers=dict(headers, **{"Content-Range": f"bytes */{size}"})
+            )
+
+        if byte_range is not None:
+            start, end = byte_range
+            with open(path, 'rb') as f:
+                f.seek(start)
+                content = f.read(end - start + 1)
+            return Response(
+                content=content,
+                status_code=206,
+                media_type=media_type,
+                headers=dict(headers, **{"Content-Range": f"bytes {start}-{end}/{size}"})
+            )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
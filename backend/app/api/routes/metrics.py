@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from app.services.single_flight import single_flight_stats
+from app.services.consistency_cache import get_consistency_cache
+from app.services.job_broker import get_job_queue
+
+router = APIRouter()
+
+
+@router.get("/metrics/coalescing")
+async def get_coalescing_metrics():
+    return single_flight_stats()
+
+
+@router.get("/metrics/consistency")
+async def get_consistency_metrics():
+    return get_consistency_cache().stats()
+
+
+@router.get("/metrics/jobs")
+async def get_job_metrics():
+    return get_job_queue().stats()
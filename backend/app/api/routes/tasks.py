@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
 import json
 
 from app.models.task import (
@@ -7,52 +10,124 @@ from app.models.task import (
     URLTaskRequest,
     TaskResponse,
     TaskStatusResponse,
+    TaskListResponse,
     TaskResultResponse,
     TaskStatus
 )
-from app.services.task_service import TaskService
+from app.services.task_service import get_task_service, status_event
 from app.services.converter_service import ConverterService
+from app.services.progress_bus import get_progress_bus
+from app.services.job_executor import JobQueueFullError, get_job_executor
+from app.services.job_broker import BrokerEventRelay, get_job_broker, use_job_broker
 from app.services.url_fetcher import URLFetcher
+from app.api.routes import auth
+from app.core.config import settings
 
 router = APIRouter()
-task_service = TaskService()
+task_service = get_task_service()
 converter_service = ConverterService(task_service)
+job_executor = get_job_executor()
+job_broker = get_job_broker() if use_job_broker() else None
+job_queue = job_broker or job_executor
+event_relay = BrokerEventRelay(job_broker, get_progress_bus()) if job_broker else None
 url_fetcher = URLFetcher()
 
 
+def job_owner(request: Request) -> str:
+    authorization = request.headers.get("Authorization", "")
+    token = authorization[len("Bearer "):].strip() if authorization.startswith("Bearer ") else ""
+    username = auth.sessions.get(token) if token else None
+    if username:
+        return f"user:{username}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def queue_full_error(e: JobQueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={
+            "message": str(e),
+            "queue_length": e.queue_length,
+            "retry_after": e.retry_after
+        },
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def enqueue_conversion(
+    task_type: str,
+    data: Dict[str, Any],
+    text: str,
+    config_dict: Dict[str, Any],
+    owner: str,
+    priority: int
+) -> TaskResponse:
+    try:
+        job_queue.ensure_capacity(owner)
+    except JobQueueFullError as e:
+        raise queue_full_error(e)
+    
+    task_id = task_service.create_task(task_type, data)
+    
+    try:
+        if job_broker is not None:
+            position = job_broker.enqueue(task_id, owner, priority=priority)
+        else:
+            position = job_executor.submit(
+                task_id,
+                owner,
+                lambda: converter_service.process_text_task(task_id, text, config_dict),
+                priority=priority,
+                on_cancel=lambda: converter_service.report_progress(
+                    task_id, TaskStatus.FAILED, error="服务已关闭，任务未执行"
+                )
+            )
+    except JobQueueFullError as e:
+        converter_service.report_progress(task_id, TaskStatus.FAILED, error=str(e))
+        raise queue_full_error(e)
+    
+    return TaskResponse(
+        task_id=task_id,
+        status=TaskStatus.PENDING,
+        message="任务已创建，正在处理中",
+        queue_position=position
+    )
+
+
 @router.post("/tasks/text", response_model=TaskResponse)
 async def create_text_task(
     request: TextTaskRequest,
-    background_tasks: BackgroundTasks
+    http_request: Request
 ):
     config_dict = request.config.dict() if request.config else {}
     
-    task_id = task_service.create_task("text", {
-        "text": request.text,
-        "config": config_dict
-    })
-    
-    background_tasks.add_task(
-        converter_service.process_text_task,
-        task_id,
+    return await asyncio.to_thread(
+        enqueue_conversion,
+        "text",
+        {
+            "text": request.text,
+            "config": config_dict
+        },
         request.text,
-        config_dict
-    )
-    
-    return TaskResponse(
-        task_id=task_id,
-        status=TaskStatus.PENDING,
-        message="任务已创建，正在处理中"
+        config_dict,
+        job_owner(http_request),
+        request.priority
     )
 
 
 @router.post("/tasks/url", response_model=TaskResponse)
 async def create_url_task(
     request: URLTaskRequest,
-    background_tasks: BackgroundTasks
+    http_request: Request
 ):
+    owner = job_owner(http_request)
+    try:
+        await asyncio.to_thread(job_queue.ensure_capacity, owner)
+    except JobQueueFullError as e:
+        raise queue_full_error(e)
+    
     try:
-        text = url_fetcher.fetch_text_from_url(request.url)
+        text = await asyncio.to_thread(url_fetcher.fetch_text_from_url, request.url)
         
         if not text or len(text) < 100:
             raise HTTPException(
@@ -62,42 +137,89 @@ async def create_url_task(
         
         config_dict = request.config.dict() if request.config else {}
         
-        task_id = task_service.create_task("url", {
-            "url": request.url,
-            "text": text,
-            "config": config_dict
-        })
-        
-        background_tasks.add_task(
-            converter_service.process_text_task,
-            task_id,
+        return await asyncio.to_thread(
+            enqueue_conversion,
+            "url",
+            {
+                "url": request.url,
+                "text": text,
+                "config": config_dict
+            },
             text,
-            config_dict
-        )
-        
-        return TaskResponse(
-            task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="任务已创建，正在处理中"
+            config_dict,
+            owner,
+            request.priority
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/tasks", response_model=TaskListResponse)
+async def list_tasks(
+    status: Optional[TaskStatus] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    return TaskListResponse(
+        tasks=await asyncio.to_thread(task_service.list_tasks, status, limit=limit, offset=offset),
+        total=await asyncio.to_thread(task_service.count_tasks, status),
+        limit=limit,
+        offset=offset
+    )
+
+
 @router.get("/tasks/{task_id}/status", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str):
-    status = task_service.get_task_status(task_id)
+    status = await asyncio.to_thread(task_service.get_task_status, task_id)
     
     if not status:
         raise HTTPException(status_code=404, detail="任务不存在")
     
+    if status.status == TaskStatus.PENDING:
+        status.queue_position = await asyncio.to_thread(job_queue.position, task_id)
+    
     return status
 
 
+async def task_event_stream(task_id: str, initial: Dict[str, Any]) -> AsyncIterator[str]:
+    events = get_progress_bus().subscribe(
+        task_id,
+        initial=initial,
+        heartbeat=settings.TASK_EVENTS_HEARTBEAT
+    )
+    try:
+        async for event in events:
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    finally:
+        await events.aclose()
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    status = await asyncio.to_thread(task_service.get_task_status, task_id)
+    
+    if not status:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    return StreamingResponse(
+        task_event_stream(task_id, status_event(status)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/tasks/{task_id}/result", response_model=TaskResultResponse)
 async def get_task_result(task_id: str):
-    result = task_service.get_task_result(task_id)
+    result = await asyncio.to_thread(task_service.get_task_result, task_id, include_data=False)
     
     if not result:
         raise HTTPException(status_code=404, detail="任务不存在")
@@ -116,7 +238,7 @@ async def get_task_result(task_id: str):
     if characters_file.exists():
         with open(characters_file, 'r', encoding='utf-8') as f:
             char_data = json.load(f)
-            characters = list(char_data.get('characters', {}).keys())
+            characters = [char['name'] for char in char_data.get('characters', [])]
     
     return TaskResultResponse(
         task_id=task_id,
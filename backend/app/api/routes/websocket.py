@@ -1,11 +1,24 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, Any
+import asyncio
 import json
+import uuid
 from app.services.qiniu_tts_service import QiniuTTSService
 from app.services.qiniu_llm_service import QiniuLLMService
 from app.services.qiniu_image_service import QiniuImageService
 from app.services.qiniu_video_service import QiniuVideoService
-from app.handlers import handle_ping, handle_tts, handle_video
+from app.services.prompt_prefetcher import PromptPrefetcher
+from app.services.asset_store import get_asset_store
+from app.services.consistency_cache import story_id_for
+from app.services.video_status_poller import VideoStatusPoller
+from app.handlers import (
+    handle_ping, handle_tts, handle_video, handle_prefetch, handle_hello, handle_cancel, handle_subscribe
+)
+from app.services.progress_bus import get_progress_bus
+from app.services.task_service import get_task_service
+from app.core.config import settings
+from app.core.ws_protocol import WebSocketSender
+from app.core.connection_scheduler import ConnectionScheduler, SchedulerFullError
 
 router = APIRouter()
 
@@ -16,11 +29,69 @@ qiniu_tts = QiniuTTSService()
 qiniu_llm = QiniuLLMService()
 qiniu_image = QiniuImageService()
 qiniu_video = QiniuVideoService()
+video_status_poller = VideoStatusPoller(
+    qiniu_video,
+    min_interval=settings.VIDEO_POLL_MIN_INTERVAL,
+    max_interval=settings.VIDEO_POLL_MAX_INTERVAL,
+    max_checks_per_sweep=settings.VIDEO_POLL_MAX_CHECKS_PER_SWEEP,
+    max_concurrent_checks=settings.VIDEO_POLL_MAX_CONCURRENT_CHECKS,
+    min_sweep_interval=settings.VIDEO_POLL_MIN_SWEEP_INTERVAL,
+    timeout=settings.VIDEO_POLL_TIMEOUT
+)
+
+
+async def run_action(
+    sender: WebSocketSender,
+    action: str,
+    message: Dict[str, Any],
+    scheduler: ConnectionScheduler,
+    prompt_prefetcher: PromptPrefetcher
+) -> None:
+    try:
+        if action == "tts":
+            await handle_tts(
+                sender, message, qiniu_tts, qiniu_image, prompt_prefetcher,
+                asset_store=get_asset_store() if sender.asset_urls else None,
+                scheduler=scheduler
+            )
+        
+        elif action == "video":
+            await handle_video(
+                sender, message, qiniu_video, prompt_prefetcher,
+                scheduler=scheduler, video_poller=video_status_poller
+            )
+        
+        await sender.send_json({
+            "type": "complete",
+            "message": "处理完成"
+        })
+    
+    except asyncio.CancelledError:
+        print(f"段落 {message.get('paragraph_number')} 的 {action} 任务已取消")
+        raise
+    except Exception as e:
+        await sender.send_json({
+            "type": "error",
+            "message": f"处理错误: {str(e)}"
+        })
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    sender = WebSocketSender(websocket)
+    
+    prompt_prefetcher = PromptPrefetcher(
+        qiniu_llm,
+        lookahead=settings.LLM_PREFETCH_LOOKAHEAD,
+        max_queue=settings.LLM_PREFETCH_MAX_QUEUE
+    )
+    scheduler = ConnectionScheduler(
+        max_concurrent=settings.WS_MAX_CONCURRENT_TASKS,
+        max_queued=settings.WS_MAX_QUEUED_TASKS,
+        max_per_pool=settings.WS_MAX_MEDIA_TASKS
+    )
+    connection_story_id = f"conn-{uuid.uuid4().hex}"
     
     try:
         while True:
@@ -41,34 +112,64 @@ async def websocket_endpoint(websocket: WebSocket):
                 print(f"text_length: {len(text) if text else 0}")
                 
                 if action == "ping":
-                    await handle_ping(websocket, message)
+                    await handle_ping(sender, message)
+                    continue
+                
+                if action == "hello":
+                    await handle_hello(sender, message)
+                    continue
+                
+                if action == "prefetch":
+                    await handle_prefetch(sender, message, prompt_prefetcher)
+                    paragraphs = message.get("paragraphs")
+                    if isinstance(paragraphs, list) and paragraphs:
+                        connection_story_id = story_id_for(paragraphs)
+                    continue
+                
+                if action == "cancel":
+                    await handle_cancel(sender, message, scheduler)
+                    continue
+                
+                if action in ("subscribe", "unsubscribe"):
+                    await handle_subscribe(sender, message, scheduler, get_task_service(), get_progress_bus())
                     continue
                 
                 if not text and action not in ["video"]:
-                    await websocket.send_json({
+                    await sender.send_json({
                         "type": "error",
                         "message": "文本内容不能为空"
                     })
                     continue
                 
-                if action == "tts":
-                    await handle_tts(websocket, message, qiniu_tts, qiniu_image, qiniu_llm)
+                if not message.get("story_id") and not task_id:
+                    message["story_id"] = connection_story_id
                 
-                elif action == "video":
-                    await handle_video(websocket, message, qiniu_video, qiniu_llm)
+                if action == "tts":
+                    upcoming_paragraphs = message.get("upcoming_paragraphs")
+                    if upcoming_paragraphs:
+                        await handle_prefetch(sender, {"paragraphs": upcoming_paragraphs}, prompt_prefetcher)
                 
-                await websocket.send_json({
-                    "type": "complete",
-                    "message": "处理完成"
-                })
+                try:
+                    scheduler.spawn(
+                        action, paragraph_number,
+                        run_action(sender, action, message, scheduler, prompt_prefetcher),
+                        limited=True,
+                        replace=action == "tts"
+                    )
+                except SchedulerFullError as e:
+                    await sender.send_json({
+                        "type": "error",
+                        "message": str(e),
+                        "paragraph_number": paragraph_number
+                    })
                 
             except json.JSONDecodeError:
-                await websocket.send_json({
+                await sender.send_json({
                     "type": "error",
                     "message": "无效的JSON格式"
                 })
             except Exception as e:
-                await websocket.send_json({
+                await sender.send_json({
                     "type": "error",
                     "message": f"处理错误: {str(e)}"
                 })
@@ -81,3 +182,8 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.close()
         except:
             pass
+    finally:
+        cancelled = await scheduler.shutdown()
+        if cancelled:
+            print(f"连接断开，已取消 {cancelled} 个进行中的任务")
+        prompt_prefetcher.close()
@@ -11,6 +11,67 @@ class Settings(BaseSettings):
     QINIU_API_KEY: str = os.getenv("QINIU_API_KEY", "")
     
     OUTPUT_DIR: str = "backend/output"
+    ASSET_STORE_DIR: str = "output/assets"
+    
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_DEFAULT_TIMEOUT: float = 60.0
+    TTS_TIMEOUT: float = 60.0
+    LLM_TIMEOUT: float = 120.0
+    IMAGE_TIMEOUT: float = 300.0
+    VIDEO_SUBMIT_TIMEOUT: float = 120.0
+    VIDEO_STATUS_TIMEOUT: float = 30.0
+    VIDEO_POLL_MIN_INTERVAL: float = 2.0
+    VIDEO_POLL_MAX_INTERVAL: float = 15.0
+    VIDEO_POLL_MAX_CHECKS_PER_SWEEP: int = 20
+    VIDEO_POLL_MAX_CONCURRENT_CHECKS: int = 5
+    VIDEO_POLL_MIN_SWEEP_INTERVAL: float = 0.5
+    VIDEO_POLL_TIMEOUT: float = 1800.0
+    
+    TTS_SENTENCE_CONCURRENCY: int = 4
+    AUDIO_MIX_TIMEOUT: float = 30.0
+    AUDIO_MIX_SAMPLE_RATE: int = 24000
+    AUDIO_MIX_BITRATE: int = 128
+    BACKGROUND_MUSIC_GAIN: float = 0.3
+    
+    WS_MAX_CONCURRENT_TASKS: int = 4
+    WS_MAX_QUEUED_TASKS: int = 1024
+    WS_MAX_MEDIA_TASKS: int = 2
+    
+    LLM_PREFETCH_LOOKAHEAD: int = 3
+    LLM_PREFETCH_MAX_QUEUE: int = 64
+    
+    LLM_SUMMARY_CACHE_ENABLED: bool = True
+    LLM_SUMMARY_CACHE_PATH: str = "output/cache/llm_summaries.sqlite3"
+    LLM_SUMMARY_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_SUMMARY_CACHE_TTL: float = 30 * 24 * 3600.0
+    
+    CONSISTENCY_CACHE_PATH: str = "output/cache/consistency.sqlite3"
+    CONSISTENCY_CACHE_MAX_STORIES: int = 256
+    CONSISTENCY_CACHE_MAX_ENTRIES_PER_STORY: int = 64
+    CONSISTENCY_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    CONSISTENCY_CACHE_TTL: float = 30 * 24 * 3600.0
+    
+    TASK_STORE_BACKEND: str = "sqlite"
+    TASK_STORE_PATH: str = "tasks/tasks.sqlite3"
+    TASK_STORE_DIR: str = "tasks"
+    TASK_STATUS_CACHE_ENABLED: bool = True
+    TASK_STATUS_FLUSH_INTERVAL: float = 1.0
+    TASK_STATUS_CACHE_ENTRIES: int = 4096
+    TASK_STATUS_CACHE_TTL: float = 2.0
+    TASK_EVENTS_HEARTBEAT: float = 15.0
+    
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUE: int = 100
+    JOB_MAX_QUEUED_PER_USER: int = 5
+    JOB_RETRY_AFTER: int = 30
+    JOB_BACKEND: str = "local"
+    JOB_BROKER_PATH: str = "tasks/jobs.sqlite3"
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_WORKER_POLL_INTERVAL: float = 1.0
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,106 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Dict, List, Optional, Set, Tuple
+
+TaskKey = Tuple[str, Any]
+
+
+class SchedulerFullError(Exception):
+    pass
+
+
+class ConnectionScheduler:
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queued: int = 1024,
+        max_per_pool: int = 2
+    ):
+        self.max_queued = max_queued
+        self.max_per_pool = max(1, max_per_pool)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._pools: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Dict[TaskKey, Set[asyncio.Task]] = {}
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+    def in_flight(self) -> List[TaskKey]:
+        return [key for key, tasks in self._tasks.items() if tasks]
+
+    def spawn(
+        self,
+        kind: str,
+        paragraph_number: Any,
+        coro: Awaitable,
+        limited: bool = False,
+        replace: bool = False,
+        pool: Optional[str] = None
+    ) -> asyncio.Task:
+        if self._closed or self.pending_count >= self.max_queued:
+            coro.close()
+            raise SchedulerFullError(f"当前连接排队的任务过多（上限{self.max_queued}），请稍后重试")
+
+        key = (kind, paragraph_number)
+        if replace:
+            self._cancel_keys([key])
+
+        task = asyncio.create_task(self._run(coro, self._semaphore_for(limited, pool)))
+        self._tasks.setdefault(key, set()).add(task)
+        task.add_done_callback(lambda done: self._discard(key, done, coro))
+        return task
+
+    def _semaphore_for(self, limited: bool, pool: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not limited:
+            return None
+        if pool is None:
+            return self._semaphore
+        if pool not in self._pools:
+            self._pools[pool] = asyncio.Semaphore(self.max_per_pool)
+        return self._pools[pool]
+
+    async def _run(self, coro: Awaitable, semaphore: Optional[asyncio.Semaphore]) -> Any:
+        if semaphore is None:
+            return await coro
+        async with semaphore:
+            return await coro
+
+    def _discard(self, key: TaskKey, task: asyncio.Task, coro: Awaitable) -> None:
+        if inspect.iscoroutine(coro) and inspect.getcoroutinestate(coro) == inspect.CORO_CREATED:
+            coro.close()
+        tasks = self._tasks.get(key)
+        if tasks is None:
+            return
+        tasks.discard(task)
+        if not tasks:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"后台任务异常 {key}: {str(task.exception())}")
+
+    def _cancel_keys(self, keys: List[TaskKey]) -> int:
+        count = 0
+        for key in keys:
+            for task in list(self._tasks.get(key, ())):
+                if not task.done():
+                    task.cancel()
+                    count += 1
+        return count
+
+    def cancel(self, paragraph_number: Any = None, kind: Optional[str] = None) -> int:
+        keys = [
+            key for key in self._tasks
+            if (paragraph_number is None or key[1] == paragraph_number)
+            and (kind is None or key[0] == kind)
+        ]
+        return self._cancel_keys(keys)
+
+    async def shutdown(self) -> int:
+        self._closed = True
+        tasks = [task for tasks in self._tasks.values() for task in tasks]
+        count = self.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return count
@@ -0,0 +1,66 @@
+import importlib.util
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+QINIU_HOSTS = [
+    "https://openai.qiniu.com",
+    "https://api.qnaigc.com",
+]
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def operation_timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _make_transport(http2: bool) -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    http2 = http2_available()
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=operation_timeout(settings.HTTP_DEFAULT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        mounts={host: _make_transport(http2) for host in QINIU_HOSTS}
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        print(f"共享HTTP连接池已创建 (HTTP/2: {'启用' if http2_available() else '不可用'})")
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import struct
+from typing import Any, Dict, List, Tuple
+from fastapi import WebSocket
+
+PROTOCOL_VERSION = 2
+BINARY_FRAME_HEADER = struct.Struct('>IH')
+
+
+def split_attachments(message: Dict[str, Any]) -> Tuple[Dict[str, Any], List[bytes]]:
+    data = message.get("data")
+    if not isinstance(data, dict):
+        return message, []
+
+    message_type = message.get("type")
+    attachments: List[bytes] = []
+
+    if message_type == "tts_result" and isinstance(data.get("data"), str):
+        attachments.append(base64.b64decode(data["data"]))
+        header_data = {key: value for key, value in data.items() if key != "data"}
+        header_data["attachment"] = 0
+
+    elif message_type == "image_result" and isinstance(data.get("data"), list):
+        images = []
+        for image in data["data"]:
+            if isinstance(image, dict) and isinstance(image.get("b64_json"), str):
+                entry = {key: value for key, value in image.items() if key != "b64_json"}
+                entry["attachment"] = len(attachments)
+                attachments.append(base64.b64decode(image["b64_json"]))
+                images.append(entry)
+            else:
+                images.append(image)
+        header_data = dict(data, data=images)
+
+    else:
+        return message, []
+
+    if not attachments:
+        return message, []
+
+    return dict(message, data=header_data), attachments
+
+
+class WebSocketSender:
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.binary = False
+        self.asset_urls = False
+        self._lock = asyncio.Lock()
+        self._next_frame_id = 0
+
+    @property
+    def client_state(self):
+        return self.websocket.client_state
+
+    async def send_json(self, message: Dict[str, Any]) -> None:
+        attachments: List[bytes] = []
+        if self.binary:
+            message, attachments = split_attachments(message)
+
+        async with self._lock:
+            if not attachments:
+                await self.websocket.send_json(message)
+                return
+
+            frame_id = self._next_frame_id
+            self._next_frame_id = (frame_id + 1) & 0xFFFFFFFF
+
+            await self.websocket.send_json(dict(
+                message,
+                frame_id=frame_id,
+                attachments=len(attachments)
+            ))
+            for index, payload in enumerate(attachments):
+                await self.websocket.send_bytes(BINARY_FRAME_HEADER.pack(frame_id, index) + payload)
@@ -1,9 +1,17 @@
 from .ping_handler import handle_ping
 from .tts_handler import handle_tts
 from .video_handler import handle_video
+from .prefetch_handler import handle_prefetch
+from .hello_handler import handle_hello
+from .cancel_handler import handle_cancel
+from .subscribe_handler import handle_subscribe
 
 __all__ = [
     "handle_ping",
     "handle_tts",
     "handle_video",
+    "handle_prefetch",
+    "handle_hello",
+    "handle_cancel",
+    "handle_subscribe",
 ]
@@ -0,0 +1,31 @@
+from fastapi import WebSocket
+from typing import Dict, Any
+from app.core.connection_scheduler import ConnectionScheduler
+
+
+async def handle_cancel(
+    websocket: WebSocket,
+    message: Dict[str, Any],
+    scheduler: ConnectionScheduler
+) -> None:
+    paragraph_numbers = message.get("paragraph_numbers")
+    if paragraph_numbers is None and message.get("paragraph_number") is not None:
+        paragraph_numbers = [message.get("paragraph_number")]
+    
+    if paragraph_numbers is None:
+        cancelled = scheduler.cancel()
+    elif isinstance(paragraph_numbers, list):
+        cancelled = sum(scheduler.cancel(paragraph_number) for paragraph_number in paragraph_numbers)
+    else:
+        await websocket.send_json({
+            "type": "error",
+            "message": "paragraph_numbers必须是段落编号列表"
+        })
+        return
+    
+    print(f"已取消 {cancelled} 个进行中的任务，段落: {paragraph_numbers if paragraph_numbers is not None else '全部'}")
+    await websocket.send_json({
+        "type": "cancelled",
+        "paragraph_numbers": paragraph_numbers,
+        "count": cancelled
+    })
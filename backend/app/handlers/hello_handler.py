@@ -0,0 +1,18 @@
+from typing import Dict, Any
+from app.core.ws_protocol import WebSocketSender, PROTOCOL_VERSION
+
+
+async def handle_hello(websocket: WebSocketSender, message: Dict[str, Any]) -> None:
+    websocket.binary = bool(message.get("binary", False))
+    websocket.asset_urls = bool(message.get("asset_urls", False))
+
+    await websocket.send_json({
+        "type": "hello",
+        "protocol": PROTOCOL_VERSION,
+        "binary": websocket.binary,
+        "asset_urls": websocket.asset_urls
+    })
+    print(
+        f"WebSocket协议协商完成: 二进制帧={'启用' if websocket.binary else '关闭'}, "
+        f"资源URL={'启用' if websocket.asset_urls else '关闭'}"
+    )
@@ -0,0 +1,21 @@
+from fastapi import WebSocket
+from typing import Dict, Any
+from app.services.prompt_prefetcher import PromptPrefetcher
+
+
+async def handle_prefetch(
+    websocket: WebSocket,
+    message: Dict[str, Any],
+    prompt_prefetcher: PromptPrefetcher
+) -> None:
+    paragraphs = message.get("paragraphs") or []
+    
+    if not isinstance(paragraphs, list):
+        await websocket.send_json({
+            "type": "error",
+            "message": "paragraphs必须是段落文本列表"
+        })
+        return
+    
+    prompt_prefetcher.plan([text for text in paragraphs if isinstance(text, str)])
+    print(f"已登记 {len(paragraphs)} 个段落用于LLM摘要预取")
@@ -0,0 +1,63 @@
+import asyncio
+from fastapi import WebSocket
+from typing import Dict, Any
+from app.core.connection_scheduler import ConnectionScheduler, SchedulerFullError
+from app.services.progress_bus import ProgressBus
+from app.services.task_service import TaskService, status_event
+
+
+async def forward_task_progress(
+    websocket: WebSocket,
+    task_id: str,
+    initial: Dict[str, Any],
+    progress_bus: ProgressBus
+) -> None:
+    async for event in progress_bus.subscribe(task_id, initial=initial):
+        await websocket.send_json({
+            "type": "task_progress",
+            "task_id": task_id,
+            "data": event
+        })
+
+
+async def handle_subscribe(
+    websocket: WebSocket,
+    message: Dict[str, Any],
+    scheduler: ConnectionScheduler,
+    task_service: TaskService,
+    progress_bus: ProgressBus
+) -> None:
+    task_id = message.get("task_id")
+    
+    if not task_id:
+        await websocket.send_json({
+            "type": "error",
+            "message": "task_id不能为空"
+        })
+        return
+    
+    if message.get("action") == "unsubscribe":
+        scheduler.cancel(task_id, kind="subscribe")
+        return
+    
+    status = await asyncio.to_thread(task_service.get_task_status, task_id)
+    if status is None:
+        await websocket.send_json({
+            "type": "error",
+            "message": "任务不存在",
+            "task_id": task_id
+        })
+        return
+    
+    try:
+        scheduler.spawn(
+            "subscribe", task_id,
+            forward_task_progress(websocket, task_id, status_event(status), progress_bus),
+            replace=True
+        )
+    except SchedulerFullError as e:
+        await websocket.send_json({
+            "type": "error",
+            "message": str(e),
+            "task_id": task_id
+        })
@@ -5,6 +5,9 @@ import httpx
 from app.services.qiniu_tts_service import QiniuTTSService
 from app.services.qiniu_image_service import QiniuImageService
 from app.services.qiniu_llm_service import QiniuLLMService
+from app.services.asset_store import AssetStore
+from app.core.connection_scheduler import ConnectionScheduler, SchedulerFullError
+from app.core.config import settings
 
 
 def split_text_by_punctuation(text: str) -> List[str]:
@@ -35,11 +38,28 @@ async def generate_images_background(
     para_num: int, 
     websocket: WebSocket,
     qiniu_image: QiniuImageService,
-    qiniu_llm: QiniuLLMService
+    qiniu_llm: QiniuLLMService,
+    asset_store: AssetStore = None,
+    story_id: str = None
 ) -> None:
     try:
-        print(f"开始生成图片，使用完整段落文本，长度={len(full_paragraph_text)}，段落号={para_num}")
-        image_result = await qiniu_image.text_to_images(full_paragraph_text, qiniu_llm)
+        if story_id:
+            ref_key = AssetStore.ref_key("image", story_id, full_paragraph_text)
+        else:
+            ref_key = AssetStore.ref_key("image", full_paragraph_text)
+        image_result = None
+        if asset_store is not None:
+            image_result = await asyncio.to_thread(asset_store.get_ref, ref_key)
+        
+        if image_result is not None:
+            print(f"图片命中资源缓存，段落={para_num}")
+        else:
+            print(f"开始生成图片，使用完整段落文本，长度={len(full_paragraph_text)}，段落号={para_num}")
+            image_result = await qiniu_image.text_to_images(full_paragraph_text, qiniu_llm, story_id=story_id)
+            if asset_store is not None:
+                image_result = await asyncio.to_thread(asset_store.link_image_result, image_result)
+                await asyncio.to_thread(asset_store.set_ref, ref_key, image_result)
+        
         await websocket.send_json({
             "type": "image_result",
             "data": image_result,
@@ -72,16 +92,42 @@ async def generate_images_background(
         })
 
 
+async def synthesize_sentence(
+    qiniu_tts: QiniuTTSService,
+    semaphore: asyncio.Semaphore,
+    sentence: str,
+    idx: int,
+    asset_store: AssetStore = None
+) -> Dict[str, Any]:
+    ref_key = AssetStore.ref_key("tts", idx == 0, sentence)
+    if asset_store is not None:
+        cached = await asyncio.to_thread(asset_store.get_ref, ref_key)
+        if cached is not None:
+            return cached
+    
+    async with semaphore:
+        tts_result = await qiniu_tts.text_to_speech(sentence, sequence_number=idx)
+    
+    if asset_store is not None:
+        tts_result = await asyncio.to_thread(asset_store.link_tts_result, tts_result)
+        await asyncio.to_thread(asset_store.set_ref, ref_key, tts_result)
+    return tts_result
+
+
 async def handle_tts(
     websocket: WebSocket, 
     message: Dict[str, Any],
     qiniu_tts: QiniuTTSService,
     qiniu_image: QiniuImageService,
-    qiniu_llm: QiniuLLMService
+    qiniu_llm: QiniuLLMService,
+    concurrency: int = None,
+    asset_store: AssetStore = None,
+    scheduler: ConnectionScheduler = None
 ) -> None:
     text = message.get("text", "")
     paragraph_number = message.get("paragraph_number")
     sequence_number = message.get("sequence_number", 0)
+    story_id = message.get("story_id") or message.get("task_id")
     
     if not text:
         await websocket.send_json({
@@ -98,48 +144,73 @@ async def handle_tts(
         "sequence_number": sequence_number
     })
     
-    asyncio.create_task(generate_images_background(
-        text, paragraph_number, websocket, qiniu_image, qiniu_llm
-    ))
+    image_job = generate_images_background(
+        text, paragraph_number, websocket, qiniu_image, qiniu_llm, asset_store, story_id
+    )
+    if scheduler is None:
+        asyncio.create_task(image_job)
+    else:
+        try:
+            scheduler.spawn("image", paragraph_number, image_job, limited=True, replace=True, pool="image")
+        except SchedulerFullError as e:
+            await websocket.send_json({
+                "type": "error",
+                "message": f"图片生成未启动: {str(e)}",
+                "paragraph_number": paragraph_number,
+                "sequence_number": 0
+            })
     
     try:
         sentences = split_text_by_punctuation(text)
         print(f"文本已分割为 {len(sentences)} 个句子")
         
-        for idx, sentence in enumerate(sentences):
-            print(f"处理句子 {idx + 1}/{len(sentences)}: {sentence[:30]}...")
-            
-            try:
-                tts_result = await qiniu_tts.text_to_speech(sentence, sequence_number=idx)
-                
-                await websocket.send_json({
-                    "type": "tts_result",
-                    "data": tts_result,
-                    "text": sentence,
-                    "paragraph_number": paragraph_number,
-                    "sequence_number": idx,
-                    "sentence_index": idx + 1,
-                    "total_sentences": len(sentences)
-                })
-                
-                print(f"句子 {idx + 1} TTS完成")
+        if concurrency is None:
+            concurrency = settings.TTS_SENTENCE_CONCURRENCY
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        loop = asyncio.get_running_loop()
+        tasks = [
+            loop.create_task(synthesize_sentence(qiniu_tts, semaphore, sentence, idx, asset_store))
+            for idx, sentence in enumerate(sentences)
+        ]
+        
+        try:
+            for idx, (sentence, task) in enumerate(zip(sentences, tasks)):
+                print(f"处理句子 {idx + 1}/{len(sentences)}: {sentence[:30]}...")
                 
-            except httpx.HTTPError as e:
-                print(f"句子 {idx + 1} TTS失败: {str(e)}")
-                await websocket.send_json({
-                    "type": "error",
-                    "message": f"句子 {idx + 1} TTS处理失败: {str(e)}",
-                    "paragraph_number": paragraph_number,
-                    "sequence_number": idx
-                })
-            except Exception as e:
-                print(f"句子 {idx + 1} TTS异常: {str(e)}")
-                await websocket.send_json({
-                    "type": "error",
-                    "message": f"句子 {idx + 1} TTS处理失败: {str(e)}",
-                    "paragraph_number": paragraph_number,
-                    "sequence_number": idx
-                })
+                try:
+                    tts_result = await task
+                    
+                    await websocket.send_json({
+                        "type": "tts_result",
+                        "data": tts_result,
+                        "text": sentence,
+                        "paragraph_number": paragraph_number,
+                        "sequence_number": idx,
+                        "sentence_index": idx + 1,
+                        "total_sentences": len(sentences)
+                    })
+                    
+                    print(f"句子 {idx + 1} TTS完成")
+                    
+                except httpx.HTTPError as e:
+                    print(f"句子 {idx + 1} TTS失败: {str(e)}")
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"句子 {idx + 1} TTS处理失败: {str(e)}",
+                        "paragraph_number": paragraph_number,
+                        "sequence_number": idx
+                    })
+                except Exception as e:
+                    print(f"句子 {idx + 1} TTS异常: {str(e)}")
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"句子 {idx + 1} TTS处理失败: {str(e)}",
+                        "paragraph_number": paragraph_number,
+                        "sequence_number": idx
+                    })
+        finally:
+            for task in tasks:
+                task.cancel()
         
         print(f"段落 {paragraph_number} 所有句子TTS完成")
         
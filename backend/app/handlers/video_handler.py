@@ -3,6 +3,8 @@ from typing import Dict, Any
 import asyncio
 from app.services.qiniu_video_service import QiniuVideoService
 from app.services.qiniu_llm_service import QiniuLLMService
+from app.services.video_status_poller import VideoStatusPoller
+from app.core.connection_scheduler import ConnectionScheduler, SchedulerFullError
 
 
 async def generate_video_background(
@@ -12,7 +14,8 @@ async def generate_video_background(
     seq_num: int,
     websocket: WebSocket,
     qiniu_video: QiniuVideoService,
-    qiniu_llm: QiniuLLMService
+    qiniu_llm: QiniuLLMService,
+    video_poller: VideoStatusPoller = None
 ) -> None:
     try:
         llm_result = await qiniu_llm.simplify_text_to_keywords(text)
@@ -39,10 +42,13 @@ async def generate_video_background(
                         "sequence_number": seq_num
                     })
             
-            video_final_result = await qiniu_video.poll_video_status(
-                video_id,
-                progress_callback=send_progress
-            )
+            if video_poller is not None:
+                video_final_result = await video_poller.wait(video_id, progress_callback=send_progress)
+            else:
+                video_final_result = await qiniu_video.poll_video_status(
+                    video_id,
+                    progress_callback=send_progress
+                )
             print("step3 image2video response task status " + video_final_result.get("status"))
             
             if video_final_result.get("status") == "Completed":
@@ -74,7 +80,9 @@ async def handle_video(
     websocket: WebSocket,
     message: Dict[str, Any],
     qiniu_video: QiniuVideoService,
-    qiniu_llm: QiniuLLMService
+    qiniu_llm: QiniuLLMService,
+    scheduler: ConnectionScheduler = None,
+    video_poller: VideoStatusPoller = None
 ) -> None:
     print(f"=== 处理视频生成请求 ===")
     image_base64 = message.get("image_base64", "")
@@ -105,7 +113,19 @@ async def handle_video(
         "sequence_number": sequence_number
     })
     
-    asyncio.create_task(generate_video_background(
+    video_job = generate_video_background(
         text, image_base64, paragraph_number, sequence_number,
-        websocket, qiniu_video, qiniu_llm
-    ))
+        websocket, qiniu_video, qiniu_llm, video_poller
+    )
+    if scheduler is None:
+        asyncio.create_task(video_job)
+    else:
+        try:
+            scheduler.spawn("video_job", paragraph_number, video_job, limited=True, replace=True, pool="video")
+        except SchedulerFullError as e:
+            await websocket.send_json({
+                "type": "error",
+                "message": f"视频生成未启动: {str(e)}",
+                "paragraph_number": paragraph_number,
+                "sequence_number": sequence_number
+            })
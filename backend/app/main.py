@@ -1,13 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+import asyncio
 from pathlib import Path
-from app.api.routes import tts, generate, tasks, websocket, auth
+from app.api.routes import tts, generate, tasks, websocket, auth, assets, metrics
+from app.core.http_client import start_http_client, close_http_client
+from app.services.qiniu_tts_service import prepare_audio_mixing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await prepare_audio_mixing()
+    if tasks.event_relay is not None:
+        tasks.event_relay.start()
+    yield
+    await websocket.video_status_poller.close()
+    if tasks.event_relay is not None:
+        await tasks.event_relay.close()
+        tasks.job_broker.close()
+    await asyncio.to_thread(tasks.job_executor.shutdown, 5.0)
+    tasks.task_service.close()
+    await close_http_client()
+
 
 app = FastAPI(
     title="Novel to Anime API",
     description="API for converting text to speech and generating anime videos from novels",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,6 +49,8 @@ app.include_router(generate.router, prefix="/api", tags=["Generate"])
 app.include_router(tasks.router, prefix="/api", tags=["Tasks"])
 app.include_router(websocket.router, prefix="/api", tags=["WebSocket"])
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+app.include_router(assets.router, prefix="/api", tags=["Assets"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from enum import Enum
 
@@ -21,17 +21,20 @@ class TaskConfig(BaseModel):
 class TextTaskRequest(BaseModel):
     text: str
     config: Optional[TaskConfig] = None
+    priority: int = Field(0, ge=-10, le=10)
 
 
 class URLTaskRequest(BaseModel):
     url: str
     config: Optional[TaskConfig] = None
+    priority: int = Field(0, ge=-10, le=10)
 
 
 class TaskResponse(BaseModel):
     task_id: str
     status: TaskStatus
     message: Optional[str] = None
+    queue_position: Optional[int] = None
 
 
 class TaskStatusResponse(BaseModel):
@@ -42,6 +45,14 @@ class TaskStatusResponse(BaseModel):
     total_scenes: Optional[int] = None
     processed_scenes: Optional[int] = None
     error: Optional[str] = None
+    queue_position: Optional[int] = None
+
+
+class TaskListResponse(BaseModel):
+    tasks: List[TaskStatusResponse]
+    total: int
+    limit: int
+    offset: int
 
 
 class TaskResultResponse(BaseModel):
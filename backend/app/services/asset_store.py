@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "bin": "application/octet-stream",
+}
+
+ASSET_NAME_PATTERN = re.compile(r'^([0-9a-f]{64})\.(' + '|'.join(CONTENT_TYPES) + r')$')
+
+
+def sniff_extension(data: bytes) -> str:
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "png"
+    if data.startswith(b'\xff\xd8\xff'):
+        return "jpeg"
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return "webp"
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return "wav"
+    if data.startswith(b'ID3') or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "bin"
+
+
+class AssetStore:
+
+    def __init__(self, root: str = None, url_prefix: str = "/api/assets"):
+        self.root = Path(root or settings.ASSET_STORE_DIR)
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def _blob_path(self, digest: str, extension: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.{extension}"
+
+    def _ref_path(self, key: str) -> Path:
+        return self.root / "refs" / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def ref_key(*parts) -> str:
+        return json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put(self, data: bytes) -> Dict[str, Any]:
+        digest = hashlib.sha256(data).hexdigest()
+        extension = sniff_extension(data)
+        path = self._blob_path(digest, extension)
+
+        if not path.exists():
+            self._write_atomic(path, data)
+
+        return {
+            "url": f"{self.url_prefix}/{digest}.{extension}",
+            "sha256": digest,
+            "size": len(data),
+            "content_type": CONTENT_TYPES[extension]
+        }
+
+    def resolve(self, name: str) -> Optional[Path]:
+        match = ASSET_NAME_PATTERN.match(name)
+        if not match:
+            return None
+
+        path = self._blob_path(match.group(1), match.group(2))
+        return path if path.is_file() else None
+
+    def get_ref(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._ref_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for url in self._ref_urls(value):
+            if self.resolve(url.rsplit("/", 1)[-1]) is None:
+                return None
+        return value
+
+    def set_ref(self, key: str, value: Dict[str, Any]) -> None:
+        self._write_atomic(self._ref_path(key), json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def _ref_urls(self, value: Dict[str, Any]):
+        if isinstance(value.get("url"), str):
+            yield value["url"]
+        for item in value.get("data", []) if isinstance(value.get("data"), list) else []:
+            if isinstance(item, dict) and isinstance(item.get("url"), str):
+                yield item["url"]
+
+    def link_tts_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(result.get("data"), str):
+            return result
+
+        asset = self.put(base64.b64decode(result["data"]))
+        linked = {key: value for key, value in result.items() if key != "data"}
+        linked.update(asset)
+        return linked
+
+    def link_image_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(result.get("data"), list):
+            return result
+
+        images = []
+        for image in result["data"]:
+            if isinstance(image, dict) and isinstance(image.get("b64_json"), str):
+                entry = {key: value for key, value in image.items() if key != "b64_json"}
+                entry.update(self.put(base64.b64decode(image["b64_json"])))
+                images.append(entry)
+            else:
+                images.append(image)
+        return dict(result, data=images)
+
+
+_store: Optional[AssetStore] = None
+
+
+def get_asset_store() -> AssetStore:
+    global _store
+    if _store is None:
+        _store = AssetStore()
+    return _store
@@ -0,0 +1,155 @@
+import asyncio
+import io
+import shutil
+import wave
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from app.core.config import settings
+
+try:
+    import lameenc
+except ImportError:
+    lameenc = None
+
+
+class AudioMixer:
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        speech_gain: float = 1.0,
+        background_gain: float = 0.3,
+        bitrate: int = 128
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.speech_gain = speech_gain
+        self.background_gain = background_gain
+        self.bitrate = bitrate
+        self.background: Optional[np.ndarray] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.background is not None and lameenc is not None
+
+    def set_background(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples, dtype=np.float32)
+        self.background = self._to_channels(samples) * np.float32(self.background_gain)
+
+    async def load_background(self, path: Path) -> bool:
+        if not path.is_file():
+            print(f"背景音乐文件不存在: {path}，进程内混音已禁用")
+            return False
+
+        if shutil.which('ffmpeg') is None:
+            print("ffmpeg未安装，无法解码背景音乐，进程内混音已禁用")
+            return False
+
+        process = await asyncio.create_subprocess_exec(
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-i', str(path),
+            '-f', 'f32le',
+            '-ac', str(self.channels),
+            '-ar', str(self.sample_rate),
+            'pipe:1',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        pcm, stderr = await process.communicate()
+
+        if process.returncode != 0 or not pcm:
+            print(f"背景音乐解码失败: {stderr.decode('utf-8', errors='replace')}")
+            return False
+
+        self.set_background(np.frombuffer(pcm, dtype='<f4').reshape(-1, self.channels))
+        print(f"背景音乐已解码到内存: {len(self.background) / self.sample_rate:.1f}秒")
+        return True
+
+    def decode_wav(self, data: bytes) -> np.ndarray:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            sample_width = wav.getsampwidth()
+            source_channels = wav.getnchannels()
+            source_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+
+        if sample_width == 1:
+            samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif sample_width == 2:
+            samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+        elif sample_width == 4:
+            samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+        else:
+            raise ValueError(f"不支持的WAV采样位宽: {sample_width * 8}bit")
+
+        samples = self._to_channels(samples.reshape(-1, source_channels))
+        return self._resample(samples, source_rate)
+
+    def mix(self, speech: np.ndarray) -> np.ndarray:
+        speech = self._to_channels(np.asarray(speech, dtype=np.float32))
+        background = self.background if self.background is not None else speech[:0]
+
+        length = max(len(speech), len(background))
+        mixed = np.zeros((length, self.channels), dtype=np.float32)
+        mixed[:len(speech)] += speech * np.float32(self.speech_gain)
+        mixed[:len(background)] += background
+        active = np.zeros((length, 1), dtype=np.float32)
+        active[:len(speech)] += 1
+        active[:len(background)] += 1
+        mixed /= np.maximum(active, 1)
+        return np.clip(mixed, -1.0, 1.0, out=mixed)
+
+    def encode_mp3(self, samples: np.ndarray) -> bytes:
+        if lameenc is None:
+            raise RuntimeError("lameenc未安装，无法进行MP3编码")
+
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(self.bitrate)
+        encoder.set_in_sample_rate(self.sample_rate)
+        encoder.set_channels(self.channels)
+        encoder.set_quality(2)
+        pcm = (samples * 32767.0).astype('<i2').tobytes()
+        return bytes(encoder.encode(pcm) + encoder.flush())
+
+    def mix_wav_to_mp3(self, data: bytes) -> bytes:
+        return self.encode_mp3(self.mix(self.decode_wav(data)))
+
+    def wav_to_mp3(self, data: bytes) -> bytes:
+        return self.encode_mp3(self.decode_wav(data))
+
+    def _to_channels(self, samples: np.ndarray) -> np.ndarray:
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        if samples.shape[1] == self.channels:
+            return samples
+        if self.channels == 1:
+            return samples.mean(axis=1, keepdims=True)
+        return np.repeat(samples[:, :1], self.channels, axis=1)
+
+    def _resample(self, samples: np.ndarray, source_rate: int) -> np.ndarray:
+        if source_rate == self.sample_rate or len(samples) == 0:
+            return samples
+
+        target_length = int(round(len(samples) * self.sample_rate / source_rate))
+        source_positions = np.arange(len(samples), dtype=np.float64)
+        target_positions = np.linspace(0, len(samples) - 1, target_length)
+        return np.stack(
+            [np.interp(target_positions, source_positions, samples[:, c]) for c in range(self.channels)],
+            axis=1
+        ).astype(np.float32)
+
+
+_mixer: Optional[AudioMixer] = None
+
+
+def get_audio_mixer() -> AudioMixer:
+    global _mixer
+    if _mixer is None:
+        _mixer = AudioMixer(
+            sample_rate=settings.AUDIO_MIX_SAMPLE_RATE,
+            background_gain=settings.BACKGROUND_MUSIC_GAIN,
+            bitrate=settings.AUDIO_MIX_BITRATE
+        )
+    return _mixer
@@ -0,0 +1,236 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+CONSISTENCY_KINDS = ("scene", "character")
+
+EntryKey = Tuple[str, str]
+
+
+def story_id_for(paragraphs: List[str]) -> str:
+    text = "\n".join(paragraph.strip() for paragraph in paragraphs if isinstance(paragraph, str))
+    return "story-" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class StoryContext:
+
+    def __init__(self, story_id: str):
+        self.story_id = story_id
+        self.entries: "OrderedDict[EntryKey, str]" = OrderedDict()
+        self.size = 0
+
+    @staticmethod
+    def entry_size(key: EntryKey, info: str) -> int:
+        return len(key[1].encode('utf-8')) + len(info.encode('utf-8'))
+
+
+class ConsistencyCache:
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_stories: int = 256,
+        max_entries_per_story: int = 64,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl: Optional[float] = None
+    ):
+        self.max_stories = max(1, max_stories)
+        self.max_entries_per_story = max(1, max_entries_per_story)
+        self.max_bytes = max(1, max_bytes)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._stories: "OrderedDict[str, StoryContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.evictions = 0
+        self.disk_loads = 0
+
+        self._db = None
+        if path:
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS consistency_entries ("
+                "story_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, "
+                "info TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (story_id, kind, name))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_consistency_updated "
+                "ON consistency_entries (story_id, updated_at)"
+            )
+            self._db.commit()
+            self.purge_expired()
+
+    def _load_story(self, story_id: str, create: bool = True) -> Optional[StoryContext]:
+        story = self._stories.get(story_id)
+        if story is not None:
+            self._stories.move_to_end(story_id)
+            return story
+
+        story = StoryContext(story_id)
+        if self._db is not None:
+            rows = self._db.execute(
+                "SELECT kind, name, info FROM consistency_entries WHERE story_id = ? "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (story_id, self.max_entries_per_story)
+            ).fetchall()
+            for kind, name, info in reversed(rows):
+                self._put_entry(story, (kind, name), info)
+            if rows:
+                self.disk_loads += 1
+
+        if not story.entries and not create:
+            return None
+        self._stories[story_id] = story
+        self._evict()
+        return story
+
+    def _trim_oldest(self, story: StoryContext) -> None:
+        old_key, old_info = story.entries.popitem(last=False)
+        freed = StoryContext.entry_size(old_key, old_info)
+        story.size -= freed
+        self.size -= freed
+        self.evictions += 1
+
+    def _put_entry(self, story: StoryContext, key: EntryKey, info: str) -> None:
+        previous = story.entries.pop(key, None)
+        if previous is not None:
+            freed = StoryContext.entry_size(key, previous)
+            story.size -= freed
+            self.size -= freed
+
+        story.entries[key] = info
+        added = StoryContext.entry_size(key, info)
+        story.size += added
+        self.size += added
+
+        while len(story.entries) > self.max_entries_per_story:
+            self._trim_oldest(story)
+
+    def _evict(self) -> None:
+        while len(self._stories) > self.max_stories or (len(self._stories) > 1 and self.size > self.max_bytes):
+            _, story = self._stories.popitem(last=False)
+            self.size -= story.size
+            self.evictions += len(story.entries)
+
+        for story in self._stories.values():
+            while len(story.entries) > 1 and self.size > self.max_bytes:
+                self._trim_oldest(story)
+
+    def lookup(self, story_id: str, kind: str, name: str) -> Optional[str]:
+        with self._lock:
+            story = self._load_story(story_id, create=False)
+            if story is None:
+                return None
+            info = story.entries.get((kind, name))
+            if info is not None:
+                story.entries.move_to_end((kind, name))
+                return info
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT info FROM consistency_entries WHERE story_id = ? AND kind = ? AND name = ?",
+                (story_id, kind, name)
+            ).fetchone()
+            if row is None:
+                return None
+            self._put_entry(story, (kind, name), row[0])
+            self._evict()
+            return row[0]
+
+    def remember(self, story_id: str, kind: str, name: str, info: str) -> None:
+        if kind not in CONSISTENCY_KINDS:
+            raise ValueError(f"未知的一致性类型: {kind}")
+
+        with self._lock:
+            story = self._load_story(story_id)
+            if story.entries.get((kind, name)) == info:
+                story.entries.move_to_end((kind, name))
+                return
+            self._put_entry(story, (kind, name), info)
+            self._evict()
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO consistency_entries (story_id, kind, name, info, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (story_id, kind, name, info, time.time())
+                )
+                self._db.execute(
+                    "DELETE FROM consistency_entries WHERE story_id = ? AND rowid NOT IN ("
+                    "SELECT rowid FROM consistency_entries WHERE story_id = ? "
+                    "ORDER BY updated_at DESC LIMIT ?)",
+                    (story_id, story_id, self.max_entries_per_story)
+                )
+                self._db.commit()
+
+    def story_snapshot(self, story_id: str) -> Dict[str, Dict[str, str]]:
+        with self._lock:
+            story = self._load_story(story_id, create=False)
+            snapshot = {kind: {} for kind in CONSISTENCY_KINDS}
+            for (kind, name), info in (story.entries.items() if story else ()):
+                snapshot[kind][name] = info
+            return snapshot
+
+    def forget_story(self, story_id: str) -> None:
+        with self._lock:
+            story = self._stories.pop(story_id, None)
+            if story is not None:
+                self.size -= story.size
+            if self._db is not None:
+                self._db.execute("DELETE FROM consistency_entries WHERE story_id = ?", (story_id,))
+                self._db.commit()
+
+    def purge_expired(self) -> int:
+        if self._db is None or self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM consistency_entries WHERE story_id IN ("
+                "SELECT story_id FROM consistency_entries GROUP BY story_id HAVING MAX(updated_at) <= ?)",
+                (time.time() - self.ttl,)
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stories": len(self._stories),
+                "entries": sum(len(story.entries) for story in self._stories.values()),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "disk_loads": self.disk_loads,
+                "persistent": self._db is not None
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_consistency_cache: Optional[ConsistencyCache] = None
+
+
+def get_consistency_cache() -> ConsistencyCache:
+    global _consistency_cache
+    if _consistency_cache is None:
+        _consistency_cache = ConsistencyCache(
+            settings.CONSISTENCY_CACHE_PATH or None,
+            max_stories=settings.CONSISTENCY_CACHE_MAX_STORIES,
+            max_entries_per_story=settings.CONSISTENCY_CACHE_MAX_ENTRIES_PER_STORY,
+            max_bytes=settings.CONSISTENCY_CACHE_MAX_BYTES,
+            ttl=settings.CONSISTENCY_CACHE_TTL
+        )
+    return _consistency_cache
@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 from pathlib import Path
 from typing import Dict, Callable, Optional
 
@@ -8,11 +9,99 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from novel_to_anime import NovelToAnimeConverter
 from app.models.task import TaskStatus
 from app.services.task_service import TaskService
+from app.services.progress_bus import ProgressBus, get_progress_bus
+
+STAGE_STEPS = {
+    "parsing": "解析文本",
+    "parsed": "解析完成",
+    "image": "生成场景图片",
+    "audio": "生成语音旁白",
+    "encoding": "合成视频"
+}
+
+
+class ConversionProgress:
+    
+    def __init__(self, task_id: str, report: Callable):
+        self.task_id = task_id
+        self.report = report
+        self.total = 0
+        self.completed = {"image": 0, "audio": 0}
+        self.progress = 10
+        self._lock = threading.Lock()
+    
+    def __call__(self, event: Dict):
+        with self._lock:
+            self._handle(event)
+    
+    def _handle(self, event: Dict):
+        stage = event.get("stage")
+        
+        if stage == "parsing":
+            self.total = max(self.total, event.get("current", 0))
+            progress = 10
+        elif stage == "parsed":
+            self.total = event.get("total", self.total)
+            progress = 10
+        elif stage in self.completed:
+            self.completed[stage] = event.get("current", 0)
+            self.total = max(self.total, event.get("total", 0))
+            done = sum(self.completed.values())
+            progress = 10 + int(70 * done / (2 * self.total)) if self.total else 10
+        elif stage == "encoding":
+            progress = 80 + int(19 * event.get("percent", 0) / 100)
+        else:
+            return
+        
+        self.progress = max(self.progress, min(progress, 99))
+        self.report(
+            self.task_id,
+            TaskStatus.PROCESSING,
+            progress=self.progress,
+            current_step=STAGE_STEPS[stage],
+            total_scenes=self.total or None,
+            processed_scenes=min(self.completed.values()),
+            event=event
+        )
 
 
 class ConverterService:
-    def __init__(self, task_service: TaskService):
+    def __init__(self, task_service: TaskService, progress_bus: ProgressBus = None):
         self.task_service = task_service
+        self.progress_bus = progress_bus or get_progress_bus()
+    
+    def report_progress(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        progress: int = 0,
+        current_step: str = None,
+        total_scenes: int = None,
+        processed_scenes: int = None,
+        video_path: str = None,
+        error: str = None,
+        event: Optional[Dict] = None
+    ):
+        self.task_service.update_task_status(
+            task_id,
+            status,
+            progress=progress,
+            current_step=current_step,
+            total_scenes=total_scenes,
+            processed_scenes=processed_scenes,
+            video_path=video_path,
+            error=error
+        )
+        self.progress_bus.publish(task_id, {
+            "status": status.value,
+            "progress": progress,
+            "current_step": current_step,
+            "total_scenes": total_scenes,
+            "processed_scenes": processed_scenes,
+            "video_url": video_path,
+            "error": error,
+            "event": event
+        })
     
     def process_text_task(
         self,
@@ -21,7 +110,7 @@ class ConverterService:
         config: Dict
     ):
         try:
-            self.task_service.update_task_status(
+            self.report_progress(
                 task_id,
                 TaskStatus.PROCESSING,
                 progress=0,
@@ -36,28 +125,33 @@ class ConverterService:
             with open(temp_novel_path, 'w', encoding='utf-8') as f:
                 f.write(text)
             
-            self.task_service.update_task_status(
+            self.report_progress(
                 task_id,
                 TaskStatus.PROCESSING,
                 progress=10,
                 current_step="解析文本"
             )
             
+            progress = ConversionProgress(task_id, self.report_progress)
             video_name = f"{task_id}.mp4"
-            video_path = converter.convert(temp_novel_path, output_dir, video_name)
+            video_path = converter.convert(
+                temp_novel_path, output_dir, video_name, progress_callback=progress
+            )
             
             relative_video_path = f"/output/{task_id}/{video_name}"
             
-            self.task_service.update_task_status(
+            self.report_progress(
                 task_id,
                 TaskStatus.COMPLETED,
                 progress=100,
                 current_step="完成",
+                total_scenes=progress.total or None,
+                processed_scenes=progress.total or None,
                 video_path=relative_video_path
             )
             
         except Exception as e:
-            self.task_service.update_task_status(
+            self.report_progress(
                 task_id,
                 TaskStatus.FAILED,
                 progress=0,
@@ -0,0 +1,370 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services.job_executor import JobQueueFullError, get_job_executor
+from app.services.progress_bus import ProgressBus
+
+
+class LeasedJob:
+
+    def __init__(self, job_id: str, owner: str, payload: Dict[str, Any], attempts: int, lease_expires: float):
+        self.job_id = job_id
+        self.owner = owner
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_expires = lease_expires
+
+
+class SQLiteJobBroker:
+
+    def __init__(
+        self,
+        path: str = "tasks/jobs.sqlite3",
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        max_queue: int = 100,
+        max_queued_per_owner: int = 5,
+        retry_after: int = 30
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.max_queue = max_queue
+        self.max_queued_per_owner = max_queued_per_owner
+        self.retry_after = retry_after
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, owner TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, "
+                "payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "lease_owner TEXT, lease_expires REAL, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_dispatch ON jobs (status, priority DESC, created_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_owners (owner TEXT PRIMARY KEY, last_leased REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, task_id TEXT NOT NULL, "
+                "event TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_events_created ON job_events (created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _check_capacity(self, conn: sqlite3.Connection, owner: str) -> None:
+        queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        if queued >= self.max_queue:
+            raise JobQueueFullError(
+                f"任务队列已满（上限{self.max_queue}），请稍后重试", queued, self.retry_after
+            )
+        owned = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND owner = ?", (owner,)
+        ).fetchone()[0]
+        if owned >= self.max_queued_per_owner:
+            raise JobQueueFullError(
+                f"排队中的任务过多（每个用户上限{self.max_queued_per_owner}），请等待已提交的任务开始处理",
+                queued,
+                self.retry_after
+            )
+
+    def ensure_capacity(self, owner: str) -> None:
+        self._check_capacity(self._connect(), owner)
+
+    def enqueue(
+        self,
+        job_id: str,
+        owner: str,
+        payload: Dict[str, Any] = None,
+        priority: int = 0
+    ) -> Optional[int]:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._check_capacity(conn, owner)
+            conn.execute(
+                "INSERT INTO jobs (job_id, owner, priority, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, owner, priority, json.dumps(payload or {}, ensure_ascii=False), now, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.position(job_id)
+
+    def _dispatch_order(self, conn: sqlite3.Connection, now: float) -> List[str]:
+        rows = conn.execute(
+            "SELECT job_id, jobs.owner, created_at, COALESCE(last_leased, 0) AS last_leased FROM jobs "
+            "LEFT JOIN job_owners ON job_owners.owner = jobs.owner "
+            "WHERE (status = 'queued' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ? "
+            "ORDER BY priority DESC, created_at",
+            (now, self.max_attempts)
+        ).fetchall()
+        queues: Dict[str, List[sqlite3.Row]] = {}
+        last_leased: Dict[str, float] = {}
+        for row in rows:
+            queues.setdefault(row["owner"], []).append(row)
+            last_leased[row["owner"]] = row["last_leased"]
+
+        tick = max(last_leased.values(), default=0)
+        order = []
+        while queues:
+            owner = min(
+                queues,
+                key=lambda owner: (last_leased[owner], min(row["created_at"] for row in queues[owner]))
+            )
+            order.append(queues[owner].pop(0)["job_id"])
+            if not queues[owner]:
+                del queues[owner]
+            tick += 1
+            last_leased[owner] = tick
+        return order
+
+    def position(self, job_id: str) -> Optional[int]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT status, lease_expires FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or row["status"] in ("done", "failed"):
+            return None
+        if row["status"] == "leased" and row["lease_expires"] >= now:
+            return 0
+        order = self._dispatch_order(conn, now)
+        return order.index(job_id) + 1 if job_id in order else None
+
+    def lease(self, worker_id: str) -> Optional[LeasedJob]:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id, owner, payload, attempts FROM ("
+                "SELECT *, MIN(created_at) OVER (PARTITION BY owner) AS owner_since FROM jobs "
+                "WHERE (status = 'queued' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ?"
+                ") AS eligible LEFT JOIN job_owners USING (owner) "
+                "ORDER BY COALESCE(last_leased, 0), owner_since, priority DESC, created_at LIMIT 1",
+                (now, self.max_attempts)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            lease_expires = now + self.lease_seconds
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE job_id = ?",
+                (worker_id, lease_expires, now, row["job_id"])
+            )
+            conn.execute(
+                "INSERT INTO job_owners (owner, last_leased) VALUES (?, ?) "
+                "ON CONFLICT (owner) DO UPDATE SET last_leased = excluded.last_leased",
+                (row["owner"], now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return LeasedJob(
+            row["job_id"], row["owner"], json.loads(row["payload"]), row["attempts"] + 1, lease_expires
+        )
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, job_id, worker_id)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        return self._finish(job_id, worker_id, "done", None)
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False) -> bool:
+        if retry:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires = NULL, "
+                "error = ?, updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+                (error, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount > 0
+        return self._finish(job_id, worker_id, "failed", error)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, error: Optional[str]) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+            (status, error, time.time(), job_id, worker_id)
+        )
+        return cursor.rowcount > 0
+
+    def reap_expired(self) -> List[str]:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            ).fetchall()
+            job_ids = [row["job_id"] for row in rows]
+            for job_id in job_ids:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, "
+                    "lease_expires = NULL, updated_at = ? WHERE job_id = ?",
+                    (f"任务执行超时，已重试{self.max_attempts}次", now, job_id)
+                )
+            conn.execute(
+                "DELETE FROM job_owners WHERE owner NOT IN "
+                "(SELECT owner FROM jobs WHERE status IN ('queued', 'leased'))"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_ids
+
+    def publish(self, task_id: str, event: Dict[str, Any]) -> None:
+        self._connect().execute(
+            "INSERT INTO job_events (task_id, event, created_at) VALUES (?, ?, ?)",
+            (task_id, json.dumps(event, ensure_ascii=False), time.time())
+        )
+
+    def last_event_id(self) -> int:
+        return self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM job_events").fetchone()[0]
+
+    def read_events(self, after_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT id, task_id, event FROM job_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        ).fetchall()
+        return [
+            {"id": row["id"], "task_id": row["task_id"], "event": json.loads(row["event"])}
+            for row in rows
+        ]
+
+    def prune_events(self, older_than: float) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM job_events WHERE created_at < ?", (time.time() - older_than,)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {row[0]: row[1] for row in rows}
+        return {
+            "backend": "broker",
+            "queued": counts.get("queued", 0),
+            "leased": counts.get("leased", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "max_queue": self.max_queue
+        }
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class BrokerEventRelay:
+
+    def __init__(
+        self,
+        broker: SQLiteJobBroker,
+        progress_bus: ProgressBus,
+        interval: float = 0.5,
+        retention: float = 3600.0
+    ):
+        self.broker = broker
+        self.progress_bus = progress_bus
+        self.interval = interval
+        self.retention = retention
+        self._task: Optional[asyncio.Task] = None
+        self.relayed = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        last_id = await asyncio.to_thread(self.broker.last_event_id)
+        last_prune = time.monotonic()
+        while True:
+            try:
+                events = await asyncio.to_thread(self.broker.read_events, last_id)
+                for item in events:
+                    self.progress_bus.publish(item["task_id"], item["event"])
+                    last_id = item["id"]
+                    self.relayed += 1
+                if time.monotonic() - last_prune > self.retention / 10:
+                    last_prune = time.monotonic()
+                    await asyncio.to_thread(self.broker.prune_events, self.retention)
+                if events:
+                    continue
+            except Exception as e:
+                print(f"转发任务进度事件失败: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_broker: Optional[SQLiteJobBroker] = None
+
+
+def get_job_broker() -> SQLiteJobBroker:
+    global _broker
+    if _broker is None:
+        _broker = SQLiteJobBroker(
+            settings.JOB_BROKER_PATH,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            max_queue=settings.JOB_MAX_QUEUE,
+            max_queued_per_owner=settings.JOB_MAX_QUEUED_PER_USER,
+            retry_after=settings.JOB_RETRY_AFTER
+        )
+    return _broker
+
+
+def use_job_broker() -> bool:
+    return settings.JOB_BACKEND == "broker"
+
+
+def get_job_queue():
+    return get_job_broker() if use_job_broker() else get_job_executor()
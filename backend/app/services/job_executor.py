@@ -0,0 +1,237 @@
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+
+
+class JobQueueFullError(Exception):
+
+    def __init__(self, message: str, queue_length: int, retry_after: int):
+        super().__init__(message)
+        self.queue_length = queue_length
+        self.retry_after = retry_after
+
+
+class Job:
+
+    def __init__(
+        self,
+        job_id: str,
+        owner: str,
+        fn: Callable[[], Any],
+        priority: int,
+        sequence: int,
+        on_cancel: Optional[Callable[[], None]] = None
+    ):
+        self.job_id = job_id
+        self.owner = owner
+        self.fn = fn
+        self.priority = priority
+        self.sequence = sequence
+        self.on_cancel = on_cancel
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+
+
+class JobExecutor:
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 100,
+        max_queued_per_owner: int = 5,
+        retry_after: int = 30
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.max_queued_per_owner = max(1, max_queued_per_owner)
+        self.retry_after = retry_after
+        self._queues: Dict[str, List[Job]] = {}
+        self._last_served: Dict[str, int] = {}
+        self._running: Dict[str, Job] = {}
+        self._sequence = itertools.count()
+        self._ticks = itertools.count(1)
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def queued_count(self) -> int:
+        return sum(len(jobs) for jobs in self._queues.values())
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._run_worker,
+                name=f"job-worker-{len(self._workers)}",
+                daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _check_capacity(self, owner: str) -> None:
+        if self._closed:
+            raise JobQueueFullError("任务执行器已关闭", self.queued_count, self.retry_after)
+        if self.queued_count >= self.max_queue:
+            self.rejected += 1
+            raise JobQueueFullError(
+                f"任务队列已满（上限{self.max_queue}），请稍后重试",
+                self.queued_count,
+                self.retry_after
+            )
+        if len(self._queues.get(owner, ())) >= self.max_queued_per_owner:
+            self.rejected += 1
+            raise JobQueueFullError(
+                f"排队中的任务过多（每个用户上限{self.max_queued_per_owner}），请等待已提交的任务开始处理",
+                self.queued_count,
+                self.retry_after
+            )
+
+    def ensure_capacity(self, owner: str) -> None:
+        with self._condition:
+            self._check_capacity(owner)
+
+    def submit(
+        self,
+        job_id: str,
+        owner: str,
+        fn: Callable[[], Any],
+        priority: int = 0,
+        on_cancel: Optional[Callable[[], None]] = None
+    ) -> int:
+        with self._condition:
+            self._check_capacity(owner)
+            job = Job(job_id, owner, fn, priority, next(self._sequence), on_cancel)
+            jobs = self._queues.setdefault(owner, [])
+            jobs.append(job)
+            jobs.sort(key=lambda queued: (-queued.priority, queued.sequence))
+            self._start_workers()
+            self._condition.notify()
+            return self._position(job_id)
+
+    def _dispatch_order(self) -> List[Job]:
+        queues = {owner: list(jobs) for owner, jobs in self._queues.items() if jobs}
+        last_served = dict(self._last_served)
+        tick = max(last_served.values(), default=0)
+        order = []
+        while queues:
+            owner = self._pick_owner(queues, last_served)
+            order.append(queues[owner].pop(0))
+            if not queues[owner]:
+                del queues[owner]
+            tick += 1
+            last_served[owner] = tick
+        return order
+
+    @staticmethod
+    def _pick_owner(queues: Dict[str, List[Job]], last_served: Dict[str, int]) -> str:
+        return min(
+            queues,
+            key=lambda owner: (
+                last_served.get(owner, 0),
+                min(job.sequence for job in queues[owner])
+            )
+        )
+
+    def _position(self, job_id: str) -> Optional[int]:
+        for index, job in enumerate(self._dispatch_order()):
+            if job.job_id == job_id:
+                return index + 1
+        return None
+
+    def position(self, job_id: str) -> Optional[int]:
+        with self._condition:
+            if job_id in self._running:
+                return 0
+            return self._position(job_id)
+
+    def _next_job(self) -> Optional[Job]:
+        with self._condition:
+            while not self._closed and not any(self._queues.values()):
+                self._condition.wait()
+            if self._closed:
+                return None
+
+            queues = {owner: jobs for owner, jobs in self._queues.items() if jobs}
+            owner = self._pick_owner(queues, self._last_served)
+            job = self._queues[owner].pop(0)
+            if not self._queues[owner]:
+                del self._queues[owner]
+            self._last_served[owner] = next(self._ticks)
+            job.started_at = time.time()
+            self._running[job.job_id] = job
+            return job
+
+    def _run_worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            succeeded = False
+            try:
+                job.fn()
+                succeeded = True
+            except Exception as e:
+                print(f"后台任务 {job.job_id} 执行失败: {str(e)}")
+            finally:
+                with self._condition:
+                    if succeeded:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    self._running.pop(job.job_id, None)
+                    if not self._queues.get(job.owner) and job.owner not in {
+                        running.owner for running in self._running.values()
+                    }:
+                        self._last_served.pop(job.owner, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "backend": "local",
+                "workers": self.max_workers,
+                "running": len(self._running),
+                "queued": self.queued_count,
+                "max_queue": self.max_queue,
+                "owners": len([jobs for jobs in self._queues.values() if jobs]),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, timeout: float = None) -> int:
+        with self._condition:
+            self._closed = True
+            cancelled = [job for jobs in self._queues.values() for job in jobs]
+            self._queues.clear()
+            self._condition.notify_all()
+
+        for job in cancelled:
+            if job.on_cancel is not None:
+                try:
+                    job.on_cancel()
+                except Exception as e:
+                    print(f"取消任务 {job.job_id} 失败: {str(e)}")
+
+        for worker in self._workers:
+            worker.join(timeout)
+        return len(cancelled)
+
+
+_executor: Optional[JobExecutor] = None
+
+
+def get_job_executor() -> JobExecutor:
+    global _executor
+    if _executor is None:
+        _executor = JobExecutor(
+            max_workers=settings.JOB_WORKERS,
+            max_queue=settings.JOB_MAX_QUEUE,
+            max_queued_per_owner=settings.JOB_MAX_QUEUED_PER_USER,
+            retry_after=settings.JOB_RETRY_AFTER
+        )
+    return _executor
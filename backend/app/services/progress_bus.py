@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.models.task import TaskStatus
+
+TERMINAL_STATUSES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+
+Subscriber = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    status = event.get("status")
+    if isinstance(status, TaskStatus):
+        status = status.value
+    return status in TERMINAL_STATUSES
+
+
+class ProgressBus:
+
+    def __init__(self, max_queue: int = 64, max_retained: int = 1024):
+        self.max_queue = max(1, max_queue)
+        self.max_retained = max(1, max_retained)
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def latest(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            event = self._latest.get(task_id)
+            return dict(event) if event is not None else None
+
+    def subscriber_count(self, task_id: str = None) -> int:
+        with self._lock:
+            if task_id is not None:
+                return len(self._subscribers.get(task_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, task_id: str, event: Dict[str, Any]) -> None:
+        event = dict(event, task_id=task_id, timestamp=time.time())
+        with self._lock:
+            self.published += 1
+            self._latest[task_id] = event
+            self._latest.move_to_end(task_id)
+            while len(self._latest) > self.max_retained:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(task_id, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                pass
+
+    def _offer(self, queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(event)
+
+    async def subscribe(
+        self,
+        task_id: str,
+        initial: Optional[Dict[str, Any]] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append(subscriber)
+            latest = self._latest.get(task_id)
+
+        try:
+            first = dict(latest) if latest is not None else initial
+            if first is not None:
+                yield first
+                if is_terminal(first):
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if is_terminal(event):
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(task_id, [])
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(task_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tasks": len(self._latest),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "published": self.published,
+                "dropped": self.dropped
+            }
+
+
+_bus: Optional[ProgressBus] = None
+
+
+def get_progress_bus() -> ProgressBus:
+    global _bus
+    if _bus is None:
+        _bus = ProgressBus()
+    return _bus
@@ -0,0 +1,66 @@
+import asyncio
+import itertools
+from collections import deque
+from typing import Deque, Dict, Any, List
+from app.services.qiniu_llm_service import QiniuLLMService
+
+
+class PromptPrefetcher:
+
+    def __init__(self, llm_service: QiniuLLMService, lookahead: int = 3, max_queue: int = 64):
+        self.llm_service = llm_service
+        self.lookahead = max(1, lookahead)
+        self.max_queue = max(0, max_queue)
+        self._queue: Deque[str] = deque()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, paragraphs: List[str]) -> None:
+        for text in paragraphs:
+            if len(self._queue) >= self.max_queue:
+                break
+            if text and text not in self._queue:
+                self._queue.append(text)
+        self._fill()
+
+    def _advance(self, text: str) -> None:
+        if text not in self._queue:
+            return
+        while self._queue.popleft() != text:
+            pass
+
+    def _fill(self) -> None:
+        window = list(itertools.islice(self._queue, self.lookahead))
+        for text in list(self._tasks):
+            if text not in window:
+                self._tasks.pop(text).cancel()
+        for text in window:
+            if text not in self._tasks:
+                self._tasks[text] = asyncio.create_task(
+                    self.llm_service.simplify_text_to_keywords(text)
+                )
+
+    async def simplify_text_to_keywords(self, text: str) -> Dict[str, Any]:
+        task = self._tasks.pop(text, None)
+        self._advance(text)
+        self._fill()
+
+        if task is None:
+            self.misses += 1
+            return await self.llm_service.simplify_text_to_keywords(text)
+
+        self.hits += 1
+        try:
+            return await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"预取LLM摘要失败，重新请求: {str(e)}")
+            return await self.llm_service.simplify_text_to_keywords(text)
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._queue.clear()
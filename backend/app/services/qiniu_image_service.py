@@ -1,6 +1,11 @@
-import httpx
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional, Tuple
 from app.core.config import settings
+from app.core.http_client import get_http_client, operation_timeout
+from app.services.consistency_cache import get_consistency_cache
+from app.services.single_flight import get_single_flight
+
+DEFAULT_STORY_ID = "default"
 
 
 class QiniuImageService:
@@ -11,10 +16,15 @@ class QiniuImageService:
         if isinstance(api_key, bytes):
             api_key = api_key.decode('utf-8')
         self.api_token = api_key.replace('Bearer ', '').strip() if api_key else ""
-        self.character_cache = {}
-        self.scene_cache = {}
+        self.consistency_cache = get_consistency_cache()
+        self.single_flight = get_single_flight("image")
     
-    async def _simplify_text_to_prompt(self, text: str, llm_service: 'QiniuLLMService') -> str:
+    async def _simplify_text_to_prompt(
+        self,
+        text: str,
+        llm_service: 'QiniuLLMService',
+        story_id: str = DEFAULT_STORY_ID
+    ) -> str:
         llm_result = await llm_service.simplify_text_to_keywords(text)
         
         keywords = llm_result.get("keywords", "")
@@ -23,21 +33,19 @@ class QiniuImageService:
         character = llm_result.get("character", "")
         character_info = llm_result.get("character_info", "")
         
-        if scene and scene_summary:
-            self.scene_cache[scene] = scene_summary
-        
-        if character and character_info:
-            self.character_cache[character] = character_info
+        cached_scene, cached_character = await asyncio.to_thread(
+            self._remember_consistency, story_id, scene, scene_summary, character, character_info
+        )
         
         prompt_parts = []
         
-        if scene and scene in self.scene_cache:
-            prompt_parts.append(self.scene_cache[scene])
+        if cached_scene:
+            prompt_parts.append(cached_scene)
         elif scene_summary:
             prompt_parts.append(scene_summary)
         
-        if character and character in self.character_cache:
-            prompt_parts.append(self.character_cache[character])
+        if cached_character:
+            prompt_parts.append(cached_character)
         elif character_info:
             prompt_parts.append(character_info)
         
@@ -48,13 +56,47 @@ class QiniuImageService:
         
         return prompt[:200]
     
-    async def text_to_images(self, text: str, llm_service: 'QiniuLLMService') -> Dict[str, Any]:
+    def _remember_consistency(
+        self,
+        story_id: str,
+        scene: str,
+        scene_summary: str,
+        character: str,
+        character_info: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        if scene and scene_summary:
+            self.consistency_cache.remember(story_id, "scene", scene, scene_summary)
+        if character and character_info:
+            self.consistency_cache.remember(story_id, "character", character, character_info)
+        
+        cached_scene = self.consistency_cache.lookup(story_id, "scene", scene) if scene else None
+        cached_character = self.consistency_cache.lookup(story_id, "character", character) if character else None
+        return cached_scene, cached_character
+    
+    async def text_to_images(
+        self,
+        text: str,
+        llm_service: 'QiniuLLMService',
+        story_id: str = None
+    ) -> Dict[str, Any]:
+        story_id = story_id or DEFAULT_STORY_ID
+        return await self.single_flight.do(
+            (story_id, text),
+            lambda: self._text_to_images(text, llm_service, story_id)
+        )
+    
+    async def _text_to_images(
+        self,
+        text: str,
+        llm_service: 'QiniuLLMService',
+        story_id: str = DEFAULT_STORY_ID
+    ) -> Dict[str, Any]:
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
         
-        prompt = await self._simplify_text_to_prompt(text, llm_service)
+        prompt = await self._simplify_text_to_prompt(text, llm_service, story_id)
         
         prompt_with_style = f"动漫风格, {prompt}"
         
@@ -65,13 +107,15 @@ class QiniuImageService:
             "size": "1024x1024"
         }
         
-        async with httpx.AsyncClient(timeout=3600.0) as client:
-            print(f"文生图 payload: {payload}")
-            response = await client.post(
-                self.api_url,
-                headers=headers,
-                json=payload
-            )
-            print(f"文生图返回图片数量: {len(response.json()['data'])}")
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        print(f"文生图 payload: {payload}")
+        response = await client.post(
+            self.api_url,
+            headers=headers,
+            json=payload,
+            timeout=operation_timeout(settings.IMAGE_TIMEOUT)
+        )
+        response.raise_for_status()
+        result = response.json()
+        print(f"文生图返回图片数量: {len(result.get('data', []))}")
+        return result
@@ -1,11 +1,48 @@
-import httpx
-import subprocess
-import tempfile
+import asyncio
 import base64
 import os
+import shutil
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http_client import get_http_client, operation_timeout
+from app.services.audio_mixer import get_audio_mixer
+from app.services.single_flight import get_single_flight
+
+BACKGROUND_MUSIC_PATH = Path(__file__).parent.parent.parent / "ht.mp3"
+
+MIX_FILTER = '[0:a]volume=1.0[a1];[1:a]volume=0.3[a2];[a1][a2]amix=inputs=2:duration=longest'
+
+_ffmpeg_available: Optional[bool] = None
+
+
+async def probe_ffmpeg() -> bool:
+    global _ffmpeg_available
+    if _ffmpeg_available is not None:
+        return _ffmpeg_available
+    
+    if shutil.which('ffmpeg') is None:
+        print("ffmpeg未安装，背景音乐混合已禁用")
+        _ffmpeg_available = False
+        return False
+    
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-version',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        _ffmpeg_available = await process.wait() == 0
+    except OSError as e:
+        print(f"ffmpeg不可用: {str(e)}，背景音乐混合已禁用")
+        _ffmpeg_available = False
+    
+    return _ffmpeg_available
+
+
+async def prepare_audio_mixing() -> None:
+    await probe_ffmpeg()
+    await get_audio_mixer().load_background(BACKGROUND_MUSIC_PATH)
 
 
 class QiniuTTSService:
@@ -16,9 +53,11 @@ class QiniuTTSService:
         if isinstance(api_key, bytes):
             api_key = api_key.decode('utf-8')
         self.api_token = api_key.replace('Bearer ', '').strip() if api_key else ""
-        self.background_music_path = Path(__file__).parent.parent.parent / "ht.mp3"
+        self.background_music_path = BACKGROUND_MUSIC_PATH
+        self.mixer = get_audio_mixer()
+        self.single_flight = get_single_flight("tts")
     
-    def mix_audio_with_background(self, tts_audio_base64: str) -> str:
+    async def mix_audio_with_background(self, tts_audio_base64: str) -> str:
         try:
             if not self.background_music_path.exists():
                 print(f"背景音乐文件不存在: {self.background_music_path}，跳过ffmpeg混合，返回原始TTS音频")
@@ -32,76 +71,109 @@ class QiniuTTSService:
                 print(f"背景音乐文件无读取权限: {self.background_music_path}，跳过ffmpeg混合，返回原始TTS音频")
                 return tts_audio_base64
             
-            print(f"背景音乐文件检查通过: {self.background_music_path}")
-            
-            try:
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-            except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                print(f"ffmpeg未安装或不可用: {str(e)}，跳过ffmpeg混合，返回原始TTS音频")
+            if not await probe_ffmpeg():
+                print("ffmpeg未安装或不可用，跳过ffmpeg混合，返回原始TTS音频")
                 return tts_audio_base64
             
             tts_audio_data = base64.b64decode(tts_audio_base64)
             
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tts_file:
-                tts_file.write(tts_audio_data)
-                tts_file_path = tts_file.name
-            
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as output_file:
-                output_file_path = output_file.name
+            process = await asyncio.create_subprocess_exec(
+                'ffmpeg',
+                '-loglevel', 'error',
+                '-f', 'mp3', '-i', 'pipe:0',
+                '-i', str(self.background_music_path),
+                '-filter_complex', MIX_FILTER,
+                '-f', 'mp3', 'pipe:1',
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
             
             try:
-                cmd = [
-                    'ffmpeg',
-                    '-i', tts_file_path,
-                    '-i', str(self.background_music_path),
-                    '-filter_complex', '[0:a]volume=1.0[a1];[1:a]volume=0.3[a2];[a1][a2]amix=inputs=2:duration=longest',
-                    '-y',
-                    output_file_path
-                ]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
+                mixed_audio_data, stderr = await asyncio.wait_for(
+                    process.communicate(input=tts_audio_data),
+                    timeout=settings.AUDIO_MIX_TIMEOUT
                 )
-                
-                if result.returncode != 0:
-                    print(f"ffmpeg混合失败 (返回码: {result.returncode})")
-                    print(f"ffmpeg错误输出: {result.stderr}")
-                    print(f"跳过ffmpeg混合，返回原始TTS音频")
-                    return tts_audio_base64
-                
-                with open(output_file_path, 'rb') as f:
-                    mixed_audio_data = f.read()
-                
-                mixed_audio_base64 = base64.b64encode(mixed_audio_data).decode('utf-8')
-                print(f"音频混合成功: TTS长度={len(tts_audio_data)}, 混合后长度={len(mixed_audio_data)}")
-                
-                return mixed_audio_base64
-                
-            finally:
-                try:
-                    os.unlink(tts_file_path)
-                    os.unlink(output_file_path)
-                except:
-                    pass
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                process.kill()
+                await process.wait()
+                raise
+            
+            if process.returncode != 0 or not mixed_audio_data:
+                print(f"ffmpeg混合失败 (返回码: {process.returncode})")
+                print(f"ffmpeg错误输出: {stderr.decode('utf-8', errors='replace')}")
+                print(f"跳过ffmpeg混合，返回原始TTS音频")
+                return tts_audio_base64
+            
+            mixed_audio_base64 = base64.b64encode(mixed_audio_data).decode('utf-8')
+            print(f"音频混合成功: TTS长度={len(tts_audio_data)}, 混合后长度={len(mixed_audio_data)}")
+            
+            return mixed_audio_base64
                     
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"音频混合过程出错: {str(e)}，返回原始TTS音频")
             return tts_audio_base64
     
+    async def mix_wav_with_background(self, tts_audio_base64: str) -> Optional[str]:
+        tts_audio_data = base64.b64decode(tts_audio_base64)
+        try:
+            mixed_audio_data = await asyncio.to_thread(self.mixer.mix_wav_to_mp3, tts_audio_data)
+            print(f"进程内音频混合成功: TTS长度={len(tts_audio_data)}, 混合后长度={len(mixed_audio_data)}")
+            return base64.b64encode(mixed_audio_data).decode('utf-8')
+        except Exception as e:
+            print(f"进程内音频混合出错: {str(e)}，改为返回不含背景音乐的MP3")
+        
+        try:
+            speech_audio_data = await asyncio.to_thread(self.mixer.wav_to_mp3, tts_audio_data)
+            return base64.b64encode(speech_audio_data).decode('utf-8')
+        except Exception as e:
+            print(f"TTS音频转MP3失败: {str(e)}")
+            return None
+    
     async def text_to_speech(self, text: str, sequence_number: int = 0) -> Dict[str, Any]:
+        return await self.single_flight.do(
+            (text, sequence_number == 0),
+            lambda: self._text_to_speech(text, sequence_number)
+        )
+    
+    async def _text_to_speech(self, text: str, sequence_number: int = 0) -> Dict[str, Any]:
         print("step1 tts apitoken"+self.api_token)
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
         
+        mix_in_process = sequence_number == 0 and self.mixer.ready
+        result = await self._request_speech(text, headers, "wav" if mix_in_process else "mp3")
+        
+        if 'data' in result:
+            original_audio_base64 = result['data']
+            
+            if sequence_number == 0:
+                print(f"TTS生成成功，序列号为0，开始混合背景音乐...")
+                mixed_audio_base64 = None
+                if mix_in_process:
+                    mixed_audio_base64 = await self.mix_wav_with_background(original_audio_base64)
+                    if mixed_audio_base64 is None:
+                        print("进程内混音不可用，重新请求MP3格式的TTS音频")
+                        result = await self._request_speech(text, headers, "mp3")
+                        original_audio_base64 = result.get('data')
+                if mixed_audio_base64 is None and original_audio_base64:
+                    mixed_audio_base64 = await self.mix_audio_with_background(original_audio_base64)
+                if mixed_audio_base64 is not None:
+                    result['data'] = mixed_audio_base64
+            else:
+                print(f"TTS生成成功，序列号为{sequence_number}，跳过背景音乐混合")
+        
+        return result
+    
+    async def _request_speech(self, text: str, headers: Dict[str, str], encoding: str) -> Dict[str, Any]:
         payload = {
             "audio": {
                 "voice_type": "qiniu_zh_female_wwxkjx",
-                "encoding": "mp3",
+                "encoding": encoding,
                 "speed_ratio": 1.0
             },
             "request": {
@@ -109,23 +181,12 @@ class QiniuTTSService:
             }
         }
         
-        async with httpx.AsyncClient(timeout=3600.0) as client:
-            response = await client.post(
-                self.api_url,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            if 'data' in result:
-                original_audio_base64 = result['data']
-                
-                if sequence_number == 0:
-                    print(f"TTS生成成功，序列号为0，开始混合背景音乐...")
-                    mixed_audio_base64 = self.mix_audio_with_background(original_audio_base64)
-                    result['data'] = mixed_audio_base64
-                else:
-                    print(f"TTS生成成功，序列号为{sequence_number}，跳过背景音乐混合")
-            
-            return result
+        client = get_http_client()
+        response = await client.post(
+            self.api_url,
+            headers=headers,
+            json=payload,
+            timeout=operation_timeout(settings.TTS_TIMEOUT)
+        )
+        response.raise_for_status()
+        return response.json()
@@ -1,7 +1,7 @@
-import httpx
 import asyncio
 from typing import Dict, Any, Callable
 from app.core.config import settings
+from app.core.http_client import get_http_client, operation_timeout
 
 
 class QiniuVideoService:
@@ -38,14 +38,15 @@ class QiniuVideoService:
             "model": "veo-3.1-fast-generate-preview"
         }
         
-        async with httpx.AsyncClient(timeout=3600.0) as client:
-            response = await client.post(
-                self.api_url,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            self.api_url,
+            headers=headers,
+            json=payload,
+            timeout=operation_timeout(settings.VIDEO_SUBMIT_TIMEOUT)
+        )
+        response.raise_for_status()
+        return response.json()
     
     async def check_video_status(self, video_id: str) -> Dict[str, Any]:
         headers = {
@@ -55,10 +56,14 @@ class QiniuVideoService:
         
         url = f"{self.api_url}/{video_id}"
         
-        async with httpx.AsyncClient(timeout=3600.0) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.get(
+            url,
+            headers=headers,
+            timeout=operation_timeout(settings.VIDEO_STATUS_TIMEOUT)
+        )
+        response.raise_for_status()
+        return response.json()
     
     async def poll_video_status(
         self, 
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+class SummaryCache:
+
+    def __init__(
+        self,
+        path: str,
+        version: str,
+        max_memory_entries: int = 1024,
+        ttl: Optional[float] = None
+    ):
+        self.version = version
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_summaries ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._db.commit()
+        self.invalidate_stale_versions()
+
+    def key(self, text: str) -> str:
+        payload = f"{self.version}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return dict(value)
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_summaries WHERE key = ? AND version = ?",
+                (key, self.version)
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.hits += 1
+            self.disk_hits += 1
+            return dict(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_summaries (key, version, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, json.dumps(value, ensure_ascii=False), now, expires_at)
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: Optional[float]) -> None:
+        self._memory[key] = (dict(value), expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._db.execute("DELETE FROM llm_summaries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def invalidate_stale_versions(self) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM llm_summaries WHERE version != ? OR (expires_at IS NOT NULL AND expires_at <= ?)",
+                (self.version, time.time())
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM llm_summaries")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "memory_entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def prompt_version(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+_caches: Dict[str, SummaryCache] = {}
+
+
+def get_summary_cache(version: str) -> Optional[SummaryCache]:
+    if not settings.LLM_SUMMARY_CACHE_ENABLED:
+        return None
+
+    cache = _caches.get(version)
+    if cache is None:
+        cache = SummaryCache(
+            settings.LLM_SUMMARY_CACHE_PATH,
+            version,
+            max_memory_entries=settings.LLM_SUMMARY_CACHE_MEMORY_ENTRIES,
+            ttl=settings.LLM_SUMMARY_CACHE_TTL
+        )
+        _caches[version] = cache
+    return cache
@@ -1,43 +1,44 @@
 import uuid
-import json
-from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from app.core.config import settings
 from app.models.task import TaskStatus, TaskStatusResponse
+from app.services.task_store import TaskStore, create_task_store
+from app.services.task_status_cache import TaskStatusCache
+
+
+def status_event(status: TaskStatusResponse) -> Dict:
+    return {
+        "task_id": status.task_id,
+        "status": status.status.value,
+        "progress": status.progress,
+        "current_step": status.current_step,
+        "total_scenes": status.total_scenes,
+        "processed_scenes": status.processed_scenes,
+        "error": status.error
+    }
 
 
 class TaskService:
-    def __init__(self):
-        self.tasks_dir = Path("tasks")
-        self.tasks_dir.mkdir(exist_ok=True)
+    def __init__(self, store: TaskStore = None):
+        if store is None:
+            store = create_task_store()
+            if settings.TASK_STATUS_CACHE_ENABLED:
+                store = TaskStatusCache(
+                    store,
+                    flush_interval=settings.TASK_STATUS_FLUSH_INTERVAL,
+                    max_entries=settings.TASK_STATUS_CACHE_ENTRIES,
+                    ttl=settings.TASK_STATUS_CACHE_TTL
+                )
+        self.store = store
     
     def create_task(self, task_type: str, data: Dict) -> str:
         task_id = str(uuid.uuid4())
-        
-        task_data = {
-            "task_id": task_id,
-            "type": task_type,
-            "status": TaskStatus.PENDING,
-            "progress": 0,
-            "data": data
-        }
-        
-        task_file = self.tasks_dir / f"{task_id}.json"
-        with open(task_file, 'w', encoding='utf-8') as f:
-            json.dump(task_data, f, ensure_ascii=False, indent=2)
-        
+        self.store.create(task_id, task_type, data)
         return task_id
     
-    def get_task_status(self, task_id: str) -> Optional[TaskStatusResponse]:
-        task_file = self.tasks_dir / f"{task_id}.json"
-        
-        if not task_file.exists():
-            return None
-        
-        with open(task_file, 'r', encoding='utf-8') as f:
-            task_data = json.load(f)
-        
+    def _to_status_response(self, task_data: Dict) -> TaskStatusResponse:
         return TaskStatusResponse(
-            task_id=task_id,
+            task_id=task_data["task_id"],
             status=task_data.get("status", TaskStatus.PENDING),
             progress=task_data.get("progress", 0),
             current_step=task_data.get("current_step"),
@@ -46,6 +47,14 @@ class TaskService:
             error=task_data.get("error")
         )
     
+    def get_task_status(self, task_id: str) -> Optional[TaskStatusResponse]:
+        task_data = self.store.get(task_id, include_data=False)
+        
+        if task_data is None:
+            return None
+        
+        return self._to_status_response(dict(task_data, task_id=task_id))
+    
     def update_task_status(
         self,
         task_id: str,
@@ -57,35 +66,51 @@ class TaskService:
         video_path: str = None,
         error: str = None
     ):
-        task_file = self.tasks_dir / f"{task_id}.json"
-        
-        if not task_file.exists():
-            return
-        
-        with open(task_file, 'r', encoding='utf-8') as f:
-            task_data = json.load(f)
-        
-        task_data["status"] = status
-        task_data["progress"] = progress
+        fields = {
+            "status": status,
+            "progress": progress
+        }
         if current_step:
-            task_data["current_step"] = current_step
+            fields["current_step"] = current_step
         if total_scenes is not None:
-            task_data["total_scenes"] = total_scenes
+            fields["total_scenes"] = total_scenes
         if processed_scenes is not None:
-            task_data["processed_scenes"] = processed_scenes
+            fields["processed_scenes"] = processed_scenes
         if video_path:
-            task_data["video_path"] = video_path
+            fields["video_path"] = video_path
         if error:
-            task_data["error"] = error
+            fields["error"] = error
         
-        with open(task_file, 'w', encoding='utf-8') as f:
-            json.dump(task_data, f, ensure_ascii=False, indent=2)
+        self.store.update(task_id, fields)
     
-    def get_task_result(self, task_id: str) -> Optional[Dict]:
-        task_file = self.tasks_dir / f"{task_id}.json"
-        
-        if not task_file.exists():
-            return None
-        
-        with open(task_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def get_task_result(self, task_id: str, include_data: bool = True) -> Optional[Dict]:
+        return self.store.get(task_id, include_data=include_data)
+    
+    def list_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[TaskStatusResponse]:
+        status_value = status.value if isinstance(status, TaskStatus) else status
+        return [
+            self._to_status_response(task_data)
+            for task_data in self.store.list(status_value, limit=limit, offset=offset)
+        ]
+    
+    def count_tasks(self, status: Optional[TaskStatus] = None) -> int:
+        status_value = status.value if isinstance(status, TaskStatus) else status
+        return self.store.count(status_value)
+    
+    def close(self):
+        self.store.close()
+
+
+_task_service: Optional[TaskService] = None
+
+
+def get_task_service() -> TaskService:
+    global _task_service
+    if _task_service is None:
+        _task_service = TaskService()
+    return _task_service
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+from app.models.task import TaskStatus
+from app.services.task_store import TaskStore
+
+TERMINAL_STATUSES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+
+
+class CachedStatus:
+
+    def __init__(self, row: Dict[str, Any], loaded_at: float):
+        self.row = row
+        self.loaded_at = loaded_at
+        self.dirty: Dict[str, Any] = {}
+
+
+class TaskStatusCache(TaskStore):
+
+    def __init__(
+        self,
+        store: TaskStore,
+        flush_interval: float = 1.0,
+        max_entries: int = 4096,
+        ttl: float = 2.0
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedStatus]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced_writes = 0
+        self.flushed_writes = 0
+
+    @staticmethod
+    def _normalize(fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value.value if isinstance(value, TaskStatus) else value
+            for key, value in fields.items()
+        }
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run_flusher, name="task-status-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"任务状态写回失败: {str(e)}")
+
+    def _remember(self, task_id: str, row: Dict[str, Any]) -> CachedStatus:
+        entry = CachedStatus(row, time.monotonic())
+        self._entries[task_id] = entry
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_entries:
+            old_id, old_entry = next(iter(self._entries.items()))
+            if old_entry.dirty:
+                try:
+                    self._write(old_id, old_entry)
+                except Exception as e:
+                    print(f"任务状态写回失败: {str(e)}")
+                    break
+            del self._entries[old_id]
+        return entry
+
+    def _write(self, task_id: str, entry: CachedStatus) -> None:
+        if entry.dirty:
+            self.store.update(task_id, entry.dirty)
+            self.flushed_writes += 1
+        entry.dirty = {}
+        self._dirty.discard(task_id)
+
+    def _load(self, task_id: str) -> Optional[CachedStatus]:
+        entry = self._entries.get(task_id)
+        if entry is not None and (entry.dirty or time.monotonic() - entry.loaded_at < self.ttl):
+            self._entries.move_to_end(task_id)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        row = self.store.get(task_id, include_data=False)
+        if row is None:
+            self._entries.pop(task_id, None)
+            return None
+        return self._remember(task_id, self._normalize(row))
+
+    def create(self, task_id: str, task_type: str, data: Dict[str, Any]) -> None:
+        self.store.create(task_id, task_type, data)
+
+    def get(self, task_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
+        if include_data:
+            with self._lock:
+                entry = self._entries.get(task_id)
+                if entry is not None and entry.dirty:
+                    self._write(task_id, entry)
+            return self.store.get(task_id, include_data=True)
+
+        with self._lock:
+            entry = self._load(task_id)
+            return dict(entry.row) if entry is not None else None
+
+    def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        fields = self._normalize(fields)
+        with self._lock:
+            entry = self._load(task_id)
+            if entry is None:
+                return False
+
+            entry.row.update(fields)
+            entry.row["updated_at"] = time.time()
+            if entry.dirty:
+                self.coalesced_writes += 1
+            entry.dirty.update(fields)
+            self._dirty.add(task_id)
+
+            if fields.get("status") in TERMINAL_STATUSES:
+                self._write(task_id, entry)
+                return True
+        self._ensure_flusher()
+        return True
+
+    def flush(self) -> int:
+        with self._lock:
+            dirty = list(self._dirty)
+            for task_id in dirty:
+                entry = self._entries.get(task_id)
+                if entry is not None:
+                    self._write(task_id, entry)
+                else:
+                    self._dirty.discard(task_id)
+            return len(dirty)
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        self.flush()
+        return self.store.list(status, limit=limit, offset=offset)
+
+    def count(self, status: Optional[str] = None) -> int:
+        self.flush()
+        return self.store.count(status)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "dirty": len(self._dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced_writes": self.coalesced_writes,
+                "flushed_writes": self.flushed_writes
+            }
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval + 1)
+            self._flusher = None
+        self.flush()
+        self.store.close()
@@ -0,0 +1,303 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.models.task import TaskStatus
+
+STATUS_FIELDS = (
+    "task_id", "type", "status", "progress", "current_step", "total_scenes",
+    "processed_scenes", "video_path", "error", "created_at", "updated_at"
+)
+
+
+class TaskStore(ABC):
+
+    @abstractmethod
+    def create(self, task_id: str, task_type: str, data: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, task_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def count(self, status: Optional[str] = None) -> int:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FileTaskStore(TaskStore):
+
+    def __init__(self, tasks_dir: str = "tasks"):
+        self.tasks_dir = Path(tasks_dir)
+        self.tasks_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, task_id: str) -> Path:
+        return self.tasks_dir / f"{task_id}.json"
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: Path, task_data: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.tasks_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(task_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def create(self, task_id: str, task_type: str, data: Dict[str, Any]) -> None:
+        now = time.time()
+        self._write(self._path(task_id), {
+            "task_id": task_id,
+            "type": task_type,
+            "status": TaskStatus.PENDING,
+            "progress": 0,
+            "created_at": now,
+            "updated_at": now,
+            "data": data
+        })
+
+    def get(self, task_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
+        task_data = self._read(self._path(task_id))
+        if task_data is not None and not include_data:
+            task_data.pop("data", None)
+        return task_data
+
+    def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        path = self._path(task_id)
+        with self._lock:
+            task_data = self._read(path)
+            if task_data is None:
+                return False
+            task_data.update(fields)
+            task_data["updated_at"] = time.time()
+            self._write(path, task_data)
+        return True
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        tasks = []
+        for path in self.tasks_dir.glob("*.json"):
+            task_data = self._read(path)
+            if task_data is None or (status and task_data.get("status") != status):
+                continue
+            task_data.pop("data", None)
+            tasks.append(task_data)
+        tasks.sort(key=lambda task: task.get("created_at", 0), reverse=True)
+        return tasks[offset:offset + limit]
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status is None:
+            return sum(1 for _ in self.tasks_dir.glob("*.json"))
+        return len(self.list(status, limit=2 ** 31))
+
+
+class SQLiteTaskStore(TaskStore):
+
+    def __init__(self, path: str = "tasks/tasks.sqlite3"):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "task_id TEXT PRIMARY KEY, type TEXT NOT NULL, status TEXT NOT NULL, "
+                "progress INTEGER NOT NULL DEFAULT 0, current_step TEXT, total_scenes INTEGER, "
+                "processed_scenes INTEGER, video_path TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_payloads ("
+                "task_id TEXT PRIMARY KEY REFERENCES tasks(task_id) ON DELETE CASCADE, "
+                "data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def create(self, task_id: str, task_type: str, data: Dict[str, Any]) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO tasks (task_id, type, status, progress, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?)",
+                (task_id, task_type, TaskStatus.PENDING.value, now, now)
+            )
+            conn.execute(
+                "INSERT INTO task_payloads (task_id, data) VALUES (?, ?)",
+                (task_id, json.dumps(data, ensure_ascii=False))
+            )
+
+    def get(self, task_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        task_data = {key: row[key] for key in STATUS_FIELDS}
+        if include_data:
+            payload = conn.execute(
+                "SELECT data FROM task_payloads WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            task_data["data"] = json.loads(payload["data"]) if payload else {}
+        return task_data
+
+    def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        columns = [key for key in fields if key in STATUS_FIELDS and key not in ("task_id", "created_at")]
+        if not columns:
+            return self.get(task_id, include_data=False) is not None
+
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        values = [
+            fields[column].value if isinstance(fields[column], TaskStatus) else fields[column]
+            for column in columns
+        ]
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE tasks SET {assignments}, updated_at = ? WHERE task_id = ?",
+                (*values, time.time(), task_id)
+            )
+        return cursor.rowcount > 0
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        if status:
+            rows = conn.execute(
+                "SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (status, limit, offset)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM tasks ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [{key: row[key] for key in STATUS_FIELDS} for row in rows]
+
+    def count(self, status: Optional[str] = None) -> int:
+        conn = self._connect()
+        if status:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def import_file_tasks(self, tasks_dir: str) -> int:
+        imported = 0
+        conn = self._connect()
+        for path in Path(tasks_dir).glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    task_data = json.load(f)
+                created_at = task_data.get("created_at") or path.stat().st_mtime
+            except (OSError, ValueError) as e:
+                print(f"跳过无法读取的任务文件 {path}: {str(e)}")
+                continue
+
+            task_id = task_data.get("task_id") or path.stem
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (task_id, type, status, progress, current_step, "
+                    "total_scenes, processed_scenes, video_path, error, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        task_id,
+                        task_data.get("type", "text"),
+                        task_data.get("status", TaskStatus.PENDING.value),
+                        task_data.get("progress", 0),
+                        task_data.get("current_step"),
+                        task_data.get("total_scenes"),
+                        task_data.get("processed_scenes"),
+                        task_data.get("video_path"),
+                        task_data.get("error"),
+                        created_at,
+                        task_data.get("updated_at") or created_at
+                    )
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO task_payloads (task_id, data) VALUES (?, ?)",
+                        (task_id, json.dumps(task_data.get("data", {}), ensure_ascii=False))
+                    )
+            try:
+                path.rename(path.with_suffix(".json.migrated"))
+            except OSError as e:
+                print(f"任务文件 {path} 已由其他进程处理: {str(e)}")
+                continue
+            imported += 1
+        return imported
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def create_task_store(backend: str = None, path: str = None) -> TaskStore:
+    backend = backend or settings.TASK_STORE_BACKEND
+    if backend == "file":
+        return FileTaskStore(path or settings.TASK_STORE_DIR)
+    if backend == "sqlite":
+        store = SQLiteTaskStore(path or settings.TASK_STORE_PATH)
+        if path is None:
+            imported = store.import_file_tasks(settings.TASK_STORE_DIR)
+            if imported:
+                print(f"已将 {imported} 个JSON任务文件导入SQLite任务库")
+        return store
+    raise ValueError(f"不支持的任务存储后端: {backend}")
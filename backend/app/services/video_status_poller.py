@@ -0,0 +1,182 @@
+import asyncio
+import time
+from typing import Callable, Dict, Any, List, Optional, Set
+from app.services.qiniu_video_service import QiniuVideoService
+
+
+class PendingVideo:
+
+    def __init__(self, video_id: str, created_at: float):
+        self.video_id = video_id
+        self.created_at = created_at
+        self.next_check = created_at
+        self.checks = 0
+        self.errors = 0
+        self.waiters = 0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.callbacks: List[Callable] = []
+
+
+class VideoStatusPoller:
+
+    def __init__(
+        self,
+        video_service: QiniuVideoService,
+        min_interval: float = 2.0,
+        max_interval: float = 15.0,
+        backoff_ratio: float = 0.1,
+        max_checks_per_sweep: int = 20,
+        max_concurrent_checks: int = 5,
+        timeout: float = 1800.0,
+        max_errors: int = 5,
+        min_sweep_interval: float = 0.5
+    ):
+        self.video_service = video_service
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_ratio = backoff_ratio
+        self.max_checks_per_sweep = max_checks_per_sweep
+        self.max_concurrent_checks = max_concurrent_checks
+        self.timeout = timeout
+        self.max_errors = max_errors
+        self.min_sweep_interval = min_sweep_interval
+        self._callbacks: Set[asyncio.Task] = set()
+        self._jobs: Dict[str, PendingVideo] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.sweeps = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._jobs)
+
+    def interval_for(self, age: float) -> float:
+        return min(self.max_interval, max(self.min_interval, age * self.backoff_ratio))
+
+    def _ensure_running(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def wait(self, video_id: str, progress_callback: Callable = None) -> Dict[str, Any]:
+        job = self._jobs.get(video_id)
+        if job is None:
+            job = PendingVideo(video_id, time.monotonic())
+            job.next_check = job.created_at + self.min_interval
+            self._jobs[video_id] = job
+        job.waiters += 1
+        if progress_callback:
+            job.callbacks.append(progress_callback)
+
+        self._ensure_running()
+        self._wakeup.set()
+
+        try:
+            return await asyncio.shield(job.future)
+        finally:
+            job.waiters -= 1
+            if progress_callback in job.callbacks:
+                job.callbacks.remove(progress_callback)
+            if job.waiters == 0 and not job.future.done():
+                self._drop(job)
+
+    def _drop(self, job: PendingVideo) -> None:
+        if self._jobs.get(job.video_id) is job:
+            del self._jobs[job.video_id]
+        if not job.future.done():
+            job.future.cancel()
+        print(f"视频 {job.video_id} 已无等待者，停止轮询")
+
+    async def _run(self) -> None:
+        while self._jobs:
+            now = time.monotonic()
+            due = sorted(
+                (job for job in self._jobs.values() if job.next_check <= now),
+                key=lambda job: job.next_check
+            )[:self.max_checks_per_sweep]
+
+            if due:
+                self.sweeps += 1
+                semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+                await asyncio.gather(*(self._check(job, semaphore) for job in due))
+                remaining = self.min_sweep_interval - (time.monotonic() - now)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                continue
+
+            next_check = min(job.next_check for job in self._jobs.values())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_check - now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, job: PendingVideo, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if job.future.done():
+                self._jobs.pop(job.video_id, None)
+                return
+
+            self.requests += 1
+            job.checks += 1
+            try:
+                result = await self.video_service.check_video_status(job.video_id)
+                job.errors = 0
+            except Exception as e:
+                job.errors += 1
+                print(f"查询视频 {job.video_id} 状态失败 ({job.errors}/{self.max_errors}): {str(e)}")
+                if job.errors >= self.max_errors:
+                    self._finish(job, exception=e)
+                    return
+                result = {}
+
+        status = result.get("status")
+        age = time.monotonic() - job.created_at
+
+        if status == "Completed":
+            self._finish(job, result=result)
+        elif status == "Failed":
+            self._finish(job, exception=Exception(f"视频生成失败: {result.get('message', '未知错误')}"))
+        elif age >= self.timeout:
+            self._finish(job, exception=Exception(f"视频生成超时，已等待 {int(age)} 秒"))
+        else:
+            job.next_check = time.monotonic() + self.interval_for(age)
+            for callback in list(job.callbacks):
+                self._dispatch(callback(int(age), int(self.timeout)))
+
+    def _dispatch(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._callbacks.add(task)
+        task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        self._callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"视频进度回调失败: {str(task.exception())}")
+
+    def _finish(self, job: PendingVideo, result: Dict[str, Any] = None, exception: Exception = None) -> None:
+        if self._jobs.get(job.video_id) is job:
+            del self._jobs[job.video_id]
+        if job.future.done():
+            return
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
+
+    async def close(self) -> None:
+        for job in list(self._jobs.values()):
+            if not job.future.done():
+                job.future.cancel()
+        self._jobs.clear()
+        for task in list(self._callbacks):
+            task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,180 @@
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from typing import Any, List, Optional
+from app.core.config import settings
+from app.models.task import TaskStatus
+from app.services.job_broker import LeasedJob, SQLiteJobBroker, get_job_broker
+from app.services.task_service import TaskService
+from app.services.converter_service import ConverterService
+
+FINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+class LeasedConverterService(ConverterService):
+
+    def __init__(self, task_service: TaskService, progress_bus: Any):
+        super().__init__(task_service, progress_bus)
+        self.lease_lost = threading.Event()
+        self.outcome: Optional[tuple] = None
+
+    def report_progress(self, task_id: str, status: TaskStatus, **fields):
+        if self.lease_lost.is_set():
+            return
+        if status in FINAL_STATUSES:
+            self.outcome = (status, fields)
+            return
+        super().report_progress(task_id, status, **fields)
+
+    def report_outcome(self, task_id: str) -> None:
+        status, fields = self.outcome
+        super().report_progress(task_id, status, **fields)
+
+
+class ConversionWorker:
+
+    def __init__(
+        self,
+        broker: SQLiteJobBroker,
+        task_service: TaskService,
+        worker_id: str = None,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = None
+    ):
+        self.broker = broker
+        self.task_service = task_service
+        self.converter_service = ConverterService(task_service, progress_bus=broker)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or broker.lease_seconds / 3
+        self.stopping = threading.Event()
+        self.processed = 0
+
+    def _heartbeat(self, job: LeasedJob, done: threading.Event, lease_lost: threading.Event) -> None:
+        lease_expires = job.lease_expires
+        while not done.wait(self.heartbeat_interval):
+            try:
+                renewed = self.broker.heartbeat(job.job_id, self.worker_id)
+            except Exception as e:
+                print(f"任务 {job.job_id} 续约失败，稍后重试: {str(e)}")
+                if time.time() < lease_expires:
+                    continue
+                renewed = False
+            if not renewed:
+                print(f"任务 {job.job_id} 的租约已丢失，可能已被其他worker接管，停止上报进度")
+                lease_lost.set()
+                return
+            lease_expires = time.time() + self.broker.lease_seconds
+
+    def fail_expired(self) -> List[str]:
+        job_ids = self.broker.reap_expired()
+        for job_id in job_ids:
+            print(f"任务 {job_id} 多次执行超时，标记为失败")
+            self.converter_service.report_progress(
+                job_id,
+                TaskStatus.FAILED,
+                error=f"任务执行超时，已重试{self.broker.max_attempts}次"
+            )
+        return job_ids
+
+    def run_job(self, job: LeasedJob) -> None:
+        print(f"[{self.worker_id}] 开始处理任务 {job.job_id}（第{job.attempts}次）")
+        task = self.task_service.get_task_result(job.job_id)
+        if task is None:
+            self.broker.fail(job.job_id, self.worker_id, "任务不存在")
+            return
+
+        data = task.get("data") or {}
+        converter_service = LeasedConverterService(self.task_service, self.broker)
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, done, converter_service.lease_lost), daemon=True
+        )
+        heartbeat.start()
+        try:
+            converter_service.process_text_task(
+                job.job_id,
+                data.get("text", ""),
+                data.get("config") or {}
+            )
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if converter_service.lease_lost.is_set():
+            print(f"[{self.worker_id}] 任务 {job.job_id} 已由其他worker接管，丢弃本次结果")
+            return
+
+        if converter_service.outcome is None:
+            converter_service.outcome = (TaskStatus.FAILED, {"error": "转换未返回结果"})
+        status, fields = converter_service.outcome
+        if status == TaskStatus.FAILED:
+            finished = self.broker.fail(job.job_id, self.worker_id, fields.get("error") or "转换失败")
+        else:
+            finished = self.broker.complete(job.job_id, self.worker_id)
+        if not finished:
+            print(f"[{self.worker_id}] 任务 {job.job_id} 的租约已失效，丢弃本次结果")
+            return
+
+        converter_service.report_outcome(job.job_id)
+        self.processed += 1
+        print(f"[{self.worker_id}] 任务 {job.job_id} 处理结束")
+
+    def run_once(self) -> bool:
+        self.fail_expired()
+        job = self.broker.lease(self.worker_id)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def run(self, drain: bool = False) -> int:
+        print(f"[{self.worker_id}] worker已启动，任务库: {self.broker.path}")
+        while not self.stopping.is_set():
+            if self.run_once():
+                continue
+            if drain:
+                break
+            self.stopping.wait(self.poll_interval)
+        return self.processed
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="从任务队列领取并执行小说转视频任务")
+    parser.add_argument("--worker-id", default=None, help="worker标识，默认为主机名-进程号")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=settings.JOB_WORKER_POLL_INTERVAL,
+        help="队列为空时的轮询间隔（秒）"
+    )
+    parser.add_argument("--drain", action="store_true", help="处理完当前排队的任务后退出")
+    args = parser.parse_args(argv)
+
+    task_service = TaskService()
+    worker = ConversionWorker(get_job_broker(), task_service, args.worker_id, args.poll_interval)
+
+    def handle_signal(signum, frame):
+        print(f"[{worker.worker_id}] 收到退出信号，当前任务完成后退出")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    try:
+        processed = worker.run(drain=args.drain)
+        print(f"[{worker.worker_id}] worker退出，共处理 {processed} 个任务")
+    finally:
+        task_service.close()
+        worker.broker.close()
+
+
+if __name__ == "__main__":
+    main()
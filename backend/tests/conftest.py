@@ -1,5 +1,9 @@
+import os
 import pytest
 import sys
 from pathlib import Path
 
+os.environ.setdefault("LLM_SUMMARY_CACHE_ENABLED", "false")
+os.environ.setdefault("CONSISTENCY_CACHE_PATH", "")
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
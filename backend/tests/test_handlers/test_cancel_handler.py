@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from app.core.connection_scheduler import ConnectionScheduler, SchedulerFullError
+from app.handlers.cancel_handler import handle_cancel
+
+
+async def wait_forever():
+    await asyncio.Event().wait()
+
+
+@pytest.fixture
+def mock_websocket():
+    websocket = Mock()
+    websocket.send_json = AsyncMock()
+    return websocket
+
+
+@pytest.mark.asyncio
+async def test_cancel_single_paragraph(mock_websocket):
+    scheduler = ConnectionScheduler()
+    first = scheduler.spawn("tts", 1, wait_forever())
+    second = scheduler.spawn("tts", 2, wait_forever())
+    await asyncio.sleep(0)
+    
+    await handle_cancel(mock_websocket, {"action": "cancel", "paragraph_number": 1}, scheduler)
+    await asyncio.sleep(0)
+    
+    assert first.cancelled()
+    assert not second.done()
+    call_args = mock_websocket.send_json.call_args[0][0]
+    assert call_args["type"] == "cancelled"
+    assert call_args["count"] == 1
+    
+    await scheduler.shutdown()
+    assert second.cancelled()
+    assert scheduler.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_replace_cancels_superseded_task():
+    scheduler = ConnectionScheduler()
+    first = scheduler.spawn("tts", 1, wait_forever(), replace=True)
+    second = scheduler.spawn("tts", 1, wait_forever(), replace=True)
+    await asyncio.sleep(0)
+    
+    assert first.cancelled()
+    assert not second.done()
+    await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap():
+    scheduler = ConnectionScheduler(max_concurrent=2)
+    running = 0
+    peak = 0
+    
+    async def job():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+    
+    tasks = [scheduler.spawn("tts", i, job(), limited=True) for i in range(6)]
+    await asyncio.gather(*tasks)
+    
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_paragraphs_beyond_concurrency_limit_wait_and_finish():
+    scheduler = ConnectionScheduler(max_concurrent=2, max_per_pool=2)
+    finished = []
+    
+    async def image(paragraph):
+        await asyncio.sleep(0.01)
+        finished.append(("image", paragraph))
+    
+    async def tts(paragraph):
+        scheduler.spawn("image", paragraph, image(paragraph), limited=True, replace=True, pool="image")
+        await asyncio.sleep(0.001)
+        finished.append(("tts", paragraph))
+    
+    for paragraph in range(20):
+        scheduler.spawn("tts", paragraph, tts(paragraph), limited=True, replace=True)
+    
+    for _ in range(200):
+        if scheduler.pending_count == 0:
+            break
+        await asyncio.sleep(0.01)
+    
+    assert sorted(finished) == sorted(
+        [("tts", paragraph) for paragraph in range(20)] + [("image", paragraph) for paragraph in range(20)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_media_pool_caps_jobs_without_blocking_tts():
+    scheduler = ConnectionScheduler(max_concurrent=2, max_per_pool=2)
+    release = asyncio.Event()
+    started = []
+    
+    async def image(paragraph):
+        started.append(paragraph)
+        await release.wait()
+    
+    images = [scheduler.spawn("image", i, image(i), limited=True, pool="image") for i in range(5)]
+    tts = [scheduler.spawn("tts", i, asyncio.sleep(0.001), limited=True) for i in range(6)]
+    
+    await asyncio.wait_for(asyncio.gather(*tts), timeout=1)
+    assert len(started) == 2
+    
+    release.set()
+    await asyncio.wait_for(asyncio.gather(*images), timeout=1)
+    assert sorted(started) == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_queue_limit_rejects_new_tasks():
+    scheduler = ConnectionScheduler(max_queued=1)
+    scheduler.spawn("tts", 1, wait_forever())
+    
+    with pytest.raises(SchedulerFullError):
+        scheduler.spawn("tts", 2, wait_forever())
+    
+    await scheduler.shutdown()
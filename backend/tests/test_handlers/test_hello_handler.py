@@ -0,0 +1,77 @@
+import base64
+import pytest
+from unittest.mock import Mock, AsyncMock
+from app.core.ws_protocol import WebSocketSender, BINARY_FRAME_HEADER
+from app.handlers.hello_handler import handle_hello
+
+
+@pytest.fixture
+def sender():
+    mock_websocket = Mock()
+    mock_websocket.send_json = AsyncMock()
+    mock_websocket.send_bytes = AsyncMock()
+    return WebSocketSender(mock_websocket)
+
+
+@pytest.mark.asyncio
+async def test_handle_hello_enables_binary(sender):
+    await handle_hello(sender, {"action": "hello", "binary": True})
+    
+    assert sender.binary is True
+    call_args = sender.websocket.send_json.call_args[0][0]
+    assert call_args["type"] == "hello"
+    assert call_args["binary"] is True
+
+
+@pytest.mark.asyncio
+async def test_json_mode_keeps_base64(sender):
+    message = {"type": "tts_result", "data": {"data": base64.b64encode(b"audio").decode()}}
+    
+    await sender.send_json(message)
+    
+    sender.websocket.send_json.assert_called_once_with(message)
+    sender.websocket.send_bytes.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_binary_mode_sends_tts_audio_as_frame(sender):
+    sender.binary = True
+    message = {
+        "type": "tts_result",
+        "data": {"data": base64.b64encode(b"audio").decode(), "format": "mp3"},
+        "paragraph_number": 1,
+        "sequence_number": 2
+    }
+    
+    await sender.send_json(message)
+    
+    header = sender.websocket.send_json.call_args[0][0]
+    assert header["data"] == {"format": "mp3", "attachment": 0}
+    assert header["attachments"] == 1
+    assert header["sequence_number"] == 2
+    
+    frame = sender.websocket.send_bytes.call_args[0][0]
+    assert BINARY_FRAME_HEADER.unpack_from(frame) == (header["frame_id"], 0)
+    assert frame[BINARY_FRAME_HEADER.size:] == b"audio"
+
+
+@pytest.mark.asyncio
+async def test_binary_mode_sends_each_image(sender):
+    sender.binary = True
+    message = {
+        "type": "image_result",
+        "data": {
+            "output_format": "png",
+            "data": [{"b64_json": base64.b64encode(f"image{i}".encode()).decode()} for i in range(3)]
+        },
+        "paragraph_number": 1
+    }
+    
+    await sender.send_json(message)
+    
+    header = sender.websocket.send_json.call_args[0][0]
+    assert header["attachments"] == 3
+    assert [image["attachment"] for image in header["data"]["data"]] == [0, 1, 2]
+    
+    frames = [call[0][0] for call in sender.websocket.send_bytes.call_args_list]
+    assert [frame[BINARY_FRAME_HEADER.size:] for frame in frames] == [b"image0", b"image1", b"image2"]
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from app.core.connection_scheduler import ConnectionScheduler
+from app.handlers.subscribe_handler import handle_subscribe
+from app.models.task import TaskStatus, TaskStatusResponse
+from app.services.progress_bus import ProgressBus
+
+
+@pytest.fixture
+def mock_websocket():
+    websocket = Mock()
+    websocket.send_json = AsyncMock()
+    return websocket
+
+
+@pytest.fixture
+def task_service():
+    service = Mock()
+    service.get_task_status.return_value = TaskStatusResponse(
+        task_id="task", status=TaskStatus.PROCESSING, progress=10
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_subscribe_forwards_progress(mock_websocket, task_service):
+    scheduler = ConnectionScheduler()
+    bus = ProgressBus()
+    
+    await handle_subscribe(mock_websocket, {"action": "subscribe", "task_id": "task"}, scheduler, task_service, bus)
+    await asyncio.sleep(0.01)
+    
+    first = mock_websocket.send_json.call_args[0][0]
+    assert first["type"] == "task_progress"
+    assert first["data"]["progress"] == 10
+    
+    bus.publish("task", {"status": "completed", "progress": 100})
+    await asyncio.sleep(0.01)
+    
+    last = mock_websocket.send_json.call_args[0][0]
+    assert last["data"]["status"] == "completed"
+    assert scheduler.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_cancels_forwarding(mock_websocket, task_service):
+    scheduler = ConnectionScheduler()
+    bus = ProgressBus()
+    
+    await handle_subscribe(mock_websocket, {"action": "subscribe", "task_id": "task"}, scheduler, task_service, bus)
+    await asyncio.sleep(0.01)
+    assert bus.subscriber_count("task") == 1
+    
+    await handle_subscribe(mock_websocket, {"action": "unsubscribe", "task_id": "task"}, scheduler, task_service, bus)
+    await asyncio.sleep(0.01)
+    
+    assert bus.subscriber_count("task") == 0
+    assert scheduler.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_subscribe_unknown_task(mock_websocket, task_service):
+    task_service.get_task_status.return_value = None
+    
+    await handle_subscribe(mock_websocket, {"action": "subscribe", "task_id": "missing"}, ConnectionScheduler(), task_service, ProgressBus())
+    
+    call_args = mock_websocket.send_json.call_args[0][0]
+    assert call_args["type"] == "error"
+    assert call_args["message"] == "任务不存在"
+
+
+@pytest.mark.asyncio
+async def test_subscribe_requires_task_id(mock_websocket, task_service):
+    await handle_subscribe(mock_websocket, {"action": "subscribe"}, ConnectionScheduler(), task_service, ProgressBus())
+    
+    call_args = mock_websocket.send_json.call_args[0][0]
+    assert call_args["type"] == "error"
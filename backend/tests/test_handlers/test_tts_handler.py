@@ -57,3 +57,32 @@ async def test_handle_tts_success():
         await handle_tts(mock_websocket, message, mock_tts, mock_image, mock_llm)
     
     assert mock_websocket.send_json.call_count >= 2
+
+
+@pytest.mark.asyncio
+async def test_handle_tts_sends_results_in_order():
+    import asyncio
+    
+    mock_websocket = Mock()
+    mock_websocket.send_json = AsyncMock()
+    
+    message = {"text": "第一句。第二句！第三句？", "paragraph_number": 1, "sequence_number": 0}
+    delays = {0: 0.03, 1: 0.0, 2: 0.01}
+    
+    async def fake_tts(sentence, sequence_number=0):
+        await asyncio.sleep(delays[sequence_number])
+        return {"data": f"audio_{sequence_number}"}
+    
+    mock_tts = Mock()
+    mock_tts.text_to_speech = AsyncMock(side_effect=fake_tts)
+    
+    with patch('app.handlers.tts_handler.generate_images_background', new=Mock()), \
+         patch('asyncio.create_task'):
+        await handle_tts(mock_websocket, message, mock_tts, Mock(), Mock(), concurrency=3)
+    
+    results = [
+        call[0][0] for call in mock_websocket.send_json.call_args_list
+        if call[0][0]["type"] == "tts_result"
+    ]
+    assert [r["sequence_number"] for r in results] == [0, 1, 2]
+    assert [r["data"]["data"] for r in results] == ["audio_0", "audio_1", "audio_2"]
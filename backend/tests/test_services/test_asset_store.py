@@ -0,0 +1,92 @@
+import base64
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import assets
+from app.services.asset_store import AssetStore
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'image-data' * 10
+MP3_BYTES = b'ID3' + b'audio-data' * 10
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(root=str(tmp_path / "assets"))
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.include_router(assets.router, prefix="/api")
+    with patch('app.api.routes.assets.get_asset_store', return_value=store):
+        yield TestClient(app)
+
+
+def test_put_is_content_addressed(store):
+    first = store.put(PNG_BYTES)
+    second = store.put(PNG_BYTES)
+    
+    assert first == second
+    assert first["url"].endswith(".png")
+    assert first["content_type"] == "image/png"
+    assert store.resolve(first["url"].rsplit("/", 1)[-1]).read_bytes() == PNG_BYTES
+
+
+def test_resolve_rejects_invalid_names(store):
+    assert store.resolve("../config.py") is None
+    assert store.resolve("0" * 64 + ".png") is None
+
+
+def test_link_image_result_replaces_base64(store):
+    result = {"output_format": "png", "data": [{"b64_json": base64.b64encode(PNG_BYTES).decode()}]}
+    
+    linked = store.link_image_result(result)
+    
+    assert "b64_json" not in linked["data"][0]
+    assert linked["data"][0]["url"].startswith("/api/assets/")
+
+
+def test_ref_is_dropped_when_asset_missing(store):
+    linked = store.link_tts_result({"data": base64.b64encode(MP3_BYTES).decode()})
+    key = AssetStore.ref_key("tts", True, "第一句。")
+    store.set_ref(key, linked)
+    
+    assert store.get_ref(key) == linked
+    
+    store.resolve(linked["url"].rsplit("/", 1)[-1]).unlink()
+    assert store.get_ref(key) is None
+
+
+def test_get_asset_sets_cache_headers(client, store):
+    asset = store.put(MP3_BYTES)
+    
+    response = client.get(asset["url"])
+    
+    assert response.status_code == 200
+    assert response.content == MP3_BYTES
+    assert response.headers["etag"] == f'"{asset["sha256"]}"'
+    assert "immutable" in response.headers["cache-control"]
+    
+    cached = client.get(asset["url"], headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_get_asset_range(client, store):
+    asset = store.put(MP3_BYTES)
+    
+    response = client.get(asset["url"], headers={"Range": "bytes=3-12"})
+    
+    assert response.status_code == 206
+    assert response.content == MP3_BYTES[3:13]
+    assert response.headers["content-range"] == f"bytes 3-12/{len(MP3_BYTES)}"
+    
+    suffix = client.get(asset["url"], headers={"Range": "bytes=-5"})
+    assert suffix.content == MP3_BYTES[-5:]
+    
+    invalid = client.get(asset["url"], headers={"Range": f"bytes={len(MP3_BYTES)}-"})
+    assert invalid.status_code == 416
+
+
+def test_get_asset_not_found(client):
+    assert client.get("/api/assets/" + "0" * 64 + ".mp3").status_code == 404
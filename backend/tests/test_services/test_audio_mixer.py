@@ -0,0 +1,88 @@
+import io
+import wave
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.services import audio_mixer
+from app.services.audio_mixer import AudioMixer
+
+
+def make_wav(samples: np.ndarray, sample_rate: int, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((samples * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def mixer():
+    mixer = AudioMixer(sample_rate=8000, background_gain=0.5)
+    mixer.set_background(np.full(8000, 0.2, dtype=np.float32))
+    return mixer
+
+
+def test_mix_keeps_longest_track(mixer):
+    speech = np.full(4000, 0.4, dtype=np.float32)
+    
+    mixed = mixer.mix(speech)
+    
+    assert mixed.shape == (8000, 1)
+    assert mixed[0, 0] == pytest.approx(0.25)
+    assert mixed[-1, 0] == pytest.approx(0.1)
+
+
+def test_mix_without_background_keeps_speech_level():
+    mixer = AudioMixer(sample_rate=8000)
+    
+    mixed = mixer.mix(np.full(100, 0.4, dtype=np.float32))
+    
+    assert mixed[0, 0] == pytest.approx(0.4)
+
+
+def test_mix_clips_to_valid_range(mixer):
+    mixed = mixer.mix(np.full(100, 0.95, dtype=np.float32))
+    
+    assert mixed.max() <= 1.0
+
+
+def test_decode_wav_resamples_and_downmixes(mixer):
+    stereo = np.tile(np.array([[0.5, -0.5]], dtype=np.float32), (16000, 1))
+    
+    samples = mixer.decode_wav(make_wav(stereo.reshape(-1), 16000, channels=2))
+    
+    assert samples.shape == (8000, 1)
+    assert np.allclose(samples, 0.0, atol=1e-4)
+
+
+def test_decode_wav_rejects_unsupported_width(mixer):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(3)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00" * 30)
+    
+    with pytest.raises(ValueError):
+        mixer.decode_wav(buffer.getvalue())
+
+
+def test_ready_requires_background_and_encoder():
+    mixer = AudioMixer()
+    assert not mixer.ready
+    
+    mixer.set_background(np.zeros(10, dtype=np.float32))
+    with patch.object(audio_mixer, 'lameenc', None):
+        assert not mixer.ready
+
+
+@pytest.mark.skipif(audio_mixer.lameenc is None, reason="lameenc未安装")
+def test_mix_wav_to_mp3(mixer):
+    t = np.arange(8000) / 8000
+    speech = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    
+    mp3 = mixer.mix_wav_to_mp3(make_wav(speech, 8000))
+    
+    assert len(mp3) > 0
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from novel_to_anime.core.character import CharacterManager
+from novel_to_anime.core.converter import NovelToAnimeConverter
+from novel_to_anime.core.engine import SceneGenerationEngine
+from novel_to_anime.core.manifest import RunManifest
+
+
+def test_observe_scene_merges_chinese_given_name():
+    manager = CharacterManager(min_count=2)
+    
+    assert manager.observe_scene("李明华走进教室。明华坐下。李明华笑了。明华说话。") == ["李明华"]
+    
+    assert manager.characters["李明华"]["aliases"] == ["明华"]
+    assert manager.get_scene_characters("明华笑了。") == ["李明华"]
+
+
+def test_shared_prefix_does_not_merge_different_names():
+    manager = CharacterManager(min_count=2)
+    
+    manager.observe_scene("张小明走进来。张小明坐下。张小姐笑了。张小姐走了。张小明点头。")
+    
+    assert manager.extractor.resolve("张小姐") == "张小姐"
+    assert manager.characters["张小明"]["aliases"] == []
+    assert manager.get_scene_characters("张小姐来了。") == ["张小姐"]
+
+
+def test_observe_scene_merges_english_name_parts():
+    manager = CharacterManager(min_count=2)
+    
+    manager.observe_scene("Harry Potter smiled. Harry waved. Potter left. Harry Potter came back.")
+    
+    assert list(manager.characters) == ["Harry Potter"]
+    assert sorted(manager.characters["Harry Potter"]["aliases"]) == ["Harry", "Potter"]
+
+
+def test_cast_cap_keeps_top_ranked_characters():
+    manager = CharacterManager(min_count=2, max_cast=2)
+    manager.observe_scene("张小明走进教室。张小明坐下。王芳笑了。")
+    
+    registered = manager.observe_scene("王芳看着张小明。赵雷来了。赵雷说话。赵雷又说。赵雷走了。")
+    
+    assert registered == ["赵雷"]
+    assert set(manager.characters) == {"张小明", "赵雷"}
+
+
+def test_higher_ranked_character_replaces_weakest_when_cast_is_full():
+    manager = CharacterManager(min_count=2, max_cast=1)
+    manager.observe_scene("王芳来了。王芳笑了。")
+    
+    registered = manager.observe_scene("赵雷来了。赵雷说话。赵雷又说。赵雷走了。")
+    
+    assert registered == ["赵雷"]
+    assert list(manager.characters) == ["赵雷"]
+    assert manager.get_scene_characters("王芳和赵雷。") == ["赵雷"]
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.generated = []
+    
+    def fingerprint(self, text: str) -> str:
+        return RunManifest.hash_text(text)
+    
+    def _write(self, text: str, output_path: str) -> str:
+        self.generated.append(text)
+        Path(output_path).write_text(text, encoding='utf-8')
+        return output_path
+    
+    generate_image = _write
+    generate_speech = _write
+
+
+def render_scenes(texts, output_dir):
+    converter = NovelToAnimeConverter({'cache_enabled': False})
+    image_gen, tts = FakeGenerator(), FakeGenerator()
+    with SceneGenerationEngine(image_gen, tts, manifest=RunManifest(str(output_dir))) as engine:
+        for text in texts:
+            converter._submit_scene(engine, {'text': text, 'narration': text}, str(output_dir))
+        engine.wait()
+    return engine, image_gen
+
+
+def test_editing_first_scene_keeps_later_scenes_cached(tmp_path):
+    scenes = [
+        "李明华走进教室。李明华坐下。",
+        "王芳和李明华聊天。王芳笑了。",
+        "李明华和王芳一起回家。"
+    ]
+    render_scenes(scenes, tmp_path)
+    
+    edited = ["王芳走进教室。王芳坐下。王芳说话。李明华来了。李明华笑了。"] + scenes[1:]
+    engine, image_gen = render_scenes(edited, tmp_path)
+    
+    assert len(image_gen.generated) == 1
+    assert engine.skipped == 2 * (len(scenes) - 1)
+
+
+def test_duplicate_scenes_count_once_in_progress_totals(tmp_path):
+    events = []
+    with SceneGenerationEngine(FakeGenerator(), FakeGenerator(), progress_callback=events.append) as engine:
+        for text in ["王芳来了。", "李明华走了。", "王芳来了。"]:
+            engine.submit(text, {'text': text}, text, str(tmp_path / f"{len(text)}.png"), text, str(tmp_path / f"{len(text)}.mp3"))
+        total = engine.submitted_count
+        scenes = engine.wait()
+    
+    assert total == 2
+    assert len(scenes) == 3
+    assert max(event['total'] for event in events) == total
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import patch
+from app.services.consistency_cache import ConsistencyCache, story_id_for
+
+
+def test_entries_are_scoped_by_story():
+    cache = ConsistencyCache()
+    cache.remember("story-a", "character", "林风", "黑发少年")
+    
+    assert cache.lookup("story-a", "character", "林风") == "黑发少年"
+    assert cache.lookup("story-b", "character", "林风") is None
+
+
+def test_unknown_kind_rejected():
+    cache = ConsistencyCache()
+    with pytest.raises(ValueError):
+        cache.remember("story-a", "weapon", "剑", "长剑")
+
+
+def test_entries_per_story_bounded():
+    cache = ConsistencyCache(max_entries_per_story=2)
+    for name in ("a", "b", "c"):
+        cache.remember("story", "scene", name, f"{name} info")
+    
+    assert cache.lookup("story", "scene", "a") is None
+    assert cache.lookup("story", "scene", "c") == "c info"
+    assert cache.stats()["entries"] == 2
+
+
+def test_least_recent_story_evicted():
+    cache = ConsistencyCache(max_stories=2)
+    cache.remember("s1", "scene", "room", "r1")
+    cache.remember("s2", "scene", "room", "r2")
+    cache.lookup("s1", "scene", "room")
+    cache.remember("s3", "scene", "room", "r3")
+    
+    assert cache.stats()["stories"] == 2
+    assert cache.lookup("s1", "scene", "room") == "r1"
+    assert cache.lookup("s2", "scene", "room") is None
+
+
+def test_memory_budget_accounting():
+    cache = ConsistencyCache(max_bytes=40)
+    cache.remember("s1", "scene", "a", "x" * 20)
+    assert cache.stats()["bytes"] == 21
+    
+    cache.remember("s2", "scene", "b", "y" * 20)
+    stats = cache.stats()
+    assert stats["bytes"] <= 40
+    assert stats["stories"] == 1
+    assert cache.lookup("s2", "scene", "b") == "y" * 20
+
+
+def test_replacing_entry_updates_size():
+    cache = ConsistencyCache()
+    cache.remember("s1", "character", "a", "short")
+    cache.remember("s1", "character", "a", "much longer description")
+    assert cache.stats()["bytes"] == len("a") + len("much longer description")
+
+
+def test_persisted_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "consistency.sqlite3")
+    cache = ConsistencyCache(path)
+    cache.remember("story", "character", "林风", "黑发少年")
+    cache.close()
+    
+    reopened = ConsistencyCache(path)
+    assert reopened.lookup("story", "character", "林风") == "黑发少年"
+    assert reopened.stats()["disk_loads"] == 1
+
+
+def test_evicted_story_reloads_from_disk(tmp_path):
+    cache = ConsistencyCache(str(tmp_path / "consistency.sqlite3"), max_stories=1)
+    cache.remember("s1", "scene", "room", "r1")
+    cache.remember("s2", "scene", "room", "r2")
+    
+    assert cache.lookup("s1", "scene", "room") == "r1"
+
+
+def test_entries_written_by_other_worker_visible(tmp_path):
+    path = str(tmp_path / "consistency.sqlite3")
+    worker_a = ConsistencyCache(path)
+    worker_b = ConsistencyCache(path)
+    worker_a.lookup("story", "scene", "room")
+    
+    worker_b.remember("story", "scene", "room", "a bright room")
+    assert worker_a.lookup("story", "scene", "room") == "a bright room"
+
+
+def test_idle_stories_expire(tmp_path):
+    path = str(tmp_path / "consistency.sqlite3")
+    with patch('app.services.consistency_cache.time.time', return_value=1000.0):
+        cache = ConsistencyCache(path, ttl=100)
+        cache.remember("story", "scene", "room", "r1")
+        cache.close()
+    
+    with patch('app.services.consistency_cache.time.time', return_value=1200.0):
+        reopened = ConsistencyCache(path, ttl=100)
+    assert reopened.lookup("story", "scene", "room") is None
+
+
+def test_forget_story(tmp_path):
+    cache = ConsistencyCache(str(tmp_path / "consistency.sqlite3"))
+    cache.remember("story", "scene", "room", "r1")
+    cache.forget_story("story")
+    
+    assert cache.lookup("story", "scene", "room") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_story_id_is_stable_for_same_text():
+    first = story_id_for(["第一段", "第二段"])
+    
+    assert story_id_for([" 第一段", "第二段 "]) == first
+    assert story_id_for(["第一段", "第二段改"]) != first
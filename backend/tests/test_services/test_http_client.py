@@ -0,0 +1,32 @@
+import pytest
+from app.core import http_client
+
+
+@pytest.mark.asyncio
+async def test_get_http_client_is_shared():
+    await http_client.close_http_client()
+    client = http_client.get_http_client()
+    
+    assert http_client.get_http_client() is client
+    
+    await http_client.close_http_client()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_start_http_client_recreates_closed_client():
+    client = await http_client.start_http_client()
+    await client.aclose()
+    
+    new_client = await http_client.start_http_client()
+    
+    assert new_client is not client
+    assert not new_client.is_closed
+    await http_client.close_http_client()
+
+
+def test_operation_timeout_keeps_connect_timeout():
+    timeout = http_client.operation_timeout(120.0)
+    
+    assert timeout.read == 120.0
+    assert timeout.connect == http_client.settings.HTTP_CONNECT_TIMEOUT
@@ -0,0 +1,165 @@
+import asyncio
+import time
+import pytest
+from app.services.job_broker import BrokerEventRelay, SQLiteJobBroker
+from app.services.job_executor import JobQueueFullError
+from app.services.progress_bus import ProgressBus
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=60, max_attempts=2)
+    yield broker
+    broker.close()
+
+
+def test_priority_orders_jobs_within_owner(broker):
+    assert broker.enqueue("low", "alice") == 1
+    assert broker.enqueue("bob", "bob") == 2
+    assert broker.enqueue("high", "alice", priority=5) == 1
+
+    assert broker.position("low") == 3
+    assert broker.position("missing") is None
+    assert [broker.lease("worker").job_id for _ in range(3)] == ["high", "bob", "low"]
+
+
+def test_priority_does_not_jump_other_owners(broker):
+    broker.enqueue("a1", "alice")
+    broker.enqueue("b1", "bob")
+    assert broker.enqueue("c1", "carol", priority=10) == 3
+
+    assert [broker.lease("worker").job_id for _ in range(3)] == ["a1", "b1", "c1"]
+
+
+def test_lease_rotates_between_owners(broker):
+    broker.enqueue("a1", "alice")
+    broker.enqueue("a2", "alice")
+    broker.enqueue("a3", "alice")
+    broker.enqueue("b1", "bob")
+    assert broker.lease("worker").job_id == "a1"
+    broker.enqueue("c1", "carol")
+
+    assert broker.position("b1") == 1
+    assert broker.position("c1") == 2
+    assert broker.position("a2") == 3
+    assert [broker.lease("worker").job_id for _ in range(4)] == ["b1", "c1", "a2", "a3"]
+
+
+def test_enqueue_rejects_when_owner_or_queue_is_full(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), max_queue=3, max_queued_per_owner=2, retry_after=7)
+    broker.enqueue("a1", "alice")
+    broker.enqueue("a2", "alice")
+
+    with pytest.raises(JobQueueFullError) as exc_info:
+        broker.ensure_capacity("alice")
+    assert exc_info.value.retry_after == 7
+
+    broker.enqueue("b1", "bob")
+    with pytest.raises(JobQueueFullError):
+        broker.enqueue("c1", "carol")
+    assert broker.stats()["queued"] == 3
+    broker.close()
+
+
+def test_lease_hands_each_job_to_one_worker(broker):
+    broker.enqueue("a", "alice")
+
+    job = broker.lease("worker-1")
+    assert job.job_id == "a"
+    assert job.attempts == 1
+    assert broker.lease("worker-2") is None
+    assert broker.position("a") == 0
+
+    assert not broker.complete("a", "worker-2")
+    assert broker.complete("a", "worker-1")
+    assert broker.position("a") is None
+    assert broker.stats()["done"] == 1
+
+
+def test_leases_are_shared_across_broker_instances(broker):
+    other = SQLiteJobBroker(broker.path)
+    broker.enqueue("a", "alice")
+
+    assert other.lease("worker-2").job_id == "a"
+    assert broker.lease("worker-1") is None
+    other.close()
+
+
+def test_expired_lease_is_taken_over_after_worker_crash(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=3)
+    broker.enqueue("a", "alice")
+    assert broker.lease("crashed").job_id == "a"
+
+    time.sleep(0.1)
+    assert broker.position("a") == 1
+    job = broker.lease("survivor")
+    assert job.job_id == "a"
+    assert job.attempts == 2
+    assert not broker.heartbeat("a", "crashed")
+    assert broker.heartbeat("a", "survivor")
+    broker.close()
+
+
+def test_heartbeat_keeps_lease_alive(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.2)
+    broker.enqueue("a", "alice")
+    broker.lease("worker-1")
+
+    for _ in range(3):
+        time.sleep(0.1)
+        assert broker.heartbeat("a", "worker-1")
+    assert broker.lease("worker-2") is None
+    broker.close()
+
+
+def test_reap_fails_jobs_that_exhausted_attempts(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=1)
+    broker.enqueue("a", "alice")
+    broker.lease("crashed")
+
+    time.sleep(0.1)
+    assert broker.lease("worker-2") is None
+    assert broker.reap_expired() == ["a"]
+    assert broker.reap_expired() == []
+    assert broker.stats()["failed"] == 1
+    broker.close()
+
+
+def test_fail_with_retry_requeues_job(broker):
+    broker.enqueue("a", "alice")
+    broker.lease("worker-1")
+
+    assert broker.fail("a", "worker-1", "临时错误", retry=True)
+    job = broker.lease("worker-2")
+    assert job.job_id == "a"
+    assert job.attempts == 2
+
+
+def test_events_are_read_in_order_and_pruned(broker):
+    start = broker.last_event_id()
+    broker.publish("a", {"status": "processing", "progress": 10})
+    broker.publish("a", {"status": "completed", "progress": 100})
+
+    events = broker.read_events(start)
+    assert [item["event"]["progress"] for item in events] == [10, 100]
+    assert broker.read_events(events[-1]["id"]) == []
+
+    assert broker.prune_events(older_than=-1) == 2
+    assert broker.read_events(0) == []
+
+
+async def test_relay_forwards_worker_events_to_progress_bus(broker):
+    bus = ProgressBus()
+    relay = BrokerEventRelay(broker, bus, interval=0.01)
+    relay.start()
+    await asyncio.sleep(0.05)
+
+    broker.publish("task-1", {"status": "processing", "progress": 40})
+    for _ in range(100):
+        if bus.latest("task-1"):
+            break
+        await asyncio.sleep(0.01)
+    await relay.close()
+
+    assert bus.latest("task-1")["progress"] == 40
+    assert relay.relayed == 1
@@ -0,0 +1,156 @@
+import threading
+import pytest
+from app.services.job_executor import JobExecutor, JobQueueFullError
+
+
+@pytest.fixture
+def gate():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def blocked_executor(gate, **kwargs):
+    executor = JobExecutor(max_workers=1, **kwargs)
+    started = threading.Event()
+    
+    def blocker():
+        started.set()
+        gate.wait(5)
+    
+    executor.submit("blocker", "system", blocker)
+    assert started.wait(5)
+    return executor
+
+
+def recorder(order, expected):
+    finished = threading.Event()
+    
+    def record(job_id):
+        order.append(job_id)
+        if len(order) == expected:
+            finished.set()
+    
+    return record, finished
+
+
+def test_jobs_run_on_dedicated_workers():
+    executor = JobExecutor(max_workers=2)
+    done = threading.Event()
+    names = []
+    
+    def job():
+        names.append(threading.current_thread().name)
+        done.set()
+    
+    executor.submit("a", "alice", job)
+    assert done.wait(5)
+    executor.shutdown(timeout=5)
+    
+    assert names[0].startswith("job-worker-")
+    assert executor.stats()["completed"] == 1
+
+
+def test_queue_bound_rejects_with_retry_after(gate):
+    executor = blocked_executor(gate, max_queue=2, max_queued_per_owner=5, retry_after=12)
+    executor.submit("a", "alice", lambda: None)
+    executor.submit("b", "bob", lambda: None)
+    
+    with pytest.raises(JobQueueFullError) as excinfo:
+        executor.submit("c", "carol", lambda: None)
+    
+    assert excinfo.value.queue_length == 2
+    assert excinfo.value.retry_after == 12
+    assert executor.stats()["rejected"] == 1
+    gate.set()
+    executor.shutdown(timeout=5)
+
+
+def test_per_owner_limit(gate):
+    executor = blocked_executor(gate, max_queue=10, max_queued_per_owner=2)
+    executor.submit("a1", "alice", lambda: None)
+    executor.submit("a2", "alice", lambda: None)
+    
+    with pytest.raises(JobQueueFullError):
+        executor.ensure_capacity("alice")
+    executor.ensure_capacity("bob")
+    gate.set()
+    executor.shutdown(timeout=5)
+
+
+def test_owners_are_served_round_robin(gate):
+    executor = blocked_executor(gate, max_queue=10, max_queued_per_owner=5)
+    order = []
+    record, finished = recorder(order, 5)
+    for job_id in ("a1", "a2", "a3"):
+        executor.submit(job_id, "alice", lambda job_id=job_id: record(job_id))
+    for job_id in ("b1", "b2"):
+        executor.submit(job_id, "bob", lambda job_id=job_id: record(job_id))
+    
+    assert executor.position("a1") == 1
+    assert executor.position("b1") == 2
+    assert executor.position("a3") == 5
+    assert executor.position("blocker") == 0
+    
+    gate.set()
+    assert finished.wait(5)
+    executor.shutdown(timeout=5)
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_priority_orders_jobs_within_owner(gate):
+    executor = blocked_executor(gate, max_queue=10, max_queued_per_owner=5)
+    order = []
+    record, finished = recorder(order, 3)
+    executor.submit("low", "alice", lambda: record("low"))
+    executor.submit("bob", "bob", lambda: record("bob"))
+    position = executor.submit("high", "alice", lambda: record("high"), priority=5)
+    
+    assert position == 1
+    gate.set()
+    assert finished.wait(5)
+    executor.shutdown(timeout=5)
+    assert order == ["high", "bob", "low"]
+
+
+def test_priority_does_not_jump_other_owners(gate):
+    executor = blocked_executor(gate, max_queue=10, max_queued_per_owner=5)
+    order = []
+    record, finished = recorder(order, 3)
+    executor.submit("a1", "alice", lambda: record("a1"))
+    executor.submit("b1", "bob", lambda: record("b1"))
+    position = executor.submit("c1", "carol", lambda: record("c1"), priority=10)
+    
+    assert position == 3
+    gate.set()
+    assert finished.wait(5)
+    executor.shutdown(timeout=5)
+    assert order == ["a1", "b1", "c1"]
+
+
+def test_failed_job_does_not_stop_worker():
+    executor = JobExecutor(max_workers=1)
+    done = threading.Event()
+    
+    def boom():
+        raise RuntimeError("boom")
+    
+    executor.submit("bad", "alice", boom)
+    executor.submit("good", "alice", done.set)
+    assert done.wait(5)
+    executor.shutdown(timeout=5)
+    
+    stats = executor.stats()
+    assert stats["failed"] == 1
+    assert stats["completed"] == 1
+
+
+def test_shutdown_cancels_queued_jobs(gate):
+    executor = blocked_executor(gate, max_queue=10)
+    cancelled = []
+    executor.submit("queued", "alice", lambda: None, on_cancel=lambda: cancelled.append("queued"))
+    
+    assert executor.shutdown(timeout=0.01) == 1
+    assert cancelled == ["queued"]
+    with pytest.raises(JobQueueFullError):
+        executor.submit("late", "alice", lambda: None)
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from app.models.task import TaskStatus
+from app.services.progress_bus import ProgressBus
+from app.services.converter_service import ConversionProgress, ConverterService
+
+
+async def collect(iterator, count):
+    events = []
+    async for event in iterator:
+        events.append(event)
+        if len(events) == count:
+            break
+    return events
+
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_initial_then_events():
+    bus = ProgressBus()
+    subscription = bus.subscribe("task", initial={"status": "pending", "progress": 0})
+    
+    first = await subscription.__anext__()
+    assert first["status"] == "pending"
+    
+    bus.publish("task", {"status": "processing", "progress": 40})
+    second = await subscription.__anext__()
+    assert second["progress"] == 40
+    assert second["task_id"] == "task"
+    
+    await subscription.aclose()
+    assert bus.subscriber_count("task") == 0
+
+
+@pytest.mark.asyncio
+async def test_latest_event_replayed_to_late_subscriber():
+    bus = ProgressBus()
+    bus.publish("task", {"status": "processing", "progress": 10})
+    bus.publish("task", {"status": "processing", "progress": 30})
+    
+    subscription = bus.subscribe("task", initial={"status": "pending", "progress": 0})
+    first = await subscription.__anext__()
+    assert first["progress"] == 30
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_on_terminal_status():
+    bus = ProgressBus()
+    
+    async def consume():
+        return [event async for event in bus.subscribe("task")]
+    
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0)
+    bus.publish("task", {"status": "processing", "progress": 50})
+    bus.publish("task", {"status": "completed", "progress": 100})
+    
+    events = await asyncio.wait_for(consumer, timeout=1)
+    assert [event["progress"] for event in events] == [50, 100]
+
+
+@pytest.mark.asyncio
+async def test_terminal_initial_ends_immediately():
+    bus = ProgressBus()
+    events = [event async for event in bus.subscribe("task", initial={"status": "failed", "error": "boom"})]
+    assert len(events) == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread():
+    bus = ProgressBus()
+    subscription = bus.subscribe("task")
+    consumer = asyncio.create_task(collect(subscription, 3))
+    await asyncio.sleep(0)
+    
+    def worker():
+        for progress in (10, 20, 30):
+            bus.publish("task", {"status": "processing", "progress": progress})
+    
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    
+    events = await asyncio.wait_for(consumer, timeout=1)
+    assert [event["progress"] for event in events] == [10, 20, 30]
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest():
+    bus = ProgressBus(max_queue=2)
+    subscription = bus.subscribe("task")
+    consumer = asyncio.create_task(subscription.__anext__())
+    await asyncio.sleep(0)
+    consumer.cancel()
+    
+    for progress in (10, 20, 30):
+        bus.publish("task", {"status": "processing", "progress": progress})
+    await asyncio.sleep(0)
+    
+    assert bus.stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_yields_none():
+    bus = ProgressBus()
+    subscription = bus.subscribe("task", heartbeat=0.01)
+    assert await subscription.__anext__() is None
+    await subscription.aclose()
+
+
+def test_conversion_progress_maps_stages():
+    report = Mock()
+    progress = ConversionProgress("task", report)
+    
+    progress({"stage": "parsed", "total": 4})
+    progress({"stage": "image", "current": 2, "total": 4})
+    progress({"stage": "audio", "current": 1, "total": 4})
+    
+    kwargs = report.call_args.kwargs
+    assert kwargs["total_scenes"] == 4
+    assert kwargs["processed_scenes"] == 1
+    assert kwargs["current_step"] == "生成语音旁白"
+    assert kwargs["progress"] == 10 + int(70 * 3 / 8)
+    
+    progress({"stage": "encoding", "percent": 50})
+    assert report.call_args.kwargs["progress"] == 89
+
+
+def test_conversion_progress_never_goes_backwards():
+    report = Mock()
+    progress = ConversionProgress("task", report)
+    progress({"stage": "encoding", "percent": 100})
+    progress({"stage": "image", "current": 1, "total": 4})
+    assert report.call_args.kwargs["progress"] == 99
+
+
+def test_converter_service_publishes_updates():
+    task_service = Mock()
+    bus = ProgressBus()
+    service = ConverterService(task_service, bus)
+    
+    with patch('app.services.converter_service.NovelToAnimeConverter') as converter_cls, \
+         patch('app.services.converter_service.Path'), \
+         patch('builtins.open'):
+        def convert(novel_path, output_dir, video_name, progress_callback=None):
+            progress_callback({"stage": "parsed", "total": 2})
+            progress_callback({"stage": "image", "current": 1, "total": 2})
+            return video_name
+        converter_cls.return_value.convert.side_effect = convert
+        
+        service.process_text_task("task", "正文", {})
+    
+    latest = bus.latest("task")
+    assert latest["status"] == TaskStatus.COMPLETED.value
+    assert latest["video_url"] == "/output/task/task.mp4"
+    assert latest["total_scenes"] == 2
+    statuses = [call.args[1] for call in task_service.update_task_status.call_args_list]
+    assert statuses[-1] == TaskStatus.COMPLETED
+    assert TaskStatus.PROCESSING in statuses
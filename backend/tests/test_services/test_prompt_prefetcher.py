@@ -0,0 +1,111 @@
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from app.services.prompt_prefetcher import PromptPrefetcher
+
+
+def make_llm():
+    llm = Mock()
+    llm.simplify_text_to_keywords = AsyncMock(side_effect=lambda text: {"keywords": f"kw-{text}"})
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_prefetched_paragraph_is_served_from_background_task():
+    llm = make_llm()
+    prefetcher = PromptPrefetcher(llm, lookahead=2)
+    
+    prefetcher.plan(["p1", "p2", "p3"])
+    await asyncio.sleep(0)
+    
+    assert llm.simplify_text_to_keywords.await_count == 2
+    
+    result = await prefetcher.simplify_text_to_keywords("p1")
+    
+    assert result == {"keywords": "kw-p1"}
+    assert prefetcher.hits == 1
+    assert prefetcher.misses == 0
+    
+    await asyncio.sleep(0)
+    assert llm.simplify_text_to_keywords.await_count == 3
+    prefetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_unplanned_paragraph_falls_through_to_llm():
+    llm = make_llm()
+    prefetcher = PromptPrefetcher(llm, lookahead=1)
+    
+    result = await prefetcher.simplify_text_to_keywords("other")
+    
+    assert result == {"keywords": "kw-other"}
+    assert prefetcher.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_is_retried_directly():
+    llm = Mock()
+    llm.simplify_text_to_keywords = AsyncMock(side_effect=[Exception("boom"), {"keywords": "ok"}])
+    prefetcher = PromptPrefetcher(llm, lookahead=1)
+    
+    prefetcher.plan(["p1"])
+    result = await prefetcher.simplify_text_to_keywords("p1")
+    
+    assert result == {"keywords": "ok"}
+    assert llm.simplify_text_to_keywords.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_pending_prefetches():
+    started = asyncio.Event()
+    
+    async def slow(text):
+        started.set()
+        await asyncio.sleep(10)
+    
+    llm = Mock()
+    llm.simplify_text_to_keywords = slow
+    prefetcher = PromptPrefetcher(llm, lookahead=2, max_queue=4)
+    
+    prefetcher.plan(["p1", "p2", "p3"])
+    await started.wait()
+    tasks = list(prefetcher._tasks.values())
+    prefetcher.close()
+    await asyncio.sleep(0)
+    
+    assert all(task.cancelled() for task in tasks)
+    assert not prefetcher._queue
+
+
+@pytest.mark.asyncio
+async def test_plan_longer_than_queue_keeps_leading_paragraphs():
+    llm = make_llm()
+    prefetcher = PromptPrefetcher(llm, lookahead=3, max_queue=5)
+    
+    prefetcher.plan([f"p{i}" for i in range(100)])
+    await asyncio.sleep(0)
+    
+    started = [call.args[0] for call in llm.simplify_text_to_keywords.await_args_list]
+    assert started == ["p0", "p1", "p2"]
+    assert list(prefetcher._queue) == ["p0", "p1", "p2", "p3", "p4"]
+    prefetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_window_follows_out_of_order_reads():
+    llm = make_llm()
+    prefetcher = PromptPrefetcher(llm, lookahead=3)
+    prefetcher.plan([f"p{i}" for i in range(10)])
+    await asyncio.sleep(0)
+    stale = [prefetcher._tasks[f"p{i}"] for i in range(3)]
+    
+    for i in range(5, 9):
+        assert await prefetcher.simplify_text_to_keywords(f"p{i}") == {"keywords": f"kw-p{i}"}
+    await asyncio.sleep(0)
+    
+    assert all(task.cancelled() or task.done() for task in stale)
+    assert prefetcher.misses == 1
+    assert prefetcher.hits == 3
+    assert list(prefetcher._tasks) == ["p9"]
+    assert list(prefetcher._queue) == ["p9"]
+    prefetcher.close()
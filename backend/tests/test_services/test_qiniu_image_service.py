@@ -2,13 +2,16 @@ import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from app.services.qiniu_image_service import QiniuImageService
 from app.services.qiniu_llm_service import QiniuLLMService
+from app.services.consistency_cache import ConsistencyCache
 
 
 @pytest.fixture
 def image_service():
     with patch('app.services.qiniu_image_service.settings') as mock_settings:
         mock_settings.QINIU_API_KEY = "test_api_key"
-        return QiniuImageService()
+        service = QiniuImageService()
+    service.consistency_cache = ConsistencyCache()
+    return service
 
 
 @pytest.fixture
@@ -20,7 +23,8 @@ def llm_service():
 
 @pytest.mark.asyncio
 async def test_text_to_images_success(image_service, llm_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_image_service.get_http_client') as mock_client, \
+         patch('app.services.qiniu_llm_service.get_http_client', mock_client):
         mock_llm_response = Mock()
         mock_llm_response.json.return_value = {
             "choices": [{
@@ -35,7 +39,7 @@ async def test_text_to_images_success(image_service, llm_service):
         mock_image_response.json.return_value = {"data": ["image1", "image2", "image3"]}
         mock_image_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=[mock_llm_response, mock_image_response])
+        mock_client.return_value.post = AsyncMock(side_effect=[mock_llm_response, mock_image_response])
         
         result = await image_service.text_to_images("test text", llm_service)
         
@@ -54,9 +58,22 @@ async def test_simplify_text_to_prompt_caching(image_service, llm_service):
             "character_info": "a tall man"
         }
         
-        result1 = await image_service._simplify_text_to_prompt("test text", llm_service)
+        result1 = await image_service._simplify_text_to_prompt("test text", llm_service, "story-1")
         
-        assert "room" in image_service.scene_cache
-        assert "john" in image_service.character_cache
-        assert image_service.scene_cache["room"] == "a beautiful room"
-        assert image_service.character_cache["john"] == "a tall man"
+        snapshot = image_service.consistency_cache.story_snapshot("story-1")
+        assert snapshot["scene"]["room"] == "a beautiful room"
+        assert snapshot["character"]["john"] == "a tall man"
+        
+        mock_llm.return_value = {
+            "keywords": "walks",
+            "scene": "room",
+            "scene_summary": "",
+            "character": "john",
+            "character_info": ""
+        }
+        result2 = await image_service._simplify_text_to_prompt("more text", llm_service, "story-1")
+        assert "a beautiful room" in result2
+        assert "a tall man" in result2
+        
+        result3 = await image_service._simplify_text_to_prompt("more text", llm_service, "story-2")
+        assert "a tall man" not in result3
@@ -12,7 +12,7 @@ def llm_service():
 
 @pytest.mark.asyncio
 async def test_simplify_text_to_keywords_success(llm_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_llm_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {
             "choices": [{
@@ -23,7 +23,7 @@ async def test_simplify_text_to_keywords_success(llm_service):
         }
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         result = await llm_service.simplify_text_to_keywords("test text")
         
@@ -34,7 +34,7 @@ async def test_simplify_text_to_keywords_success(llm_service):
 
 @pytest.mark.asyncio
 async def test_simplify_text_to_keywords_invalid_json(llm_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_llm_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {
             "choices": [{
@@ -45,7 +45,7 @@ async def test_simplify_text_to_keywords_invalid_json(llm_service):
         }
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         result = await llm_service.simplify_text_to_keywords("test text")
         
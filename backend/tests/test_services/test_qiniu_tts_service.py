@@ -13,12 +13,12 @@ def tts_service():
 
 @pytest.mark.asyncio
 async def test_text_to_speech_success(tts_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_tts_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {"data": base64.b64encode(b"test_audio").decode()}
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         result = await tts_service.text_to_speech("test text", sequence_number=1)
         
@@ -28,41 +28,106 @@ async def test_text_to_speech_success(tts_service):
 
 @pytest.mark.asyncio
 async def test_text_to_speech_with_background_music(tts_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_tts_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {"data": base64.b64encode(b"test_audio").decode()}
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
-        with patch.object(tts_service, 'mix_audio_with_background', return_value="mixed_audio"):
+        with patch.object(tts_service, 'mix_audio_with_background', new_callable=AsyncMock, return_value="mixed_audio"):
             result = await tts_service.text_to_speech("test text", sequence_number=0)
             
             assert "data" in result
 
 
-def test_mix_audio_with_background_missing_file(tts_service):
+@pytest.mark.asyncio
+async def test_mix_audio_with_background_missing_file(tts_service):
     with patch('pathlib.Path.exists', return_value=False):
         original_audio = base64.b64encode(b"test_audio").decode()
-        result = tts_service.mix_audio_with_background(original_audio)
+        result = await tts_service.mix_audio_with_background(original_audio)
         
         assert result == original_audio
 
 
-def test_mix_audio_with_background_success(tts_service):
+@pytest.mark.asyncio
+async def test_mix_audio_with_background_success(tts_service):
+    mock_process = Mock(returncode=0)
+    mock_process.communicate = AsyncMock(return_value=(b"mixed_audio", b""))
+    
     with patch('pathlib.Path.exists', return_value=True), \
          patch('pathlib.Path.is_file', return_value=True), \
          patch('os.access', return_value=True), \
-         patch('subprocess.run') as mock_subprocess:
+         patch('app.services.qiniu_tts_service.probe_ffmpeg', new_callable=AsyncMock, return_value=True), \
+         patch('asyncio.create_subprocess_exec', new_callable=AsyncMock, return_value=mock_process) as mock_exec:
         
-        mock_subprocess.side_effect = [
-            Mock(returncode=0),
-            Mock(returncode=0)
-        ]
+        original_audio = base64.b64encode(b"test_audio").decode()
+        result = await tts_service.mix_audio_with_background(original_audio)
+        
+        assert result == base64.b64encode(b"mixed_audio").decode()
+        mock_process.communicate.assert_awaited_once_with(input=b"test_audio")
+        assert 'pipe:0' in mock_exec.call_args[0]
+
+
+@pytest.mark.asyncio
+async def test_mix_audio_with_background_without_ffmpeg(tts_service):
+    with patch('pathlib.Path.exists', return_value=True), \
+         patch('pathlib.Path.is_file', return_value=True), \
+         patch('os.access', return_value=True), \
+         patch('app.services.qiniu_tts_service.probe_ffmpeg', new_callable=AsyncMock, return_value=False), \
+         patch('asyncio.create_subprocess_exec', new_callable=AsyncMock) as mock_exec:
         
         original_audio = base64.b64encode(b"test_audio").decode()
+        result = await tts_service.mix_audio_with_background(original_audio)
+        
+        assert result == original_audio
+        mock_exec.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_text_to_speech_mixes_in_process_when_ready(tts_service):
+    with patch('app.services.qiniu_tts_service.get_http_client') as mock_client, \
+         patch.object(type(tts_service.mixer), 'ready', new=True), \
+         patch.object(tts_service, 'mix_wav_with_background', new_callable=AsyncMock, return_value="mixed_audio") as mock_mix:
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": base64.b64encode(b"wav_audio").decode()}
+        mock_response.raise_for_status = Mock()
+        
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
+        
+        result = await tts_service.text_to_speech("test text", sequence_number=0)
+        
+        assert result["data"] == "mixed_audio"
+        assert mock_client.return_value.post.call_args.kwargs["json"]["audio"]["encoding"] == "wav"
+        mock_mix.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_mix_wav_failure_falls_back_to_speech_only_mp3(tts_service):
+    with patch.object(tts_service.mixer, 'mix_wav_to_mp3', side_effect=RuntimeError("mix failed")), \
+         patch.object(tts_service.mixer, 'wav_to_mp3', return_value=b"speech_mp3"):
+        result = await tts_service.mix_wav_with_background(base64.b64encode(b"wav_audio").decode())
+    
+    assert base64.b64decode(result) == b"speech_mp3"
+
+
+@pytest.mark.asyncio
+async def test_text_to_speech_requests_mp3_when_wav_cannot_be_converted(tts_service):
+    with patch('app.services.qiniu_tts_service.get_http_client') as mock_client, \
+         patch.object(type(tts_service.mixer), 'ready', new=True), \
+         patch.object(tts_service, 'mix_wav_with_background', new_callable=AsyncMock, return_value=None), \
+         patch.object(tts_service, 'mix_audio_with_background', new_callable=AsyncMock, return_value="mixed_mp3") as mock_mix:
+        mock_response = Mock()
+        mock_response.json.side_effect = [
+            {"data": base64.b64encode(b"wav_audio").decode()},
+            {"data": base64.b64encode(b"mp3_audio").decode()}
+        ]
+        mock_response.raise_for_status = Mock()
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
+        
+        result = await tts_service.text_to_speech("test text", sequence_number=0)
         
-        with patch('tempfile.NamedTemporaryFile'), \
-             patch('builtins.open', create=True), \
-             patch('os.unlink'):
-            result = tts_service.mix_audio_with_background(original_audio)
+        encodings = [call.kwargs["json"]["audio"]["encoding"] for call in mock_client.return_value.post.call_args_list]
+        assert encodings == ["wav", "mp3"]
+        assert result["data"] == "mixed_mp3"
+        mock_mix.assert_awaited_once_with(base64.b64encode(b"mp3_audio").decode())
@@ -12,12 +12,12 @@ def video_service():
 
 @pytest.mark.asyncio
 async def test_generate_video_success(video_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_video_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {"id": "video_123"}
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         result = await video_service.generate_video("test prompt", "base64_image_data")
         
@@ -27,12 +27,12 @@ async def test_generate_video_success(video_service):
 
 @pytest.mark.asyncio
 async def test_check_video_status_success(video_service):
-    with patch('httpx.AsyncClient') as mock_client:
+    with patch('app.services.qiniu_video_service.get_http_client') as mock_client:
         mock_response = Mock()
         mock_response.json.return_value = {"status": "Completed", "data": {"videos": [{"url": "http://video.url"}]}}
         mock_response.raise_for_status = Mock()
         
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
         
         result = await video_service.check_video_status("video_123")
         
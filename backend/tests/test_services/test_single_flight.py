@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from app.services.single_flight import SingleFlight
+from app.services.qiniu_llm_service import QiniuLLMService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight("test")
+    upstream = AsyncMock(return_value={"keywords": "test"})
+    
+    async def call():
+        await asyncio.sleep(0.01)
+        return await upstream()
+    
+    results = await asyncio.gather(*(flight.do("same", call) for _ in range(5)))
+    
+    assert upstream.await_count == 1
+    assert all(result == {"keywords": "test"} for result in results)
+    assert flight.stats()["calls"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight("test")
+    
+    async def call(value):
+        await asyncio.sleep(0.01)
+        return value
+    
+    results = await asyncio.gather(flight.do("a", lambda: call(1)), flight.do("b", lambda: call(2)))
+    
+    assert results == [1, 2]
+    assert flight.stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+    
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+    
+    results = await asyncio.gather(flight.do("k", call), flight.do("k", call), return_exceptions=True)
+    
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_one_cancelled_waiter_does_not_cancel_others():
+    flight = SingleFlight("test")
+    
+    async def call():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    first = asyncio.ensure_future(flight.do("k", call))
+    second = asyncio.ensure_future(flight.do("k", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_llm_service_coalesces_identical_text():
+    with patch('app.services.qiniu_llm_service.settings') as mock_settings:
+        mock_settings.QINIU_API_KEY = "test_api_key"
+        llm_service = QiniuLLMService()
+    llm_service.single_flight = SingleFlight("llm")
+    
+    with patch.object(llm_service, '_simplify_text_to_keywords', new_callable=AsyncMock) as mock_call:
+        mock_call.return_value = {"keywords": "test"}
+        
+        await asyncio.gather(*(llm_service.simplify_text_to_keywords("同一段落") for _ in range(3)))
+        
+        assert mock_call.await_count == 1
+        assert llm_service.single_flight.stats()["coalesced"] == 2
@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from app.services.summary_cache import SummaryCache, normalize_text, prompt_version
+from app.services.qiniu_llm_service import QiniuLLMService
+
+SUMMARY = {
+    "keywords": "森林 少年",
+    "scene": "森林",
+    "scene_summary": "清晨的森林",
+    "character": "少年",
+    "character_info": "黑发少年"
+}
+
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  你好\n\n 世界\t") == "你好 世界"
+    assert normalize_text("ＡＢＣ") == "ABC"
+
+
+def test_key_ignores_whitespace_differences(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1")
+    assert cache.key("你好  世界") == cache.key("你好 世界\n")
+    assert cache.key("你好") != cache.key("世界")
+
+
+def test_memory_hit(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1")
+    key = cache.key("text")
+    assert cache.get(key) is None
+    cache.set(key, SUMMARY)
+    assert cache.get(key) == SUMMARY
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_hit_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SummaryCache(path, "v1")
+    key = cache.key("text")
+    cache.set(key, SUMMARY)
+    cache.close()
+
+    reopened = SummaryCache(path, "v1")
+    assert reopened.get(key) == SUMMARY
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1", max_memory_entries=2)
+    for text in ("a", "b", "c"):
+        cache.set(cache.key(text), SUMMARY)
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get(cache.key("a")) == SUMMARY
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_ttl_expiry(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1", ttl=10)
+    key = cache.key("text")
+    with patch('app.services.summary_cache.time.time', return_value=1000.0):
+        cache.set(key, SUMMARY)
+    with patch('app.services.summary_cache.time.time', return_value=1005.0):
+        assert cache.get(key) == SUMMARY
+    with patch('app.services.summary_cache.time.time', return_value=1011.0):
+        assert cache.get(key) is None
+
+
+def test_prompt_change_invalidates_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    old = SummaryCache(path, prompt_version("model", "prompt v1"))
+    old.set(old.key("text"), SUMMARY)
+    old.close()
+
+    new = SummaryCache(path, prompt_version("model", "prompt v2"))
+    assert new.get(new.key("text")) is None
+    assert new._db.execute("SELECT COUNT(*) FROM llm_summaries").fetchone()[0] == 0
+
+
+def test_invalidate(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1")
+    key = cache.key("text")
+    cache.set(key, SUMMARY)
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+
+@pytest.fixture
+def cached_llm_service(tmp_path):
+    with patch('app.services.qiniu_llm_service.settings') as mock_settings:
+        mock_settings.QINIU_API_KEY = "test_api_key"
+        service = QiniuLLMService()
+    service.summary_cache = SummaryCache(str(tmp_path / "cache.sqlite3"), "v1")
+    return service
+
+
+def llm_response(content):
+    response = Mock()
+    response.json.return_value = {"choices": [{"message": {"content": content}}]}
+    response.raise_for_status = Mock()
+    return response
+
+
+@pytest.mark.asyncio
+async def test_llm_service_uses_cache(cached_llm_service):
+    with patch('app.services.qiniu_llm_service.get_http_client') as mock_client:
+        mock_client.return_value.post = AsyncMock(return_value=llm_response(
+            '{"keywords": "森林 少年", "scene": "森林", "scene_summary": "清晨的森林", '
+            '"character": "少年", "character_info": "黑发少年"}'
+        ))
+
+        first = await cached_llm_service.simplify_text_to_keywords("少年走进森林")
+        second = await cached_llm_service.simplify_text_to_keywords("少年走进森林 \n")
+
+        assert first == SUMMARY
+        assert second == SUMMARY
+        assert mock_client.return_value.post.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_service_does_not_cache_fallback(cached_llm_service):
+    with patch('app.services.qiniu_llm_service.get_http_client') as mock_client:
+        mock_client.return_value.post = AsyncMock(return_value=llm_response("invalid json content"))
+
+        await cached_llm_service.simplify_text_to_keywords("少年走进森林")
+        await cached_llm_service.simplify_text_to_keywords("少年走进森林")
+
+        assert mock_client.return_value.post.call_count == 2
@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import patch
+from app.models.task import TaskStatus
+from app.services.task_store import SQLiteTaskStore
+from app.services.task_status_cache import TaskStatusCache
+from app.services.task_service import TaskService
+
+
+class CountingStore(SQLiteTaskStore):
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = 0
+        self.writes = 0
+
+    def get(self, task_id, include_data=True):
+        self.reads += 1
+        return super().get(task_id, include_data)
+
+    def update(self, task_id, fields):
+        self.writes += 1
+        return super().update(task_id, fields)
+
+
+class FlakyStore(CountingStore):
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.failures = 0
+
+    def update(self, task_id, fields):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        return super().update(task_id, fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CountingStore(str(tmp_path / "tasks.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def cache(store):
+    cache = TaskStatusCache(store, flush_interval=60, ttl=60)
+    yield cache
+    cache._stop.set()
+
+
+def test_status_reads_served_from_memory(store, cache):
+    service = TaskService(cache)
+    task_id = service.create_task("text", {"text": "x" * 1000})
+    
+    for _ in range(100):
+        assert service.get_task_status(task_id).status == TaskStatus.PENDING
+    
+    assert store.reads == 1
+    assert cache.stats()["hits"] == 99
+
+
+def test_progress_updates_are_coalesced(store, cache):
+    service = TaskService(cache)
+    task_id = service.create_task("text", {"text": "正文"})
+    
+    for progress in range(1, 21):
+        service.update_task_status(task_id, TaskStatus.PROCESSING, progress=progress)
+    
+    assert store.writes == 0
+    assert service.get_task_status(task_id).progress == 20
+    assert store.get(task_id, include_data=False)["progress"] == 0
+    
+    assert cache.flush() == 1
+    assert store.writes == 1
+    assert store.get(task_id, include_data=False)["progress"] == 20
+
+
+def test_terminal_status_written_immediately(store, cache):
+    service = TaskService(cache)
+    task_id = service.create_task("text", {"text": "正文"})
+    service.update_task_status(task_id, TaskStatus.PROCESSING, progress=50, current_step="生成图片")
+    service.update_task_status(task_id, TaskStatus.COMPLETED, progress=100, video_path="/output/a.mp4")
+    
+    row = store.get(task_id, include_data=False)
+    assert row["status"] == "completed"
+    assert row["current_step"] == "生成图片"
+    assert row["video_path"] == "/output/a.mp4"
+    assert store.writes == 1
+    assert cache.stats()["dirty"] == 0
+
+
+def test_failed_status_written_immediately(store, cache):
+    service = TaskService(cache)
+    task_id = service.create_task("text", {"text": "正文"})
+    service.update_task_status(task_id, TaskStatus.FAILED, error="boom")
+    
+    assert store.get(task_id, include_data=False)["error"] == "boom"
+
+
+def test_failed_write_keeps_pending_fields(tmp_path):
+    store = FlakyStore(str(tmp_path / "tasks.sqlite3"))
+    cache = TaskStatusCache(store, flush_interval=60, ttl=60)
+    store.create("a", "text", {})
+    cache.update("a", {"status": TaskStatus.PROCESSING, "progress": 90})
+    
+    store.failures = 1
+    with pytest.raises(OSError):
+        cache.update("a", {"status": TaskStatus.COMPLETED, "video_path": "/output/a.mp4"})
+    assert cache.stats()["dirty"] == 1
+    
+    assert cache.flush() == 1
+    row = store.get("a", include_data=False)
+    assert row["status"] == "completed"
+    assert row["progress"] == 90
+    assert row["video_path"] == "/output/a.mp4"
+    cache._stop.set()
+    store.close()
+
+
+def test_full_result_includes_pending_updates(store, cache):
+    service = TaskService(cache)
+    task_id = service.create_task("text", {"text": "正文"})
+    service.update_task_status(task_id, TaskStatus.PROCESSING, progress=30)
+    
+    result = service.get_task_result(task_id)
+    assert result["progress"] == 30
+    assert result["data"] == {"text": "正文"}
+
+
+def test_missing_task_not_cached(store, cache):
+    service = TaskService(cache)
+    assert service.get_task_status("missing") is None
+    service.update_task_status("missing", TaskStatus.PROCESSING, progress=5)
+    assert cache.stats()["dirty"] == 0
+
+
+def test_clean_entries_refresh_after_ttl(store):
+    cache = TaskStatusCache(store, flush_interval=60, ttl=2.0)
+    task_id = "task"
+    store.create(task_id, "text", {})
+    
+    with patch('app.services.task_status_cache.time.monotonic', return_value=100.0):
+        cache.get(task_id, include_data=False)
+    store.update(task_id, {"status": "processing", "progress": 40})
+    with patch('app.services.task_status_cache.time.monotonic', return_value=101.0):
+        assert cache.get(task_id, include_data=False)["progress"] == 0
+    with patch('app.services.task_status_cache.time.monotonic', return_value=103.0):
+        assert cache.get(task_id, include_data=False)["progress"] == 40
+
+
+def test_evicting_dirty_entry_flushes_it(store):
+    cache = TaskStatusCache(store, flush_interval=60, max_entries=1, ttl=60)
+    store.create("a", "text", {})
+    store.create("b", "text", {})
+    
+    cache.update("a", {"status": TaskStatus.PROCESSING, "progress": 10})
+    cache.get("b", include_data=False)
+    
+    assert store.get("a", include_data=False)["progress"] == 10
+    cache._stop.set()
+
+
+def test_close_flushes_pending_updates(tmp_path):
+    path = str(tmp_path / "tasks.sqlite3")
+    cache = TaskStatusCache(SQLiteTaskStore(path), flush_interval=60, ttl=60)
+    cache.create("a", "text", {})
+    cache.update("a", {"status": TaskStatus.PROCESSING, "progress": 70})
+    cache.close()
+    
+    reopened = SQLiteTaskStore(path)
+    assert reopened.get("a", include_data=False)["progress"] == 70
+    reopened.close()
@@ -0,0 +1,153 @@
+import json
+import threading
+import pytest
+from app.models.task import TaskStatus
+from pathlib import Path
+from app.services.task_store import FileTaskStore, SQLiteTaskStore, TaskStore
+from app.services.task_service import TaskService
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def task_service(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteTaskStore(str(tmp_path / "tasks.sqlite3"))
+    else:
+        store = FileTaskStore(str(tmp_path / "tasks"))
+    yield TaskService(store)
+    store.close()
+
+
+def test_create_and_get_status(task_service):
+    task_id = task_service.create_task("text", {"text": "小说正文", "config": {}})
+    
+    status = task_service.get_task_status(task_id)
+    assert status.task_id == task_id
+    assert status.status == TaskStatus.PENDING
+    assert status.progress == 0
+
+
+def test_missing_task(task_service):
+    assert task_service.get_task_status("missing") is None
+    assert task_service.get_task_result("missing") is None
+
+
+def test_update_keeps_previous_fields(task_service):
+    task_id = task_service.create_task("text", {"text": "小说正文"})
+    task_service.update_task_status(task_id, TaskStatus.PROCESSING, progress=10, current_step="解析文本")
+    task_service.update_task_status(task_id, TaskStatus.COMPLETED, progress=100, video_path="/output/a.mp4")
+    
+    status = task_service.get_task_status(task_id)
+    assert status.status == TaskStatus.COMPLETED
+    assert status.progress == 100
+    assert status.current_step == "解析文本"
+    
+    result = task_service.get_task_result(task_id)
+    assert result["video_path"] == "/output/a.mp4"
+    assert result["data"] == {"text": "小说正文"}
+
+
+def test_result_without_payload(task_service):
+    task_id = task_service.create_task("text", {"text": "小说正文"})
+    result = task_service.get_task_result(task_id, include_data=False)
+    assert "data" not in result
+    assert result["status"] == TaskStatus.PENDING
+
+
+def test_update_missing_task_is_ignored(task_service):
+    task_service.update_task_status("missing", TaskStatus.FAILED, error="boom")
+    assert task_service.get_task_status("missing") is None
+
+
+def test_list_by_status_newest_first(task_service):
+    first = task_service.create_task("text", {"text": "1"})
+    second = task_service.create_task("text", {"text": "2"})
+    third = task_service.create_task("url", {"text": "3"})
+    task_service.update_task_status(second, TaskStatus.FAILED, error="boom")
+    
+    pending = task_service.list_tasks(TaskStatus.PENDING)
+    assert [task.task_id for task in pending] == [third, first]
+    assert task_service.count_tasks(TaskStatus.FAILED) == 1
+    assert task_service.count_tasks() == 3
+    assert len(task_service.list_tasks(limit=1, offset=1)) == 1
+
+
+def test_sqlite_keeps_payload_out_of_status_rows(tmp_path):
+    store = SQLiteTaskStore(str(tmp_path / "tasks.sqlite3"))
+    service = TaskService(store)
+    task_id = service.create_task("text", {"text": "长" * 10000})
+    
+    conn = store._connect()
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+    assert "data" not in columns
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(tasks)")]
+    assert "idx_tasks_status_created" in indexes
+    assert service.get_task_result(task_id)["data"]["text"] == "长" * 10000
+    store.close()
+
+
+def test_sqlite_concurrent_updates(tmp_path):
+    store = SQLiteTaskStore(str(tmp_path / "tasks.sqlite3"))
+    service = TaskService(store)
+    task_ids = [service.create_task("text", {"text": str(i)}) for i in range(4)]
+    
+    def worker(task_id):
+        for progress in range(1, 51):
+            service.update_task_status(task_id, TaskStatus.PROCESSING, progress=progress)
+    
+    threads = [threading.Thread(target=worker, args=(task_id,)) for task_id in task_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for task_id in task_ids:
+        assert service.get_task_status(task_id).progress == 50
+    store.close()
+
+
+def test_sqlite_imports_legacy_json_tasks(tmp_path):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    (tasks_dir / "legacy.json").write_text(json.dumps({
+        "task_id": "legacy",
+        "type": "text",
+        "status": "completed",
+        "progress": 100,
+        "video_path": "/output/legacy/legacy.mp4",
+        "data": {"text": "旧任务"}
+    }), encoding="utf-8")
+    
+    store = SQLiteTaskStore(str(tasks_dir / "tasks.sqlite3"))
+    assert store.import_file_tasks(str(tasks_dir)) == 1
+    assert not (tasks_dir / "legacy.json").exists()
+    
+    task = store.get("legacy")
+    assert task["status"] == "completed"
+    assert task["video_path"] == "/output/legacy/legacy.mp4"
+    assert task["data"] == {"text": "旧任务"}
+    store.close()
+
+
+def test_store_missing_methods_fails_on_construction():
+    class PartialStore(TaskStore):
+        def create(self, task_id, task_type, data):
+            pass
+    
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_sqlite_import_skips_files_taken_by_another_process(tmp_path, monkeypatch):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    (tasks_dir / "raced.json").write_text(json.dumps({"task_id": "raced", "data": {}}), encoding="utf-8")
+    
+    def rename(self, target):
+        raise FileNotFoundError(str(self))
+    
+    monkeypatch.setattr(Path, "rename", rename)
+    store = SQLiteTaskStore(str(tasks_dir / "tasks.sqlite3"))
+    
+    assert store.import_file_tasks(str(tasks_dir)) == 0
+    assert store.get("raced") is not None
+    store.close()
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from app.services.video_status_poller import VideoStatusPoller
+
+
+def make_poller(statuses, **kwargs):
+    video_service = Mock()
+    video_service.check_video_status = AsyncMock(side_effect=statuses)
+    options = dict(min_interval=0.01, max_interval=0.02, min_sweep_interval=0.01)
+    options.update(kwargs)
+    return VideoStatusPoller(video_service, **options)
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_completed_result():
+    poller = make_poller([
+        {"status": "Processing"},
+        {"status": "Completed", "data": {"videos": [{"url": "http://video.url"}]}}
+    ])
+    progress = AsyncMock()
+    
+    result = await poller.wait("video_1", progress_callback=progress)
+    
+    assert result["status"] == "Completed"
+    assert progress.await_count == 1
+    assert poller.pending_count == 0
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_one_poll():
+    poller = make_poller([{"status": "Processing"}, {"status": "Completed"}])
+    
+    results = await asyncio.gather(poller.wait("video_1"), poller.wait("video_1"))
+    
+    assert [r["status"] for r in results] == ["Completed", "Completed"]
+    assert poller.video_service.check_video_status.await_count == 2
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_status_raises():
+    poller = make_poller([{"status": "Failed", "message": "bad prompt"}])
+    
+    with pytest.raises(Exception, match="视频生成失败"):
+        await poller.wait("video_1")
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_sweep_checks_due_jobs_together():
+    video_service = Mock()
+    video_service.check_video_status = AsyncMock(return_value={"status": "Completed"})
+    poller = VideoStatusPoller(video_service, min_interval=0.01)
+    
+    await asyncio.gather(*(poller.wait(f"video_{i}") for i in range(5)))
+    
+    assert poller.requests == 5
+    assert poller.sweeps == 1
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_backlog_sweeps_respect_min_interval():
+    video_service = Mock()
+    video_service.check_video_status = AsyncMock(return_value={"status": "Completed"})
+    poller = VideoStatusPoller(video_service, min_interval=0.0, max_checks_per_sweep=1, min_sweep_interval=0.05)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    
+    await asyncio.gather(*(poller.wait(f"video_{i}") for i in range(3)))
+    
+    assert poller.sweeps == 3
+    assert loop.time() - started >= 0.1
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_progress_callback_does_not_stall_polling():
+    poller = make_poller([{"status": "Processing"}, {"status": "Completed"}])
+    release = asyncio.Event()
+    failing = AsyncMock(side_effect=RuntimeError("subscriber gone"))
+    
+    async def slow(age, timeout):
+        await release.wait()
+    
+    waiter = asyncio.ensure_future(poller.wait("video_1", progress_callback=slow))
+    other = asyncio.ensure_future(poller.wait("video_1", progress_callback=failing))
+    result = await asyncio.wait_for(waiter, timeout=1)
+    
+    assert result["status"] == "Completed"
+    assert (await other)["status"] == "Completed"
+    failing.assert_awaited_once()
+    release.set()
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_stops_polling():
+    video_service = Mock()
+    video_service.check_video_status = AsyncMock(return_value={"status": "Processing"})
+    poller = VideoStatusPoller(video_service, min_interval=0.01, max_interval=0.01)
+    
+    waiter = asyncio.ensure_future(poller.wait("video_1"))
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    
+    assert poller.pending_count == 0
+    checks = poller.requests
+    await asyncio.sleep(0.05)
+    assert poller.requests == checks
+    await poller.close()
+
+
+def test_interval_grows_with_age():
+    poller = VideoStatusPoller(Mock(), min_interval=2.0, max_interval=15.0, backoff_ratio=0.1)
+    
+    assert poller.interval_for(5) == 2.0
+    assert poller.interval_for(60) == 6.0
+    assert poller.interval_for(600) == 15.0
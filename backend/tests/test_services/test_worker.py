@@ -0,0 +1,139 @@
+import time
+import pytest
+from app.models.task import TaskStatus
+from app.services.job_broker import SQLiteJobBroker
+from app.services.task_service import TaskService
+from app.services.task_store import SQLiteTaskStore
+from app.worker import ConversionWorker, LeasedConverterService
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=60, max_attempts=2)
+    yield broker
+    broker.close()
+
+
+@pytest.fixture
+def task_service(tmp_path):
+    service = TaskService(SQLiteTaskStore(str(tmp_path / "tasks.sqlite3")))
+    yield service
+    service.close()
+
+
+def fake_conversion(monkeypatch, run):
+    monkeypatch.setattr(LeasedConverterService, "process_text_task", run)
+
+
+def enqueue_task(broker, task_service, text="第一章"):
+    task_id = task_service.create_task("text", {"text": text, "config": {}})
+    broker.enqueue(task_id, "alice")
+    return task_id
+
+
+def test_run_once_completes_job_and_task(monkeypatch, broker, task_service):
+    def run(self, task_id, text, config):
+        self.report_progress(task_id, TaskStatus.PROCESSING, progress=50)
+        self.report_progress(task_id, TaskStatus.COMPLETED, progress=100, video_path=f"/output/{task_id}.mp4")
+    
+    fake_conversion(monkeypatch, run)
+    task_id = enqueue_task(broker, task_service)
+    worker = ConversionWorker(broker, task_service, "worker-1")
+    
+    assert worker.run_once()
+    assert not worker.run_once()
+    
+    status = task_service.get_task_status(task_id)
+    assert status.status == TaskStatus.COMPLETED
+    assert task_service.get_task_result(task_id)["video_path"] == f"/output/{task_id}.mp4"
+    assert broker.stats()["done"] == 1
+    events = [item["event"]["status"] for item in broker.read_events(0)]
+    assert events == ["processing", "completed"]
+
+
+def test_failed_conversion_fails_job(monkeypatch, broker, task_service):
+    def run(self, task_id, text, config):
+        self.report_progress(task_id, TaskStatus.FAILED, error="生成失败")
+    
+    fake_conversion(monkeypatch, run)
+    task_id = enqueue_task(broker, task_service)
+    
+    assert ConversionWorker(broker, task_service, "worker-1").run_once()
+    
+    assert task_service.get_task_status(task_id).error == "生成失败"
+    assert broker.stats()["failed"] == 1
+
+
+def test_heartbeat_errors_are_retried(monkeypatch, broker, task_service):
+    calls = []
+    heartbeat = broker.heartbeat
+    
+    def flaky_heartbeat(job_id, worker_id):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return heartbeat(job_id, worker_id)
+    
+    def run(self, task_id, text, config):
+        time.sleep(0.2)
+        self.report_progress(task_id, TaskStatus.COMPLETED, progress=100)
+    
+    monkeypatch.setattr(broker, "heartbeat", flaky_heartbeat)
+    fake_conversion(monkeypatch, run)
+    task_id = enqueue_task(broker, task_service)
+    
+    ConversionWorker(broker, task_service, "worker-1", heartbeat_interval=0.02).run_once()
+    
+    assert len(calls) > 2
+    assert task_service.get_task_status(task_id).status == TaskStatus.COMPLETED
+    assert broker.stats()["done"] == 1
+
+
+def test_lost_lease_stops_reporting_and_keeps_new_owner(monkeypatch, broker, task_service):
+    def run(self, task_id, text, config):
+        broker.fail(task_id, "worker-1", "模拟超时", retry=True)
+        assert broker.lease("worker-2").job_id == task_id
+        time.sleep(0.1)
+        self.report_progress(task_id, TaskStatus.PROCESSING, progress=60)
+        self.report_progress(task_id, TaskStatus.COMPLETED, progress=100)
+    
+    fake_conversion(monkeypatch, run)
+    task_id = enqueue_task(broker, task_service)
+    
+    ConversionWorker(broker, task_service, "worker-1", heartbeat_interval=0.02).run_once()
+    
+    status = task_service.get_task_status(task_id)
+    assert status.status == TaskStatus.PENDING
+    assert broker.read_events(0) == []
+    assert broker.position(task_id) == 0
+    assert broker.complete(task_id, "worker-2")
+
+
+def test_result_is_dropped_when_job_was_taken_over(monkeypatch, broker, task_service):
+    def run(self, task_id, text, config):
+        broker.fail(task_id, "worker-1", "模拟超时", retry=True)
+        broker.lease("worker-2")
+        self.report_progress(task_id, TaskStatus.COMPLETED, progress=100)
+    
+    fake_conversion(monkeypatch, run)
+    task_id = enqueue_task(broker, task_service)
+    
+    ConversionWorker(broker, task_service, "worker-1").run_once()
+    
+    assert task_service.get_task_status(task_id).status == TaskStatus.PENDING
+    assert broker.stats()["leased"] == 1
+
+
+def test_fail_expired_marks_task_failed(tmp_path, task_service):
+    broker = SQLiteJobBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=1)
+    task_id = enqueue_task(broker, task_service)
+    broker.lease("crashed")
+    time.sleep(0.1)
+    
+    worker = ConversionWorker(broker, task_service, "worker-1")
+    assert worker.fail_expired() == [task_id]
+    
+    status = task_service.get_task_status(task_id)
+    assert status.status == TaskStatus.FAILED
+    assert "超时" in status.error
+    broker.close()
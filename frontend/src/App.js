@@ -6,6 +6,7 @@ import VideoPlayer from './components/VideoPlayer';
 import ContentDisplay from './components/ContentDisplay';
 import Login from './components/Login';
 import Register from './components/Register';
+import wsService from './services/websocket';
 
 function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
@@ -92,6 +93,7 @@ function App() {
   };
 
   const handleReset = () => {
+    wsService.sendCancel();
     setTaskId(null);
     setTaskCompleted(false);
     setVideoUrl(null);
@@ -1,8 +1,18 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import './ContentDisplay.css';
-import { generateVideo } from '../services/api';
+import { generateVideo, resolveAssetUrl } from '../services/api';
 import wsService from '../services/websocket';
 
+const urlToBase64 = async (url) => {
+  const blob = await fetch(url).then(response => response.blob());
+  return new Promise((resolve, reject) => {
+    const reader = new FileReader();
+    reader.onload = () => resolve(reader.result.split(',')[1]);
+    reader.onerror = reject;
+    reader.readAsDataURL(blob);
+  });
+};
+
 function ContentDisplay({ taskId, paragraphs, onProgressUpdate, audioCacheMap, imageCacheMap, autoPlayAudio, audioQueueMap, imageQueueMap }) {
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState({});
@@ -45,7 +55,9 @@ function ContentDisplay({ taskId, paragraphs, onProgressUpdate, audioCacheMap, i
 
   const handleImageResult = useCallback((payload) => {
     console.log('=== ContentDisplay收到图片结果 ===');
-    console.log('完整payload:', JSON.stringify(payload, null, 2));
+    console.log('完整payload:', JSON.stringify(payload, (key, value) => (
+      value instanceof Uint8Array ? `<${value.length} bytes>` : value
+    ), 2));
     
     const { data, paragraph_number } = payload;
     
@@ -62,6 +74,13 @@ function ContentDisplay({ taskId, paragraphs, onProgressUpdate, audioCacheMap, i
     try {
       console.log(`✅ 开始处理 ${data.data.length} 张图片`);
       const imageUrls = data.data.map((img, idx) => {
+        if (img.url) {
+          return resolveAssetUrl(img.url);
+        }
+        if (img.bytes) {
+          console.log(`  图片 ${idx + 1}: 二进制长度=${img.bytes.length}`);
+          return URL.createObjectURL(new Blob([img.bytes], { type: `image/${data.output_format || 'png'}` }));
+        }
         const base64Data = img.b64_json;
         const url = `data:image/${data.output_format || 'png'};base64,${base64Data}`;
         console.log(`  图片 ${idx + 1}: base64长度=${base64Data?.length || 0}, URL长度=${url.length}`);
@@ -424,6 +443,8 @@ function ContentDisplay({ taskId, paragraphs, onProgressUpdate, audioCacheMap, i
       let imageBase64 = '';
       if (currentImage.startsWith('data:image/')) {
         imageBase64 = currentImage.split(',')[1];
+      } else if (currentImage.startsWith('blob:') || currentImage.startsWith('http')) {
+        imageBase64 = await urlToBase64(currentImage);
       } else {
         imageBase64 = currentImage;
       }
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import './InputForm.css';
-import wsService from '../services/websocket';
+import wsService, { storyIdFor } from '../services/websocket';
+import { resolveAssetUrl } from '../services/api';
 
 function InputForm({ onTaskCreated, onAudioCache, onImageCache }) {
   const [inputType, setInputType] = useState('text');
@@ -42,13 +43,22 @@ function InputForm({ onTaskCreated, onAudioCache, onImageCache }) {
         setStreamingMessages(prev => [...prev, { type: 'tts_result', ...data }]);
         console.log('TTS结果:', data);
         
-        if (data.data && data.data.data) {
+        if (data.data && data.data.url) {
+          const paragraphNumber = data.paragraph_number;
+          const sequenceNumber = data.sequence_number !== undefined ? data.sequence_number : 0;
+          
+          if (onAudioCache && paragraphNumber !== undefined) {
+            onAudioCache(paragraphNumber, resolveAssetUrl(data.data.url), true, sequenceNumber);
+          }
+        } else if (data.data && (data.data.audio || data.data.data)) {
           try {
-            const base64Audio = data.data.data;
-            const binaryString = atob(base64Audio);
-            const bytes = new Uint8Array(binaryString.length);
-            for (let i = 0; i < binaryString.length; i++) {
-              bytes[i] = binaryString.charCodeAt(i);
+            let bytes = data.data.audio;
+            if (!bytes) {
+              const binaryString = atob(data.data.data);
+              bytes = new Uint8Array(binaryString.length);
+              for (let i = 0; i < binaryString.length; i++) {
+                bytes[i] = binaryString.charCodeAt(i);
+              }
             }
             
             const blob = new Blob([bytes], { type: 'audio/mpeg' });
@@ -75,9 +85,14 @@ function InputForm({ onTaskCreated, onAudioCache, onImageCache }) {
         if (data.data && data.data.data && Array.isArray(data.data.data)) {
           try {
             const imageUrls = data.data.data.map(img => {
-              const base64Data = img.b64_json;
               const format = data.data.output_format || 'png';
-              return `data:image/${format};base64,${base64Data}`;
+              if (img.url) {
+                return resolveAssetUrl(img.url);
+              }
+              if (img.bytes) {
+                return URL.createObjectURL(new Blob([img.bytes], { type: `image/${format}` }));
+              }
+              return `data:image/${format};base64,${img.b64_json}`;
             });
             
             const paragraphNumber = data.paragraph_number;
@@ -158,9 +173,14 @@ function InputForm({ onTaskCreated, onAudioCache, onImageCache }) {
           // 分割段落（使用单个换行符）
           const paragraphs = textInput.split(/\n+/).filter(p => p.trim().length > 0);
           
+          const storyId = storyIdFor(paragraphs);
+          
+          // 提前登记段落，服务端在后台预取LLM摘要
+          wsService.sendPrefetch(paragraphs);
+          
           // 为每个段落发送TTS请求
           for (let i = 0; i < paragraphs.length; i++) {
-            wsService.sendText(paragraphs[i], i + 1);
+            wsService.sendText(paragraphs[i], i + 1, storyId);
           }
           
           setProgress(50);
@@ -232,8 +252,12 @@ function InputForm({ onTaskCreated, onAudioCache, onImageCache }) {
           
           const paragraphs = urlText.split(/\n+/).filter(p => p.trim().length > 0);
           
+          const storyId = storyIdFor(paragraphs);
+          
+          wsService.sendPrefetch(paragraphs);
+          
           for (let i = 0; i < paragraphs.length; i++) {
-            wsService.sendText(paragraphs[i], i + 1);
+            wsService.sendText(paragraphs[i], i + 1, storyId);
           }
           
           setProgress(50);
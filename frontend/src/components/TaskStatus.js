@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import './TaskStatus.css';
-import { getTaskStatus } from '../services/api';
+import { getTaskStatus, subscribeTaskEvents } from '../services/api';
 
 function TaskStatus({ taskId, onComplete, onError }) {
   const [status, setStatus] = useState(null);
@@ -8,31 +8,49 @@ function TaskStatus({ taskId, onComplete, onError }) {
   const [smoothProgress, setSmoothProgress] = useState(0);
 
   useEffect(() => {
-    let progressInterval;
+    let interval;
+    let unsubscribe;
+    let finished = false;
+    
+    const handleStatus = (data) => {
+      setStatus(data);
+
+      if (data.status === 'completed') {
+        finished = true;
+        const videoUrl = `http://localhost:8000${data.video_url || ''}`;
+        setTimeout(() => onComplete(videoUrl), 1000);
+      } else if (data.status === 'failed') {
+        finished = true;
+        setError(data.error || '任务处理失败');
+        setTimeout(() => onError(), 3000);
+      }
+    };
     
     const pollStatus = async () => {
       try {
-        const data = await getTaskStatus(taskId);
-        setStatus(data);
-
-        if (data.status === 'completed') {
-          const videoUrl = `http://localhost:8000${data.video_url || ''}`;
-          setTimeout(() => onComplete(videoUrl), 1000);
-        } else if (data.status === 'failed') {
-          setError(data.error || '任务处理失败');
-          setTimeout(() => onError(), 3000);
-        }
+        handleStatus(await getTaskStatus(taskId));
+        if (finished) clearInterval(interval);
       } catch (err) {
         setError('无法获取任务状态');
       }
     };
+    
+    const startPolling = () => {
+      if (finished || interval) return;
+      pollStatus();
+      interval = setInterval(pollStatus, 2000);
+    };
 
-    pollStatus();
-    const interval = setInterval(pollStatus, 2000);
+    if (typeof EventSource !== 'undefined') {
+      // 服务端推送进度，连接失败时退回轮询
+      unsubscribe = subscribeTaskEvents(taskId, handleStatus, startPolling);
+    } else {
+      startPolling();
+    }
 
     return () => {
-      clearInterval(interval);
-      if (progressInterval) clearInterval(progressInterval);
+      if (interval) clearInterval(interval);
+      if (unsubscribe) unsubscribe();
     };
   }, [taskId, onComplete, onError]);
 
@@ -2,6 +2,8 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
+export const resolveAssetUrl = (path) => new URL(path, API_BASE_URL).toString();
+
 export const createTextTask = async (text, config = null) => {
   const response = await axios.post(`${API_BASE_URL}/tasks/text`, {
     text,
@@ -23,6 +25,23 @@ export const getTaskStatus = async (taskId) => {
   return response.data;
 };
 
+export const subscribeTaskEvents = (taskId, onEvent, onError) => {
+  const source = new EventSource(`${API_BASE_URL}/tasks/${taskId}/events`);
+  source.addEventListener('progress', (event) => {
+    const data = JSON.parse(event.data);
+    onEvent(data);
+    if (data.status === 'completed' || data.status === 'failed') {
+      source.close();
+    }
+  });
+  source.onerror = () => {
+    if (source.readyState === EventSource.CLOSED) {
+      onError();
+    }
+  };
+  return () => source.close();
+};
+
 export const getTaskResult = async (taskId) => {
   const response = await axios.get(`${API_BASE_URL}/tasks/${taskId}/result`);
   return response.data;
@@ -14,6 +14,9 @@ class WebSocketService {
     this.connectionStatus = 'disconnected';
     this.heartbeatInterval = null;
     this.heartbeatTimeout = null;
+    this.binaryFrames = true;
+    this.assetUrls = true;
+    this.pendingFrames = new Map();
   }
 
   /**
@@ -23,9 +26,12 @@ class WebSocketService {
     return new Promise((resolve, reject) => {
       try {
         this.ws = new WebSocket(this.url);
+        this.ws.binaryType = 'arraybuffer';
+        this.pendingFrames.clear();
 
         this.ws.onopen = () => {
           console.log('WebSocket已连接');
+          this.ws.send(JSON.stringify({ action: 'hello', binary: this.binaryFrames, asset_urls: this.assetUrls }));
           this.reconnectAttempts = 0;
           this.connectionStatus = 'connected';
           this.emit('connection_status', { status: 'connected' });
@@ -35,7 +41,15 @@ class WebSocketService {
 
         this.ws.onmessage = (event) => {
           try {
+            if (event.data instanceof ArrayBuffer) {
+              this.handleBinaryFrame(event.data);
+              return;
+            }
             const data = JSON.parse(event.data);
+            if (data.attachments) {
+              this.pendingFrames.set(data.frame_id, { message: data, parts: [], received: 0 });
+              return;
+            }
             this.handleMessage(data);
           } catch (error) {
             console.error('解析WebSocket消息失败:', error);
@@ -89,14 +103,18 @@ class WebSocketService {
    * 发送文本进行TTS处理
    * @param {string} text - 要处理的文本
    * @param {number} paragraphNumber - 段落编号
+   * @param {string} storyId - 故事ID，同一故事内的角色和场景保持一致
    */
-  sendText(text, paragraphNumber = null) {
+  sendText(text, paragraphNumber = null, storyId = null) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
       const message = {
         action: 'tts',
         text: text,
         paragraph_number: paragraphNumber
       };
+      if (storyId) {
+        message.story_id = storyId;
+      }
       this.ws.send(JSON.stringify(message));
     } else {
       console.error('WebSocket未连接');
@@ -104,6 +122,57 @@ class WebSocketService {
     }
   }
 
+  /**
+   * 登记即将请求的段落，让服务端提前生成LLM摘要
+   * @param {string[]} paragraphs - 段落文本列表（按阅读顺序）
+   */
+  sendPrefetch(paragraphs) {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      const message = {
+        action: 'prefetch',
+        paragraphs: paragraphs
+      };
+      this.ws.send(JSON.stringify(message));
+    } else {
+      console.error('WebSocket未连接');
+      throw new Error('WebSocket未连接');
+    }
+  }
+
+  /**
+   * 取消进行中的段落任务（TTS、图片、视频）
+   * @param {number[]|null} paragraphNumbers - 要取消的段落编号，为空时取消全部
+   */
+  sendCancel(paragraphNumbers = null) {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      const message = { action: 'cancel' };
+      if (paragraphNumbers) {
+        message.paragraph_numbers = paragraphNumbers;
+      }
+      this.ws.send(JSON.stringify(message));
+    }
+  }
+
+  /**
+   * 订阅后台转换任务的进度推送（task_progress消息）
+   * @param {string} taskId - 任务ID
+   */
+  subscribeTask(taskId) {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send(JSON.stringify({ action: 'subscribe', task_id: taskId }));
+    }
+  }
+
+  /**
+   * 取消任务进度订阅
+   * @param {string} taskId - 任务ID
+   */
+  unsubscribeTask(taskId) {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send(JSON.stringify({ action: 'unsubscribe', task_id: taskId }));
+    }
+  }
+
   /**
    * 发送视频生成请求
    * @param {string} taskId - 任务ID
@@ -138,6 +207,50 @@ class WebSocketService {
     }
   }
 
+  /**
+   * 处理二进制帧：帧头为4字节frame_id + 2字节附件序号（大端），其后为原始数据
+   * @param {ArrayBuffer} buffer - 二进制帧
+   */
+  handleBinaryFrame(buffer) {
+    const view = new DataView(buffer);
+    const frameId = view.getUint32(0);
+    const index = view.getUint16(4);
+    const pending = this.pendingFrames.get(frameId);
+
+    if (!pending) {
+      console.warn('收到未知的二进制帧:', frameId);
+      return;
+    }
+
+    pending.parts[index] = new Uint8Array(buffer, 6);
+    pending.received++;
+
+    if (pending.received === pending.message.attachments) {
+      this.pendingFrames.delete(frameId);
+      this.handleMessage(this.attachBinaryParts(pending.message, pending.parts));
+    }
+  }
+
+  /**
+   * 将二进制附件挂回消息：TTS音频放入 data.audio，图片放入 data.data[i].bytes
+   * @param {object} message - JSON帧头
+   * @param {Uint8Array[]} parts - 按序号排列的附件
+   */
+  attachBinaryParts(message, parts) {
+    const { frame_id, attachments, ...rest } = message;
+    const data = { ...rest.data };
+
+    if (rest.type === 'tts_result') {
+      data.audio = parts[data.attachment];
+    } else if (rest.type === 'image_result' && Array.isArray(data.data)) {
+      data.data = data.data.map(image => (
+        image && image.attachment !== undefined ? { ...image, bytes: parts[image.attachment] } : image
+      ));
+    }
+
+    return { ...rest, data };
+  }
+
   /**
    * 处理接收到的消息
    * @param {object} data - 消息数据
@@ -146,6 +259,9 @@ class WebSocketService {
     const { type, ...payload } = data;
     
     switch (type) {
+      case 'hello':
+        console.log(`协议协商完成，二进制帧: ${payload.binary ? '启用' : '关闭'}，资源URL: ${payload.asset_urls ? '启用' : '关闭'}`);
+        break;
       case 'status':
         this.emit('status', payload);
         break;
@@ -167,6 +283,12 @@ class WebSocketService {
       case 'complete':
         this.emit('complete', payload);
         break;
+      case 'cancelled':
+        this.emit('cancelled', payload);
+        break;
+      case 'task_progress':
+        this.emit('task_progress', payload);
+        break;
       default:
         console.warn('未知消息类型:', type);
     }
@@ -265,6 +387,26 @@ class WebSocketService {
   }
 }
 
+/**
+ * 根据段落内容生成稳定的故事ID，重复提交或刷新后同一故事仍能复用服务端的图片和一致性缓存
+ * @param {string[]} paragraphs - 故事段落
+ * @returns {string} 故事ID
+ */
+export function storyIdFor(paragraphs) {
+  const text = paragraphs.map(p => p.trim()).join('\n');
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  const hash = (h2 >>> 0).toString(16).padStart(8, '0') + (h1 >>> 0).toString(16).padStart(8, '0');
+  return `story-${hash}-${text.length}`;
+}
+
 // 创建单例实例
 const wsService = new WebSocketService();
 
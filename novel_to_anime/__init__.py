@@ -3,6 +3,7 @@ from .core.parser import NovelParser
 from .core.character import CharacterManager
 from .generators.image import ImageGenerator
 from .generators.audio import TextToSpeech
+from .generators.cache import GenerationCache
 from .video.composer import VideoComposer
 
 __version__ = "2.0.0"
@@ -13,5 +14,6 @@ __all__ = [
     'CharacterManager',
     'ImageGenerator',
     'TextToSpeech',
+    'GenerationCache',
     'VideoComposer',
 ]
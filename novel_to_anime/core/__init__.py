@@ -1,5 +1,8 @@
 from .parser import NovelParser
-from .character import CharacterManager
+from .matcher import AhoCorasickMatcher
+from .character import CharacterExtractor, CharacterManager
+from .manifest import RunManifest
+from .engine import SceneGenerationEngine
 from .converter import NovelToAnimeConverter
 
-__all__ = ['NovelParser', 'CharacterManager', 'NovelToAnimeConverter']
+__all__ = ['NovelParser', 'AhoCorasickMatcher', 'CharacterExtractor', 'CharacterManager', 'RunManifest', 'SceneGenerationEngine', 'NovelToAnimeConverter']
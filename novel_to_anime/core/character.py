@@ -1,46 +1,274 @@
+import itertools
 import re
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 
+from .matcher import AhoCorasickMatcher
 
-class CharacterManager:
-    def __init__(self):
-        self.characters: Dict[str, Dict] = {}
-        self.character_appearances: Dict[str, int] = {}
+
+_SURNAMES = '李王张刘陈杨赵黄周吴徐孙胡朱高林何郭马罗梁宋郑谢韩唐冯于董萧程曹袁邓许傅沈曾彭吕苏卢蒋蔡贾丁魏薛叶阎余潘杜戴夏钟汪田任姜范方石姚谭廖邹熊金陆郝孔白崔康毛邱秦江史顾侯邵孟龙万段漕钱汤尹黎易常武乔贺赖龚文'
+
+_CHINESE_NAME_PATTERN = re.compile(f'[{_SURNAMES}](?=[一-龥])')
+
+_ENGLISH_NAME_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+_COMMON_WORDS = {
+    '这个', '那个', '什么', '怎么', '为什么', '可以', '不是',
+    '没有', '已经', '应该', '可能', '时候', '地方', '东西',
+    '事情', '问题', '办法', '方法', '结果', '原因',
+    '于是', '高兴', '方面', '方向', '马上', '常常', '文字',
+    '程序', '白色', '黄色', '金色', '万一', '任何', '一直'
+}
+
+
+_ENGLISH_STOPWORDS = {
+    'A', 'An', 'The', 'And', 'But', 'Or', 'So', 'Then', 'When', 'While', 'If',
+    'In', 'On', 'At', 'After', 'Before', 'This', 'That', 'These', 'Those',
+    'He', 'She', 'It', 'They', 'We', 'You', 'I', 'His', 'Her', 'Their', 'My'
+}
+
+
+def _is_cjk(ch: str) -> bool:
+    return '\u4e00' <= ch <= '\u9fa5'
+
+
+class CharacterExtractor:
+    def __init__(
+        self,
+        min_count: int = 2,
+        max_cast: int = 50,
+        max_candidates: int = 20000,
+        alias_ratio: float = 0.6
+    ):
+        self.min_count = min_count
+        self.max_cast = max_cast
+        self.max_candidates = max_candidates
+        self.alias_ratio = alias_ratio
+        self.counts: Dict[str, int] = {}
+        self._extensions: Dict[str, Set[str]] = {}
+        self._given_names: Dict[str, Set[str]] = {}
+        self._full_names: Dict[str, Set[str]] = {}
     
-    def extract_characters(self, text: str) -> Set[str]:
-        chinese_name_pattern = r'[李王张刘陈杨赵黄周吴徐孙胡朱高林何郭马罗梁宋郑谢韩唐冯于董萧程曹袁邓许傅沈曾彭吕苏卢蒋蔡贾丁魏薛叶阎余潘杜戴夏钟汪田任姜范方石姚谭廖邹熊金陆郝孔白崔康毛邱秦江史顾侯邵孟龙万段漕钱汤尹黎易常武乔贺赖龚文][一-龥]{1,2}'
+    def feed(self, text: str) -> Set[str]:
+        found = set()
         
-        english_name_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
+        for match in _CHINESE_NAME_PATTERN.finditer(text):
+            start = match.start()
+            short_name = text[start:start + 2]
+            if self._count(short_name):
+                found.add(short_name)
+            
+            if start + 2 < len(text) and _is_cjk(text[start + 2]):
+                long_name = text[start:start + 3]
+                if self._count(long_name):
+                    found.add(long_name)
+                    self._extensions.setdefault(short_name, set()).add(long_name)
+                    self._given_names.setdefault(long_name[1:], set()).add(long_name)
         
-        chinese_names = set(re.findall(chinese_name_pattern, text))
-        english_names = set(re.findall(english_name_pattern, text))
+        for given_name, full_names in self._given_names.items():
+            standalone = text.count(given_name) - sum(text.count(full_name) for full_name in full_names)
+            if standalone > 0 and given_name not in _COMMON_WORDS:
+                self.counts[given_name] = self.counts.get(given_name, 0) + standalone
+                found.add(given_name)
         
-        all_names = chinese_names.union(english_names)
+        for match in _ENGLISH_NAME_PATTERN.finditer(text):
+            tokens = match.group().split()
+            while tokens and tokens[0] in _ENGLISH_STOPWORDS:
+                tokens.pop(0)
+            if not tokens:
+                continue
+            
+            name = ' '.join(tokens)
+            if self._count(name):
+                found.add(name)
+                if len(tokens) > 1:
+                    for token in tokens:
+                        self._full_names.setdefault(token, set()).add(name)
         
-        valid_names = set()
-        for name in all_names:
-            if len(name) >= 2 and not self._is_common_word(name):
-                valid_names.add(name)
+        if len(self.counts) > self.max_candidates:
+            self._prune()
         
-        return valid_names
+        return found
     
-    def _is_common_word(self, word: str) -> bool:
-        common_words = {
-            '这个', '那个', '什么', '怎么', '为什么', '可以', '不是',
-            '没有', '已经', '应该', '可能', '时候', '地方', '东西',
-            '事情', '问题', '办法', '方法', '结果', '原因'
-        }
-        return word in common_words
+    def _count(self, name: str) -> bool:
+        if name in _COMMON_WORDS:
+            return False
+        self.counts[name] = self.counts.get(name, 0) + 1
+        return True
+    
+    def _prune(self):
+        keep = sorted(self.counts.items(), key=lambda item: -item[1])[:self.max_candidates // 2]
+        self.counts = dict(keep)
+        for index in (self._extensions, self._given_names, self._full_names):
+            for key in list(index):
+                names = {name for name in index[key] if name in self.counts}
+                if names:
+                    index[key] = names
+                else:
+                    del index[key]
+    
+    def _dominant(self, names: Optional[Set[str]], base_count: int) -> Optional[str]:
+        if not names:
+            return None
+        best = max(names, key=lambda name: (self.counts.get(name, 0), name))
+        if self.counts.get(best, 0) >= self.alias_ratio * base_count:
+            return best
+        return None
+    
+    def resolve(self, name: str) -> Optional[str]:
+        count = self.counts.get(name, 0)
+        if not count:
+            return None
+        
+        if ' ' not in name and not _is_cjk(name[0]):
+            return self._dominant(self._full_names.get(name), 0) or name
+        
+        if len(name) == 3 and _is_cjk(name[0]):
+            prefix_count = self.counts.get(name[:2], count)
+            if count >= self.alias_ratio * prefix_count:
+                return name
+            if self.resolve(name[:2]) == name[:2]:
+                return name[:2]
+            return name
+        
+        if len(name) == 2 and _is_cjk(name[0]):
+            full_name = self._dominant(self._given_names.get(name), self.min_count / self.alias_ratio)
+            if full_name:
+                return full_name
+            if self._dominant(self._extensions.get(name), count):
+                return None
+            return name
+        
+        return name
+    
+    def score(self, canonical: str) -> int:
+        count = self.counts.get(canonical, 0)
+        if _is_cjk(canonical[0]):
+            given_name = canonical[1:]
+            if len(canonical) == 3 and self.resolve(given_name) == canonical:
+                return count + self.counts.get(given_name, 0)
+            return count
+        return count + sum(
+            self.counts.get(token, 0) for token in canonical.split()
+            if self.resolve(token) == canonical
+        )
     
-    def register_character(self, name: str, description: str = None):
+    def is_alias(self, name: str, canonical: str) -> bool:
+        return len(name) < len(canonical)
+    
+    def cast(self) -> List[Dict]:
+        groups: Dict[str, Dict] = {}
+        for name in self.counts:
+            canonical = self.resolve(name)
+            if canonical is None:
+                continue
+            group = groups.setdefault(canonical, {'name': canonical, 'aliases': set()})
+            if self.is_alias(name, canonical):
+                group['aliases'].add(name)
+        
+        ranked = []
+        for group in groups.values():
+            group['count'] = self.score(group['name'])
+            if group['count'] >= self.min_count:
+                group['aliases'] = sorted(group['aliases'])
+                ranked.append(group)
+        
+        ranked.sort(key=lambda group: (-group['count'], group['name']))
+        return ranked[:self.max_cast]
+
+
+class CharacterManager:
+    def __init__(self, min_count: int = 2, max_cast: int = 50):
+        self.characters: Dict[str, Dict] = {}
+        self.character_appearances: Dict[str, int] = {}
+        self.extractor = CharacterExtractor(min_count=min_count, max_cast=max_cast)
+        self._aliases: Dict[str, str] = {}
+        self._registration_order: Dict[str, int] = {}
+        self._order = itertools.count()
+        self._matcher: AhoCorasickMatcher = None
+    
+    def extract_characters(self, text: str) -> Set[str]:
+        extractor = CharacterExtractor(
+            min_count=self.extractor.min_count,
+            max_cast=self.extractor.max_cast
+        )
+        extractor.feed(text)
+        return {group['name'] for group in extractor.cast()}
+    
+    def _rank(self, name: str) -> tuple:
+        return (-self.extractor.score(name), name)
+    
+    def observe_scene(self, scene_text: str) -> List[str]:
+        candidates: Dict[str, List[str]] = {}
+        for name in self.extractor.feed(scene_text):
+            canonical = self.extractor.resolve(name)
+            if canonical is None or self.extractor.score(canonical) < self.extractor.min_count:
+                continue
+            candidates.setdefault(canonical, []).append(name)
+        
+        registered = []
+        for canonical in sorted(candidates, key=self._rank):
+            if canonical not in self.characters:
+                if len(self.characters) >= self.extractor.max_cast:
+                    weakest = max(self.characters, key=self._rank)
+                    if self._rank(canonical) >= self._rank(weakest):
+                        continue
+                    self.remove_character(weakest)
+                    if weakest in registered:
+                        registered.remove(weakest)
+                self.register_character(canonical)
+                registered.append(canonical)
+            
+            for name in sorted(candidates[canonical]):
+                if self.extractor.is_alias(name, canonical):
+                    self.add_alias(canonical, name)
+        
+        return registered
+    
+    def register_character(self, name: str, description: str = None, aliases: Iterable[str] = ()):
         if name not in self.characters:
             self.characters[name] = {
                 'name': name,
                 'description': description or f"角色{name}",
+                'aliases': [],
                 'appearance_count': 0,
+                'mention_count': 0,
                 'visual_prompt': self._generate_visual_prompt(name, description)
             }
             self.character_appearances[name] = 0
+            self._registration_order[name] = next(self._order)
+            self._matcher = None
+        
+        for alias in aliases:
+            self.add_alias(name, alias)
+    
+    def remove_character(self, name: str):
+        character = self.characters.pop(name, None)
+        if character is None:
+            return
+        for alias in character['aliases']:
+            self._aliases.pop(alias, None)
+        self.character_appearances.pop(name, None)
+        self._registration_order.pop(name, None)
+        self._matcher = None
+    
+    def add_alias(self, name: str, alias: str):
+        if alias == name or self._aliases.get(alias) == name or name not in self.characters:
+            return
+        
+        merged = self.characters.pop(alias, None)
+        if merged is not None:
+            character = self.characters[name]
+            character['appearance_count'] += merged['appearance_count']
+            character['mention_count'] += merged['mention_count']
+            self.character_appearances[name] += self.character_appearances.pop(alias, 0)
+            self._registration_order.pop(alias, None)
+            for other in merged['aliases']:
+                self._aliases[other] = name
+                character['aliases'].append(other)
+        
+        self._aliases[alias] = name
+        self.characters[name]['aliases'].append(alias)
+        self._matcher = None
     
     def _generate_visual_prompt(self, name: str, description: str = None) -> str:
         base_prompt = f"character named {name}"
@@ -76,16 +304,38 @@ class CharacterManager:
             return self.characters[name]['visual_prompt']
         return ""
     
+    def match_scene_characters(self, scene_text: str) -> Dict[str, List[int]]:
+        if self._matcher is None:
+            self._matcher = AhoCorasickMatcher(list(self.characters) + list(self._aliases))
+            self._matcher.build()
+        
+        spans: Dict[str, List[tuple]] = {}
+        for start, word in self._matcher.iter_matches(scene_text):
+            name = self._aliases.get(word, word)
+            spans.setdefault(name, []).append((start, -len(word)))
+        
+        positions: Dict[str, List[int]] = {}
+        for name, name_spans in spans.items():
+            starts = []
+            covered_until = -1
+            for start, negative_length in sorted(name_spans):
+                if start >= covered_until:
+                    starts.append(start)
+                    covered_until = start - negative_length
+            positions[name] = starts
+        
+        return positions
+    
     def get_scene_characters(self, scene_text: str) -> List[str]:
-        found_characters = []
-        for name in self.characters.keys():
-            if name in scene_text:
-                found_characters.append(name)
-                self.update_character_appearance(name)
+        matches = self.match_scene_characters(scene_text)
+        found_characters = sorted(matches, key=self._registration_order.__getitem__)
+        for name in found_characters:
+            self.update_character_appearance(name)
+            self.characters[name]['mention_count'] += len(matches[name])
         return found_characters
     
     def enhance_scene_prompt(self, scene_prompt: str, scene_text: str) -> str:
-        characters = self.get_scene_characters(scene_text)
+        characters = sorted(self.get_scene_characters(scene_text))
         
         if characters:
             character_descriptions = []
@@ -101,14 +351,20 @@ class CharacterManager:
         return scene_prompt
     
     def get_character_summary(self) -> Dict:
+        ranked = sorted(
+            self.characters.values(),
+            key=lambda char: (-char['mention_count'], self._registration_order[char['name']])
+        )
         return {
             'total_characters': len(self.characters),
             'characters': [
                 {
                     'name': char['name'],
+                    'aliases': char['aliases'],
                     'appearances': char['appearance_count'],
+                    'mentions': char['mention_count'],
                     'visual_prompt': char['visual_prompt']
                 }
-                for char in self.characters.values()
+                for char in ranked
             ]
         }
@@ -1,12 +1,15 @@
 import os
 import json
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 
 from .parser import NovelParser
 from .character import CharacterManager
+from .engine import SceneGenerationEngine
+from .manifest import RunManifest
 from ..generators.image import ImageGenerator
 from ..generators.audio import TextToSpeech
+from ..generators.cache import GenerationCache
 from ..video.composer import VideoComposer
 
 
@@ -18,77 +21,81 @@ class NovelToAnimeConverter:
             max_scene_length=self.config.get('max_scene_length', 500)
         )
         
-        self.character_manager = CharacterManager()
+        self.character_manager = CharacterManager(
+            min_count=self.config.get('character_min_count', 2),
+            max_cast=self.config.get('max_cast', 50)
+        )
+        
+        self.cache = None
+        if self.config.get('cache_enabled', True):
+            self.cache = GenerationCache(
+                self.config.get('cache_dir') or os.getenv(
+                    'NOVEL_TO_ANIME_CACHE_DIR',
+                    os.path.join(os.path.expanduser('~'), '.cache', 'novel_to_anime')
+                ),
+                max_bytes=self.config.get('cache_max_bytes', 2 * 1024 ** 3)
+            )
         
         self.image_gen = ImageGenerator(
             api_key=self.config.get('image_api_key'),
-            provider=self.config.get('image_provider', 'stability')
+            provider=self.config.get('image_provider', 'stability'),
+            cache=self.cache
         )
         
         self.tts = TextToSpeech(
             api_key=self.config.get('tts_api_key'),
             provider=self.config.get('tts_provider', 'azure'),
             app_id=self.config.get('baidu_app_id'),
-            secret_key=self.config.get('baidu_secret_key')
+            secret_key=self.config.get('baidu_secret_key'),
+            cache=self.cache
         )
         
         self.video_composer = VideoComposer()
+        self.progress_callback = None
     
     def convert(
         self,
         novel_path: str,
         output_dir: str = "output",
-        video_name: str = "anime.mp4"
+        video_name: str = "anime.mp4",
+        progress_callback: Optional[Callable[[Dict], None]] = None
     ) -> str:
         Path(output_dir).mkdir(parents=True, exist_ok=True)
+        self.progress_callback = progress_callback
         
-        print("📖 读取小说文本...")
-        with open(novel_path, 'r', encoding='utf-8') as f:
-            novel_text = f.read()
-        
-        print("🔍 解析小说场景...")
-        scenes = self.parser.parse_novel(novel_text)
-        print(f"   发现 {len(scenes)} 个场景")
-        
-        print("\n👥 提取角色信息...")
-        all_characters = self.character_manager.extract_characters(novel_text)
-        print(f"   发现 {len(all_characters)} 个角色: {', '.join(list(all_characters)[:10])}")
+        manifest = RunManifest(output_dir) if self.config.get('resume', True) else None
+        anchors = manifest.anchors if manifest is not None and self.config.get('incremental', False) else None
         
-        for character in all_characters:
-            self.character_manager.register_character(character)
-        
-        print("\n🎨 生成场景图片...")
-        for i, scene in enumerate(scenes):
-            print(f"   生成场景 {i+1}/{len(scenes)}...")
+        print("📖 流式解析小说场景，并发生成场景图片与语音旁白...")
+        with SceneGenerationEngine(
+            self.image_gen,
+            self.tts,
+            image_concurrency=self.config.get('image_concurrency', 4),
+            tts_concurrency=self.config.get('tts_concurrency', 4),
+            manifest=manifest,
+            progress_callback=progress_callback
+        ) as engine:
+            with open(novel_path, 'r', encoding='utf-8') as f:
+                for scene in self.parser.iter_scenes(f, anchors=anchors):
+                    self._submit_scene(engine, scene, output_dir)
+                    self._emit('parsing', current=engine.submitted_count)
             
-            base_prompt = scene['narration'][:500]
-            enhanced_prompt = self.character_manager.enhance_scene_prompt(
-                base_prompt, 
-                scene['text']
-            )
+            print(f"   发现 {engine.submitted_count} 个场景")
+            self._emit('parsed', total=engine.submitted_count)
+            characters = list(self.character_manager.characters)
+            print(f"\n👥 发现 {len(characters)} 个角色: {', '.join(characters[:10])}")
             
-            image_path = os.path.join(output_dir, f"scene_{i+1:03d}.png")
-            
-            try:
-                scene['image_path'] = self.image_gen.generate_image(enhanced_prompt, image_path)
-            except Exception as e:
-                print(f"      ⚠️ 图片生成失败: {e}")
-                scene['image_path'] = None
+            scenes = engine.wait()
         
-        print("\n🎤 生成语音旁白...")
-        for i, scene in enumerate(scenes):
-            print(f"   生成场景 {i+1}/{len(scenes)} 的语音...")
-            
-            audio_text = scene['text'][:1000]
-            audio_path = os.path.join(output_dir, f"scene_{i+1:03d}.mp3")
-            
-            try:
-                scene['audio_path'] = self.tts.generate_speech(audio_text, audio_path)
-            except Exception as e:
-                print(f"      ⚠️ 语音生成失败: {e}")
-                scene['audio_path'] = None
+        if engine.skipped:
+            print(f"   增量渲染: 复用 {engine.skipped} 个已完成的生成步骤")
+        
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"   生成缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次")
         
         print("\n🎬 合成最终视频...")
+        self._emit('encoding', percent=0)
         video_path = os.path.join(output_dir, video_name)
         
         scenes_metadata_path = os.path.join(output_dir, "scenes_metadata.json")
@@ -106,9 +113,110 @@ class NovelToAnimeConverter:
         print(f"   角色信息已保存到: {character_summary_path}")
         
         try:
-            result = self.video_composer.create_video(scenes, video_path)
+            if manifest is None:
+                result = self.video_composer.create_video(
+                    scenes,
+                    video_path,
+                    fps=self.config.get('fps', 30),
+                    scene_duration=self.config.get('scene_duration', 5.0),
+                    progress_callback=self._emit_event if progress_callback else None
+                )
+            else:
+                result = self._compose_segments(scenes, output_dir, video_path, manifest)
+            self._emit('encoding', percent=100)
             print(f"\n✅ 视频生成完成: {result}")
             return result
         except Exception as e:
             print(f"\n❌ 视频合成失败: {e}")
             raise
+    
+    def _submit_scene(self, engine: SceneGenerationEngine, scene: Dict, output_dir: str):
+        self.character_manager.observe_scene(scene['text'])
+        
+        scene['fingerprint'] = RunManifest.hash_text(scene['text'])
+        asset_name = f"scene_{scene['fingerprint'][:12]}"
+        
+        base_prompt = scene['narration'][:500]
+        enhanced_prompt = self.character_manager.enhance_scene_prompt(
+            base_prompt, 
+            scene['text']
+        )
+        
+        engine.submit(
+            scene['fingerprint'],
+            scene,
+            enhanced_prompt,
+            os.path.join(output_dir, f"{asset_name}.png"),
+            scene['text'][:1000],
+            os.path.join(output_dir, f"{asset_name}.mp3")
+        )
+    
+    def _emit(self, stage: str, **fields):
+        self._emit_event(dict(fields, stage=stage))
+    
+    def _emit_event(self, event: Dict):
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event)
+        except Exception as e:
+            print(f"   ⚠️ 进度回调失败: {e}")
+    
+    def _compose_segments(
+        self,
+        scenes: List[Dict],
+        output_dir: str,
+        video_path: str,
+        manifest: RunManifest
+    ) -> str:
+        fps = self.config.get('fps', 30)
+        scene_duration = self.config.get('scene_duration', 5.0)
+        clip_dir = Path(output_dir) / "clips"
+        clip_dir.mkdir(parents=True, exist_ok=True)
+        
+        clip_paths = []
+        reused = 0
+        for i, scene in enumerate(scenes):
+            fingerprint = scene['fingerprint']
+            image_path = scene.get('image_path')
+            if not image_path or not os.path.exists(image_path):
+                print(f"⚠️ 场景 {i+1} 的图片不存在: {image_path}")
+                continue
+            
+            input_hash = RunManifest.hash_text(
+                manifest.output_hash(fingerprint, 'image'),
+                manifest.output_hash(fingerprint, 'audio'),
+                scene.get('text', ''),
+                fps,
+                scene_duration,
+                list(self.video_composer.frame_size)
+            )
+            
+            clip_path = manifest.completed(fingerprint, 'clip', input_hash)
+            if clip_path:
+                reused += 1
+            else:
+                print(f"   编码场景片段 {i+1}/{len(scenes)}...")
+                clip_path = self.video_composer.render_scene_clip(
+                    scene,
+                    str(clip_dir / f"scene_{fingerprint[:12]}.mp4"),
+                    fps=fps,
+                    scene_duration=scene_duration
+                )
+                manifest.record(fingerprint, 'clip', input_hash, clip_path)
+            
+            scene['clip_path'] = clip_path
+            clip_paths.append(clip_path)
+            self._emit('encoding', percent=int((i + 1) * 99 / len(scenes)), current=i + 1, total=len(scenes))
+        
+        if reused:
+            print(f"   复用 {reused} 个已编码的场景片段")
+        
+        result = self.video_composer.concat_clips(clip_paths, video_path)
+        
+        manifest.commit(
+            [scene['fingerprint'] for scene in scenes],
+            [scene['anchor'] for scene in scenes if scene.get('anchor')]
+        )
+        
+        return result
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .manifest import RunManifest
+from ..generators.image import ImageGenerator
+from ..generators.audio import TextToSpeech
+
+
+class SceneGenerationEngine:
+    def __init__(
+        self,
+        image_gen: ImageGenerator,
+        tts: TextToSpeech,
+        image_concurrency: int = 4,
+        tts_concurrency: int = 4,
+        manifest: Optional[RunManifest] = None,
+        progress_callback: Optional[Callable[[Dict], None]] = None
+    ):
+        self.image_gen = image_gen
+        self.tts = tts
+        self.manifest = manifest
+        self.progress_callback = progress_callback
+        self._progress_lock = threading.Lock()
+        self._completed = {'image': 0, 'audio': 0}
+        self.image_executor = ThreadPoolExecutor(
+            max_workers=max(1, image_concurrency),
+            thread_name_prefix='scene-image'
+        )
+        self.tts_executor = ThreadPoolExecutor(
+            max_workers=max(1, tts_concurrency),
+            thread_name_prefix='scene-tts'
+        )
+        self._pending: List[Tuple[Dict, Future, Future]] = []
+        self._submitted: Dict[str, Tuple[Future, Future]] = {}
+        self.skipped = 0
+
+    def submit(
+        self,
+        key: str,
+        scene: Dict,
+        image_prompt: str,
+        image_path: str,
+        audio_text: str,
+        audio_path: str
+    ):
+        if key in self._submitted:
+            image_future, audio_future = self._submitted[key]
+            self._pending.append((scene, image_future, audio_future))
+            return
+
+        image_future = self._submit_stage(
+            self.image_executor,
+            key,
+            'image',
+            self.image_gen.fingerprint(image_prompt),
+            lambda: self.image_gen.generate_image(image_prompt, image_path)
+        )
+        audio_future = self._submit_stage(
+            self.tts_executor,
+            key,
+            'audio',
+            self.tts.fingerprint(audio_text),
+            lambda: self.tts.generate_speech(audio_text, audio_path)
+        )
+        self._submitted[key] = (image_future, audio_future)
+        self._pending.append((scene, image_future, audio_future))
+        
+        if self.progress_callback is not None:
+            image_future.add_done_callback(lambda _: self._report('image'))
+            audio_future.add_done_callback(lambda _: self._report('audio'))
+
+    def _report(self, stage: str):
+        with self._progress_lock:
+            self._completed[stage] += 1
+            event = {
+                'stage': stage,
+                'current': self._completed[stage],
+                'total': self.submitted_count
+            }
+        try:
+            self.progress_callback(event)
+        except Exception as e:
+            print(f"      ⚠️ 进度回调失败: {e}")
+
+    @property
+    def submitted_count(self) -> int:
+        return len(self._submitted)
+
+    def _submit_stage(
+        self,
+        executor: ThreadPoolExecutor,
+        key: str,
+        stage: str,
+        input_hash: str,
+        generate: Callable[[], str]
+    ) -> Future:
+        if self.manifest is None:
+            return executor.submit(generate)
+
+        completed_path = self.manifest.completed(key, stage, input_hash)
+        if completed_path:
+            self.skipped += 1
+            future = Future()
+            future.set_result(completed_path)
+            return future
+
+        def run() -> str:
+            result = generate()
+            self.manifest.record(key, stage, input_hash, result)
+            return result
+
+        return executor.submit(run)
+
+    def wait(self) -> List[Dict]:
+        scenes = []
+        total = len(self._pending)
+
+        for i, (scene, image_future, audio_future) in enumerate(self._pending):
+            try:
+                scene['image_path'] = image_future.result()
+            except Exception as e:
+                print(f"      ⚠️ 场景 {i+1}/{total} 图片生成失败: {e}")
+                scene['image_path'] = None
+
+            try:
+                scene['audio_path'] = audio_future.result()
+            except Exception as e:
+                print(f"      ⚠️ 场景 {i+1}/{total} 语音生成失败: {e}")
+                scene['audio_path'] = None
+
+            print(f"   场景 {i+1}/{total} 生成完成")
+            scenes.append(scene)
+
+        self._pending = []
+        self._submitted = {}
+        return scenes
+
+    def shutdown(self):
+        self.image_executor.shutdown(wait=True, cancel_futures=True)
+        self.tts_executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class RunManifest:
+    FILENAME = "run_manifest.json"
+    VERSION = 2
+
+    def __init__(self, output_dir: str):
+        self.path = Path(output_dir) / self.FILENAME
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self) -> Dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    return data
+            except (OSError, ValueError):
+                print(f"⚠️ 运行清单损坏，将重新生成: {self.path}")
+        return {'version': self.VERSION, 'scenes': {}, 'order': [], 'anchors': []}
+
+    @staticmethod
+    def hash_text(*parts) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_file(path: str) -> Optional[str]:
+        if not path or not os.path.isfile(path):
+            return None
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @property
+    def anchors(self) -> List[str]:
+        return list(self.data.get('anchors', []))
+
+    def _stage(self, fingerprint: str, stage: str) -> Optional[Dict]:
+        return self.data['scenes'].get(fingerprint, {}).get('stages', {}).get(stage)
+
+    def completed(self, fingerprint: str, stage: str, input_hash: str) -> Optional[str]:
+        with self._lock:
+            record = self._stage(fingerprint, stage)
+
+        if not record or record.get('input') != input_hash:
+            return None
+
+        output_path = record.get('output')
+        if self.hash_file(output_path) != record.get('sha256'):
+            return None
+
+        return output_path
+
+    def output_hash(self, fingerprint: str, stage: str) -> Optional[str]:
+        with self._lock:
+            record = self._stage(fingerprint, stage)
+        return record.get('sha256') if record else None
+
+    def record(self, fingerprint: str, stage: str, input_hash: str, output_path: str):
+        sha256 = self.hash_file(output_path)
+        with self._lock:
+            scene = self.data['scenes'].setdefault(fingerprint, {'stages': {}})
+            scene['stages'][stage] = {
+                'input': input_hash,
+                'output': output_path,
+                'sha256': sha256
+            }
+            self._save_locked()
+
+    def commit(self, fingerprints: List[str], anchors: List[str]):
+        with self._lock:
+            kept = set(fingerprints)
+            dropped = [
+                scene for fingerprint, scene in self.data['scenes'].items()
+                if fingerprint not in kept
+            ]
+            self.data['scenes'] = {
+                fingerprint: scene for fingerprint, scene in self.data['scenes'].items()
+                if fingerprint in kept
+            }
+            self.data['order'] = list(fingerprints)
+            self.data['anchors'] = list(anchors)
+            self._save_locked()
+
+            in_use = {
+                record.get('output')
+                for scene in self.data['scenes'].values()
+                for record in scene.get('stages', {}).values()
+            }
+
+        for scene in dropped:
+            for record in scene.get('stages', {}).values():
+                output_path = record.get('output')
+                if output_path and output_path not in in_use and os.path.isfile(output_path):
+                    os.unlink(output_path)
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,85 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class AhoCorasickMatcher:
+    def __init__(self, words: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._word: List[Optional[str]] = [None]
+        self._dict_link: List[int] = [0]
+        self._built = True
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return sum(1 for word in self._word if word is not None)
+
+    def add(self, word: str):
+        if not word:
+            return
+
+        state = 0
+        for ch in word:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._word.append(None)
+                self._dict_link.append(0)
+                self._goto[state][ch] = next_state
+            state = next_state
+
+        self._word[state] = word
+        self._built = False
+
+    def build(self):
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            self._dict_link[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = fail_state
+                self._dict_link[next_state] = (
+                    fail_state if self._word[fail_state] is not None
+                    else self._dict_link[fail_state]
+                )
+                queue.append(next_state)
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        words = self._word
+        dict_link = self._dict_link
+
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            node = state if words[state] is not None else dict_link[state]
+            while node:
+                word = words[node]
+                yield i - len(word) + 1, word
+                node = dict_link[node]
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        positions: Dict[str, List[int]] = {}
+        for start, word in self.iter_matches(text):
+            positions.setdefault(word, []).append(start)
+        return positions
@@ -1,47 +1,106 @@
 import re
-from typing import List, Dict
+import hashlib
+from typing import List, Dict, Iterable, Iterator, TextIO, Tuple
+
+
+_QUOTE_PATTERN = re.compile(
+    r'“([^“”]*)(?:”|$)'
+    r'|「([^「」]*)(?:」|$)'
+    r'|『([^『』]*)(?:』|$)'
+    r'|"([^"\n]*)"'
+)
 
 
 class NovelParser:
     def __init__(self, max_scene_length: int = 500):
         self.max_scene_length = max_scene_length
     
-    def parse_novel(self, novel_text: str) -> List[Dict]:
-        scenes = []
-        paragraphs = [p.strip() for p in novel_text.split('\n\n') if p.strip()]
+    @staticmethod
+    def fingerprint(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+    
+    def parse_novel(self, novel_text: str, anchors: Iterable[str] = None) -> List[Dict]:
+        paragraphs = (p.strip() for p in novel_text.split('\n\n'))
+        return list(self._build_scenes((p for p in paragraphs if p), anchors))
+    
+    def iter_scenes(self, stream: TextIO, anchors: Iterable[str] = None) -> Iterator[Dict]:
+        return self._build_scenes(self.iter_paragraphs(stream), anchors)
+    
+    @staticmethod
+    def iter_paragraphs(stream: TextIO) -> Iterator[str]:
+        lines = []
+        for line in stream:
+            if line == '\n':
+                paragraph = ''.join(lines).strip()
+                lines = []
+                if paragraph:
+                    yield paragraph
+            else:
+                lines.append(line)
         
-        current_scene = {
-            'text': '',
-            'narration': '',
-            'dialogue': []
-        }
+        paragraph = ''.join(lines).strip()
+        if paragraph:
+            yield paragraph
+    
+    def _build_scenes(self, paragraphs: Iterable[str], anchors: Iterable[str] = None) -> Iterator[Dict]:
+        anchors = set(anchors or ())
+        
+        text_parts: List[str] = []
+        narration_parts: List[str] = []
+        dialogue: List[str] = []
+        scene_length = 0
+        scene_anchor = None
         
         for paragraph in paragraphs:
-            if len(current_scene['text']) + len(paragraph) > self.max_scene_length:
-                if current_scene['text']:
-                    scenes.append(current_scene.copy())
-                current_scene = {
-                    'text': paragraph,
-                    'narration': self._extract_narration(paragraph),
-                    'dialogue': self._extract_dialogue(paragraph)
-                }
+            paragraph_fingerprint = self.fingerprint(paragraph)
+            
+            if text_parts and (
+                paragraph_fingerprint in anchors
+                or scene_length + 1 + len(paragraph) > self.max_scene_length
+            ):
+                yield self._make_scene(text_parts, narration_parts, dialogue, scene_anchor)
+                text_parts, narration_parts, dialogue = [], [], []
+                scene_length = 0
+            
+            if not text_parts:
+                scene_anchor = paragraph_fingerprint
+                scene_length = len(paragraph)
             else:
-                current_scene['text'] += '\n' + paragraph
-                current_scene['narration'] += '\n' + self._extract_narration(paragraph)
-                current_scene['dialogue'].extend(self._extract_dialogue(paragraph))
+                scene_length += 1 + len(paragraph)
+            
+            narration, paragraph_dialogue = self.split_dialogue(paragraph)
+            text_parts.append(paragraph)
+            narration_parts.append(narration)
+            dialogue.extend(paragraph_dialogue)
         
-        if current_scene['text']:
-            scenes.append(current_scene)
-        
-        return scenes
+        if text_parts:
+            yield self._make_scene(text_parts, narration_parts, dialogue, scene_anchor)
     
-    def _extract_narration(self, text: str) -> str:
-        narration = re.sub(r'["""](.*?)["""]', '', text)
-        narration = re.sub(r'"(.*?)"', '', narration)
-        return narration.strip()
+    @staticmethod
+    def _make_scene(
+        text_parts: List[str],
+        narration_parts: List[str],
+        dialogue: List[str],
+        anchor: str
+    ) -> Dict:
+        return {
+            'text': '\n'.join(text_parts),
+            'narration': '\n'.join(part for part in narration_parts if part),
+            'dialogue': dialogue,
+            'anchor': anchor
+        }
     
-    def _extract_dialogue(self, text: str) -> List[str]:
-        dialogues = []
-        dialogues.extend(re.findall(r'["""](.*?)["""]', text))
-        dialogues.extend(re.findall(r'"(.*?)"', text))
-        return dialogues
+    @staticmethod
+    def split_dialogue(text: str) -> Tuple[str, List[str]]:
+        narration_parts = []
+        dialogue = []
+        position = 0
+        
+        for match in _QUOTE_PATTERN.finditer(text):
+            narration_parts.append(text[position:match.start()])
+            dialogue.append(next(group for group in match.groups() if group is not None))
+            position = match.end()
+        
+        narration_parts.append(text[position:])
+        return ''.join(narration_parts).strip(), dialogue
+
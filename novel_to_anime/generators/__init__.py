@@ -1,4 +1,5 @@
+from .cache import GenerationCache
 from .image import ImageGenerator
 from .audio import TextToSpeech
 
-__all__ = ['ImageGenerator', 'TextToSpeech']
+__all__ = ['GenerationCache', 'ImageGenerator', 'TextToSpeech']
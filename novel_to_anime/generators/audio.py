@@ -2,41 +2,75 @@ import os
 import base64
 import json
 
+from .cache import GenerationCache
+
 
 class TextToSpeech:
-    def __init__(self, api_key: str = None, provider: str = "azure", app_id: str = None, secret_key: str = None):
+    QINIU_VOICES = {
+        "zh-CN": "zh_female_shuangkuaisisi_moon_bigtts",
+        "en-US": "en_female_bella_sky_bigtts"
+    }
+    
+    def __init__(self, api_key: str = None, provider: str = "azure", app_id: str = None, secret_key: str = None, cache: GenerationCache = None):
         self.api_key = api_key or os.getenv('TTS_API_KEY')
         self.provider = provider
         self.app_id = app_id or os.getenv('BAIDU_APP_ID')
         self.secret_key = secret_key or os.getenv('BAIDU_SECRET_KEY')
+        self.cache = cache
     
     def generate_speech(self, text: str, output_path: str, language: str = "zh-CN") -> str:
         if self.provider == "azure":
             if not self.api_key:
                 print(f"⚠️ 警告: 未配置Azure TTS API密钥，将生成静音音频")
                 return self._generate_silence(output_path, duration=len(text) * 0.2)
-            return self._generate_azure_tts(text, output_path, language)
+            generate = lambda: self._generate_azure_tts(text, output_path, language)
         
         elif self.provider == "openai":
             if not self.api_key:
                 print(f"⚠️ 警告: 未配置OpenAI TTS API密钥，将生成静音音频")
                 return self._generate_silence(output_path, duration=len(text) * 0.2)
-            return self._generate_openai_tts(text, output_path)
+            generate = lambda: self._generate_openai_tts(text, output_path)
         
         elif self.provider == "baidu":
             if not self.api_key or not self.secret_key:
                 print(f"⚠️ 警告: 未配置百度TTS API密钥，将生成静音音频")
                 return self._generate_silence(output_path, duration=len(text) * 0.2)
-            return self._generate_baidu_tts(text, output_path, language)
+            generate = lambda: self._generate_baidu_tts(text, output_path, language)
         
         elif self.provider == "qiniu":
             if not self.api_key:
                 print(f"⚠️ 警告: 未配置七牛TTS API密钥，将生成静音音频")
                 return self._generate_silence(output_path, duration=len(text) * 0.2)
-            return self._generate_qiniu_tts(text, output_path, language)
+            generate = lambda: self._generate_qiniu_tts(text, output_path, language)
         
         else:
             raise ValueError(f"不支持的TTS提供商: {self.provider}")
+        
+        if self.cache is None:
+            return generate()
+        
+        cache_key = self.fingerprint(text, language)
+        if self.cache.get(cache_key, output_path):
+            return output_path
+        
+        result = generate()
+        self.cache.put(cache_key, result)
+        return result
+    
+    def fingerprint(self, text: str, language: str = "zh-CN") -> str:
+        has_credentials = self.api_key and (self.provider != "baidu" or self.secret_key)
+        if not has_credentials:
+            return GenerationCache.make_key("silence", None, text, language)
+        return GenerationCache.make_key(self.provider, self._voice_for(language), text, language)
+    
+    def _voice_for(self, language: str) -> str:
+        if self.provider == "openai":
+            return "tts-1/alloy"
+        elif self.provider == "baidu":
+            return "per=0,spd=5,pit=5,vol=5"
+        elif self.provider == "qiniu":
+            return self.QINIU_VOICES.get(language, self.QINIU_VOICES["zh-CN"])
+        return "default"
     
     def _generate_silence(self, output_path: str, duration: float) -> str:
         from pydub import AudioSegment
@@ -144,11 +178,7 @@ class TextToSpeech:
             "Content-Type": "application/json"
         }
         
-        voice_map = {
-            "zh-CN": "zh_female_shuangkuaisisi_moon_bigtts",
-            "en-US": "en_female_bella_sky_bigtts"
-        }
-        voice_type = voice_map.get(language, "zh_female_shuangkuaisisi_moon_bigtts")
+        voice_type = self._voice_for(language)
         
         body = {
             "audio": {
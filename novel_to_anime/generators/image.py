@@ -1,24 +1,51 @@
 import os
 
+from .cache import GenerationCache
+
 
 class ImageGenerator:
-    def __init__(self, api_key: str = None, provider: str = "stability"):
+    PROVIDER_MODELS = {
+        "stability": ("stable-diffusion-xl-1024-v1-0", "1024x576"),
+        "openai": ("dall-e", "1024x1024"),
+        "qiniu": ("gemini-2.5-flash-image", "1024x1024"),
+    }
+    
+    def __init__(self, api_key: str = None, provider: str = "stability", cache: GenerationCache = None):
         self.api_key = api_key or os.getenv('IMAGE_API_KEY')
         self.provider = provider
+        self.cache = cache
     
     def generate_image(self, prompt: str, output_path: str) -> str:
         if not self.api_key:
             print(f"⚠️ 警告: 未配置API密钥，将生成占位符图片")
             return self._generate_placeholder(output_path, prompt)
         
+        if self.provider not in self.PROVIDER_MODELS:
+            raise ValueError(f"不支持的图像生成器: {self.provider}")
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.fingerprint(prompt)
+            if self.cache.get(cache_key, output_path):
+                return output_path
+        
         if self.provider == "stability":
-            return self._generate_stability_ai(prompt, output_path)
+            result = self._generate_stability_ai(prompt, output_path)
         elif self.provider == "openai":
-            return self._generate_openai_dalle(prompt, output_path)
-        elif self.provider == "qiniu":
-            return self._generate_qiniu_image(prompt, output_path)
+            result = self._generate_openai_dalle(prompt, output_path)
         else:
-            raise ValueError(f"不支持的图像生成器: {self.provider}")
+            result = self._generate_qiniu_image(prompt, output_path)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        
+        return result
+    
+    def fingerprint(self, prompt: str) -> str:
+        if not self.api_key:
+            return GenerationCache.make_key("placeholder", None, prompt)
+        model, size = self.PROVIDER_MODELS.get(self.provider, (None, None))
+        return GenerationCache.make_key(self.provider, model, prompt, size)
     
     def _generate_placeholder(self, output_path: str, prompt: str) -> str:
         from PIL import Image, ImageDraw, ImageFont
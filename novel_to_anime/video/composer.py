@@ -1,59 +1,175 @@
 import os
-from typing import List, Dict
+import subprocess
+from typing import Callable, List, Dict, Optional, Tuple
+
+
+def _encoding_logger(progress_callback: Callable[[Dict], None]):
+    from proglog import ProgressBarLogger
+    
+    class EncodingLogger(ProgressBarLogger):
+        def __init__(self):
+            super().__init__()
+            self.last_percent = -1
+        
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if bar != 't' or attr != 'index':
+                return
+            total = self.bars[bar].get('total') or 0
+            if not total:
+                return
+            percent = min(100, int(value * 100 / total))
+            if percent != self.last_percent:
+                self.last_percent = percent
+                progress_callback({'stage': 'encoding', 'percent': percent})
+    
+    return EncodingLogger()
 
 
 class VideoComposer:
-    def __init__(self):
-        pass
+    def __init__(self, frame_size: Tuple[int, int] = (1024, 576), audio_fps: int = 44100):
+        self.frame_size = frame_size
+        self.audio_fps = audio_fps
     
     def create_video(
         self,
         scenes: List[Dict],
         output_path: str,
         fps: int = 30,
-        scene_duration: float = 5.0
+        scene_duration: float = 5.0,
+        progress_callback: Optional[Callable[[Dict], None]] = None
     ) -> str:
-        from moviepy.editor import ImageClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips, TextClip
+        from moviepy.editor import concatenate_videoclips
         
         clips = []
         
         for i, scene in enumerate(scenes):
             image_path = scene.get('image_path')
-            audio_path = scene.get('audio_path')
-            text = scene.get('text', '')
             
             if not image_path or not os.path.exists(image_path):
                 print(f"⚠️ 场景 {i+1} 的图片不存在: {image_path}")
                 continue
             
-            img_clip = ImageClip(image_path)
-            
-            if audio_path and os.path.exists(audio_path):
-                audio_clip = AudioFileClip(audio_path)
-                duration = audio_clip.duration
-                img_clip = img_clip.set_duration(duration)
-                img_clip = img_clip.set_audio(audio_clip)
-            else:
-                img_clip = img_clip.set_duration(scene_duration)
-            
-            if text:
-                txt_clip = TextClip(
-                    text[:100] + '...' if len(text) > 100 else text,
-                    fontsize=24,
-                    color='white',
-                    bg_color='black',
-                    size=(img_clip.w * 0.9, None),
-                    method='caption'
-                )
-                txt_clip = txt_clip.set_position(('center', 'bottom')).set_duration(img_clip.duration)
-                img_clip = CompositeVideoClip([img_clip, txt_clip])
-            
-            clips.append(img_clip)
+            clips.append(self._build_scene_clip(scene, scene_duration))
         
         if not clips:
             raise Exception("没有有效的场景可以合成视频")
         
         final_clip = concatenate_videoclips(clips, method="compose")
-        final_clip.write_videofile(output_path, fps=fps, codec='libx264', audio_codec='aac')
+        final_clip.write_videofile(
+            output_path,
+            fps=fps,
+            codec='libx264',
+            audio_codec='aac',
+            logger=_encoding_logger(progress_callback) if progress_callback else 'bar'
+        )
+        
+        return output_path
+    
+    def render_scene_clip(
+        self,
+        scene: Dict,
+        output_path: str,
+        fps: int = 30,
+        scene_duration: float = 5.0
+    ) -> str:
+        import numpy as np
+        from moviepy.editor import ImageClip, AudioClip
+        from PIL import Image
+        
+        with Image.open(scene['image_path']) as image:
+            image = image.convert('RGB')
+            image.thumbnail(self.frame_size, Image.LANCZOS)
+            frame = Image.new('RGB', self.frame_size, (0, 0, 0))
+            frame.paste(image, (
+                (self.frame_size[0] - image.width) // 2,
+                (self.frame_size[1] - image.height) // 2
+            ))
+            frame_array = np.array(frame)
+        
+        clip = self._build_scene_clip(scene, scene_duration, ImageClip(frame_array))
+        
+        if clip.audio is None:
+            silence = AudioClip(
+                lambda t: np.zeros((len(t), 2)) if np.ndim(t) else np.zeros(2),
+                duration=clip.duration,
+                fps=self.audio_fps
+            )
+            clip = clip.set_audio(silence)
+        
+        clip.write_videofile(
+            output_path,
+            fps=fps,
+            codec='libx264',
+            audio_codec='aac',
+            audio_fps=self.audio_fps,
+            temp_audiofile=f"{output_path}.temp-audio.m4a",
+            verbose=False,
+            logger=None
+        )
+        
+        return output_path
+    
+    def concat_clips(self, clip_paths: List[str], output_path: str) -> str:
+        from moviepy.config import get_setting
+        
+        if not clip_paths:
+            raise Exception("没有有效的场景可以合成视频")
+        
+        list_path = f"{output_path}.concat.txt"
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for clip_path in clip_paths:
+                escaped = os.path.abspath(clip_path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        cmd = [
+            get_setting("FFMPEG_BINARY"),
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_path,
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            output_path
+        ]
+        
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        finally:
+            os.unlink(list_path)
+        
+        if result.returncode != 0:
+            raise Exception(f"视频片段拼接失败: {result.stderr}")
         
         return output_path
+    
+    def _build_scene_clip(self, scene: Dict, scene_duration: float, img_clip=None):
+        from moviepy.editor import ImageClip, AudioFileClip, CompositeVideoClip, TextClip
+        
+        audio_path = scene.get('audio_path')
+        text = scene.get('text', '')
+        
+        if img_clip is None:
+            img_clip = ImageClip(scene['image_path'])
+        
+        if audio_path and os.path.exists(audio_path):
+            audio_clip = AudioFileClip(audio_path)
+            duration = audio_clip.duration
+            img_clip = img_clip.set_duration(duration)
+            img_clip = img_clip.set_audio(audio_clip)
+        else:
+            img_clip = img_clip.set_duration(scene_duration)
+        
+        if text:
+            txt_clip = TextClip(
+                text[:100] + '...' if len(text) > 100 else text,
+                fontsize=24,
+                color='white',
+                bg_color='black',
+                size=(img_clip.w * 0.9, None),
+                method='caption'
+            )
+            txt_clip = txt_clip.set_position(('center', 'bottom')).set_duration(img_clip.duration)
+            img_clip = CompositeVideoClip([img_clip, txt_clip])
+        
+        return img_clip